@@ -23,7 +23,9 @@ if __name__ == "__main__":
                         type=str, default=None)
     parser.add_argument('--replay', help="Replay a snake game.",
                         type=str, default=None)
-    parser.add_argument('--population', help="Train from an existing population.",
+    parser.add_argument('--population', help="Train from an existing population (archive or directory).",
+                        type=str, default=None)
+    parser.add_argument('--resume', help="Resume a training from a checkpoint.",
                         type=str, default=None)
     # Get the arguments    
     args = parser.parse_args()
@@ -32,6 +34,7 @@ if __name__ == "__main__":
     snake_file = args.snake
     snake_replay_file = args.replay
     population_file = args.population
+    checkpoint_file = args.resume
     
     # Load the game
     config = configparser.ConfigParser()
@@ -59,9 +62,11 @@ if __name__ == "__main__":
     elif snake_replay_file is not None:
         snake = load_snake(snake_replay_file, keepseed=True)
         snake_game.play(snake)
+    elif checkpoint_file is not None:
+        snake_game.train(resume=checkpoint_file)
     elif population_file is not None:
-        population = load_population(population_file)
-        snake_game.train(population_file)
+        population = load_population(population_file, workers=snake_game.trainer.workers)
+        snake_game.train(population)
     elif mode == 'play':
         snake_game.play()
     else:       
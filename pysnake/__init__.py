@@ -2,11 +2,46 @@
 # Created on Sun Feb 16 15:27:18 2020
 # @author: arthurd
 
+"""
+PySnake: AI learns to play snake game.
 
-from pysnake.enum import Direction, Item
+The classes are loaded on first access (e.g. pysnake.Snake), so that
+importing the package or one of its modules (e.g. pysnake.io) only imports
+what is used. pygame is only imported with the window, pysnake.WindowGame.
+"""
 
-from pysnake.windraw import WindowGame
-from pysnake.grid import Cell, Grid
-from pysnake.game import Game, Cell
-from pysnake.snake import Snake
-from pysnake.vision import Vision, FullVision
\ No newline at end of file
+
+import importlib
+
+
+# Public names, and the module defining them
+_LAZY_ATTRIBUTES = {
+    "Direction": "pysnake.enum",
+    "Item": "pysnake.enum",
+    "Cell": "pysnake.grid",
+    "Grid": "pysnake.grid",
+    "Game": "pysnake.game",
+    "GameApplication": "pysnake.game",
+    "Snake": "pysnake.snake",
+    "Vision": "pysnake.vision",
+    "FullVision": "pysnake.vision",
+    "VecGame": "pysnake.vecgame",
+    "Trainer": "pysnake.trainer",
+    "Evaluator": "pysnake.evaluation",
+    "WindowGame": "pysnake.windraw",
+    }
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError("module 'pysnake' has no attribute '{}'".format(name))
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    # Next accesses do not go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
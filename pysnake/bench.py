@@ -0,0 +1,601 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 10:02:11 2026
+# @author: arthurd
+
+"""
+Benchmarks for the snake simulation, the vision, the neural networks and
+the training. Run them from the command line, the results are printed in 
+json, so that they can be compared between commits:
+    
+    $ python -m pysnake.bench --output bench.json
+    $ python -m pysnake.bench --suite move vision --board-sizes 10x10 30x30
+"""
+
+
+# Useful packages
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import contextlib
+import subprocess
+import tracemalloc
+import numpy as np
+# PySnake modules
+from pysnake.enum import Direction
+from pysnake.game import Game
+from pysnake.snake import Snake, nn_layer_dimensions
+from pysnake.nn.neuralnetwork import NeuralNetwork, BatchedNeuralNetwork
+from pysnake.gen.population import Population
+
+
+
+def _safe_direction(snake, rng):
+    """
+    Pick a random direction that does not kill the snake, if any.
+
+    Parameters
+    ----------
+    snake : pysnake.snake.Snake
+        Snake to move.
+    rng : numpy.random.RandomState
+        Random generator, independent from the game's seed.
+
+    Returns
+    -------
+    pysnake.enum.Direction
+        Direction to take.
+    """
+    grid = snake.game.grid
+    head_i, head_j = snake.body[-1].coord
+    moves = {Direction.UP: (head_i - 1, head_j),
+             Direction.LEFT: (head_i, head_j - 1),
+             Direction.DOWN: (head_i + 1, head_j),
+             Direction.RIGHT: (head_i, head_j + 1)}
+    safe = [direction for (direction, coord) in moves.items()
+            if grid[coord].is_empty() or grid[coord].is_apple()]
+    if len(safe) == 0:
+        return snake.direction
+    return safe[rng.randint(len(safe))]
+
+
+def bench_move_allocations(shape=(15, 15), num_steps=1000, seed=0, **snake_params):
+    """
+    Measure the memory allocated by Snake.move, per step.
+    The snake follows a random safe policy, and a new game starts when it dies.
+
+    Parameters
+    ----------
+    shape : tuple(int, int), optional
+        Shape of the game. The default is (15, 15).
+    num_steps : int, optional
+        Number of measured steps. The default is 1000.
+    seed : int, optional
+        Seed of the games and the policy. The default is 0.
+    **snake_params : parameters
+        Parameters used to create the snakes.
+
+    Returns
+    -------
+    dict
+        - steps: number of measured steps,
+        - peak_bytes_per_step: mean of the peak memory allocated during a step,
+        - retained_bytes_per_step: mean of the memory still allocated after a step,
+        - seconds_per_step: mean duration of a step (slowed down by tracemalloc).
+    """
+    rng = np.random.RandomState(seed)
+    game = Game(shape, seed=seed)
+    snake = Snake(game, **snake_params)
+    game.start(snake)
+
+    peak_bytes = 0
+    retained_bytes = 0
+    duration = 0
+    tracemalloc.start()
+    try:
+        for step in range(num_steps):
+            snake.direction = _safe_direction(snake, rng)
+            # Only measure the move
+            tracemalloc.reset_peak()
+            current_start, _ = tracemalloc.get_traced_memory()
+            start = time.perf_counter()
+            is_alive = snake.move()
+            duration += time.perf_counter() - start
+            current_end, peak = tracemalloc.get_traced_memory()
+            peak_bytes += peak - current_start
+            retained_bytes += current_end - current_start
+            # Restart a game
+            if not is_alive:
+                game.clean()
+                game.seed += 1
+                snake = Snake(game, **snake_params)
+                game.start(snake)
+    finally:
+        tracemalloc.stop()
+
+    return {"steps": num_steps,
+            "peak_bytes_per_step": peak_bytes / num_steps,
+            "retained_bytes_per_step": retained_bytes / num_steps,
+            "seconds_per_step": duration / num_steps}
+
+
+
+def bench_compute_input(shape=(15, 15), num_steps=1000, seed=0, **snake_params):
+    """
+    Measure the duration and the memory allocated by Snake.compute_input, per step.
+    The snake follows a random safe policy, and a new game starts when it dies.
+
+    Parameters
+    ----------
+    shape : tuple(int, int), optional
+        Shape of the game. The default is (15, 15).
+    num_steps : int, optional
+        Number of measured steps. The default is 1000.
+    seed : int, optional
+        Seed of the games and the policy. The default is 0.
+    **snake_params : parameters
+        Parameters used to create the snakes.
+
+    Returns
+    -------
+    dict
+        - steps: number of measured steps,
+        - seconds_per_step: mean duration of Snake.compute_input,
+        - peak_bytes_per_step: mean of the peak memory allocated by Snake.compute_input.
+    """
+    rng = np.random.RandomState(seed)
+    game = Game(shape, seed=seed)
+    snake = Snake(game, **snake_params)
+    game.start(snake)
+
+    # Duration, without tracing the memory
+    duration = 0
+    for step in range(num_steps):
+        start = time.perf_counter()
+        snake.compute_input()
+        duration += time.perf_counter() - start
+        snake.direction = _safe_direction(snake, rng)
+        if not snake.move():
+            game.clean()
+            game.seed += 1
+            snake = Snake(game, **snake_params)
+            game.start(snake)
+    
+    # Allocations on the same number of steps
+    peak_bytes = 0
+    tracemalloc.start()
+    try:
+        for step in range(num_steps):
+            tracemalloc.reset_peak()
+            current_start, _ = tracemalloc.get_traced_memory()
+            snake.compute_input()
+            _, peak = tracemalloc.get_traced_memory()
+            peak_bytes += peak - current_start
+            snake.direction = _safe_direction(snake, rng)
+            if not snake.move():
+                game.clean()
+                game.seed += 1
+                snake = Snake(game, **snake_params)
+                game.start(snake)
+    finally:
+        tracemalloc.stop()
+
+    return {"steps": num_steps,
+            "seconds_per_step": duration / num_steps,
+            "peak_bytes_per_step": peak_bytes / num_steps}
+
+
+
+# Entry points whose import time is tracked. numpy is the floor of all of them.
+IMPORT_ENTRY_POINTS = ["numpy", "pysnake", "pysnake.snake", "pysnake.game", "pysnake.io",
+                       "pysnake.gen", "pysnake.vecgame", "pysnake.trainer"]
+
+# Measure the import of a module in a new interpreter
+_IMPORT_CODE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start
+print(json.dumps({{"seconds": duration, "pygame": "pygame" in sys.modules,
+                  "modules": len(sys.modules)}}))
+"""
+
+
+def bench_imports(modules=None, repeat=5):
+    """
+    Measure the cold-start import time of modules, each in a new interpreter.
+    The interpreter start-up is not measured.
+
+    Parameters
+    ----------
+    modules : list(str), optional
+        Modules to import. The default is IMPORT_ENTRY_POINTS.
+    repeat : int, optional
+        Number of interpreters per module. The default is 5.
+
+    Returns
+    -------
+    dict
+        For each module:
+        - seconds: median import duration,
+        - min_seconds: fastest import duration,
+        - pygame: whether the import loaded pygame,
+        - modules: number of modules loaded by the interpreter.
+    """
+    modules = IMPORT_ENTRY_POINTS if modules is None else modules
+    # Import this copy of pysnake, even if it is not installed
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    results = {}
+    for module in modules:
+        runs = []
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, "-c", _IMPORT_CODE.format(module=module)],
+                                    capture_output=True, text=True, check=True, env=env).stdout
+            runs.append(json.loads(output.splitlines()[-1]))
+        durations = [run["seconds"] for run in runs]
+        results[module] = {"seconds": float(np.median(durations)),
+                           "min_seconds": min(durations),
+                           "pygame": runs[-1]["pygame"],
+                           "modules": runs[-1]["modules"]}
+    return results
+
+
+
+def _board_key(shape):
+    return "{0}x{1}".format(*shape)
+
+
+def bench_move(board_sizes=[(10, 10), (15, 15), (30, 30)], num_steps=2000, seed=0, **snake_params):
+    """
+    Measure the number of Snake.move per second, for several board sizes.
+    The snake follows a random safe policy, and a new game starts when it dies.
+
+    Parameters
+    ----------
+    board_sizes : list(tuple(int, int)), optional
+        Shapes of the games. The default is [(10, 10), (15, 15), (30, 30)].
+    num_steps : int, optional
+        Number of measured steps per board size. The default is 2000.
+    seed : int, optional
+        Seed of the games and the policy. The default is 0.
+    **snake_params : parameters
+        Parameters used to create the snakes.
+
+    Returns
+    -------
+    dict
+        For each board size, e.g. "15x15":
+        - steps: number of measured steps,
+        - steps_per_second: number of moves per second,
+        - games: number of games played.
+    """
+    results = {}
+    for shape in board_sizes:
+        rng = np.random.RandomState(seed)
+        game = Game(shape, seed=seed)
+        snake = Snake(game, **snake_params)
+        game.start(snake)
+        duration = 0
+        num_games = 1
+        for step in range(num_steps):
+            snake.direction = _safe_direction(snake, rng)
+            start = time.perf_counter()
+            is_alive = snake.move()
+            duration += time.perf_counter() - start
+            if not is_alive:
+                game.clean()
+                game.seed += 1
+                snake = Snake(game, **snake_params)
+                game.start(snake)
+                num_games += 1
+        results[_board_key(shape)] = {"steps": num_steps,
+                                      "steps_per_second": num_steps / duration,
+                                      "games": num_games}
+    return results
+
+
+def bench_vision(board_sizes=[(10, 10), (15, 15), (30, 30)], vision_modes=[4, 8, 16], 
+                 num_updates=2000, seed=0):
+    """
+    Measure the duration of FullVision.update, for several board sizes and 
+    vision modes. The vision follows the head of a snake with a random 
+    safe policy.
+
+    Parameters
+    ----------
+    board_sizes : list(tuple(int, int)), optional
+        Shapes of the games. The default is [(10, 10), (15, 15), (30, 30)].
+    vision_modes : list(int), optional
+        Number of visions. The default is [4, 8, 16].
+    num_updates : int, optional
+        Number of measured updates per board size and mode. The default is 2000.
+    seed : int, optional
+        Seed of the games and the policy. The default is 0.
+
+    Returns
+    -------
+    dict
+        For each board size, e.g. "15x15", and each vision mode, e.g. "8":
+        - updates: number of measured updates,
+        - ms_per_update: mean duration of an update, in milliseconds.
+    """
+    results = {}
+    for shape in board_sizes:
+        results[_board_key(shape)] = {}
+        for vision_mode in vision_modes:
+            rng = np.random.RandomState(seed)
+            game = Game(shape, seed=seed)
+            snake = Snake(game, vision_mode=vision_mode)
+            game.start(snake)
+            duration = 0
+            for step in range(num_updates):
+                head = snake.body[-1]
+                start = time.perf_counter()
+                snake.full_vision.update(head, snake.bearing)
+                duration += time.perf_counter() - start
+                snake.direction = _safe_direction(snake, rng)
+                if not snake.move():
+                    game.clean()
+                    game.seed += 1
+                    snake = Snake(game, vision_mode=vision_mode)
+                    game.start(snake)
+            results[_board_key(shape)][str(vision_mode)] = {"updates": num_updates,
+                                                            "ms_per_update": 1000 * duration / num_updates}
+    return results
+
+
+def bench_forward(population_sizes=[100, 1000], num_repeats=200, seed=0, 
+                  vision_mode=8, nn_hidden_layers=[20, 12], nn_dtype="float64"):
+    """
+    Measure the number of forward passes per second of the snakes' neural
+    networks: one network with one input (batch 1), one network with P 
+    inputs (batch P), and P networks with one input each, as played by
+    the VecGame backend.
+
+    Parameters
+    ----------
+    population_sizes : list(int), optional
+        Population sizes P. The default is [100, 1000].
+    num_repeats : int, optional
+        Number of measured calls to forward. The default is 200.
+    seed : int, optional
+        Seed of the weights and inputs. The default is 0.
+    vision_mode : int, optional
+        Number of visions, which sets the input size. The default is 8.
+    nn_hidden_layers : list(int), optional
+        Dimensions of the hidden layers. The default is [20, 12].
+    nn_dtype : str, optional
+        Floating point type of the networks. The default is "float64".
+
+    Returns
+    -------
+    dict
+        - batch_1: forward passes per second of one network with one input,
+        - batch_P: for each population size, e.g. "1000", forward passes 
+          (inputs) per second of one network with P inputs,
+        - batched_networks: for each population size, forward passes per 
+          second of P networks with one input each.
+    """
+    def passes_per_second(forward, X, num_passes):
+        forward(X)
+        start = time.perf_counter()
+        for _ in range(num_repeats):
+            forward(X)
+        return num_repeats * num_passes / (time.perf_counter() - start)
+
+    np.random.seed(seed)
+    layer_dimensions = nn_layer_dimensions(vision_mode, nn_hidden_layers)
+    network = NeuralNetwork(layer_dimensions, dtype=nn_dtype)
+    rng = np.random.RandomState(seed)
+    results = {"batch_1": passes_per_second(network.forward, rng.rand(layer_dimensions[0], 1), 1),
+               "batch_P": {},
+               "batched_networks": {}}
+    for size in population_sizes:
+        genomes = rng.randn(size, network.genome_size)
+        networks = BatchedNeuralNetwork.from_genomes(layer_dimensions, genomes, dtype=nn_dtype)
+        X = rng.rand(layer_dimensions[0], size)
+        results["batch_P"][str(size)] = passes_per_second(network.forward, X, size)
+        results["batched_networks"][str(size)] = passes_per_second(networks.forward, X.T.copy(), size)
+    return results
+
+
+def bench_generation(board_sizes=[(10, 10), (15, 15)], population_sizes=[50, 200], 
+                     num_generations=2, backend="game", workers=1, seed=0, **snake_params):
+    """
+    Measure the duration of a generation of the training (evaluation, 
+    selection and breeding), for several board and population sizes.
+    The training is the one of GameApplication.train(), without rendering.
+    A third of each generation are parents.
+
+    Parameters
+    ----------
+    board_sizes : list(tuple(int, int)), optional
+        Shapes of the games. The default is [(10, 10), (15, 15)].
+    population_sizes : list(int), optional
+        Number of snakes of a generation. The default is [50, 200].
+    num_generations : int, optional
+        Number of measured generations. The default is 2.
+    backend : str, optional
+        Backend of the evaluation, "game" or "vecgame". The default is "game".
+    workers : int, optional
+        Number of processes of the evaluation. The default is 1.
+    seed : int, optional
+        Seed of the training. The default is 0.
+    **snake_params : parameters
+        Parameters used to create the snakes.
+
+    Returns
+    -------
+    dict
+        For each board size, e.g. "15x15", and population size, e.g. "200":
+        - generations: number of measured generations,
+        - seconds_per_generation: mean duration of a generation.
+    """
+    from pysnake.trainer import Trainer
+    
+    results = {}
+    for shape in board_sizes:
+        results[_board_key(shape)] = {}
+        for size in population_sizes:
+            num_parents = max(1, size // 3)
+            trainer = Trainer(shape, snake_params, seed=seed, 
+                              num_generations=num_generations,
+                              num_parents=num_parents, 
+                              num_offspring=size - num_parents,
+                              backend=backend, 
+                              workers=workers)
+            # The first population is not measured
+            population = Population([Snake(Game(shape, seed=seed + i), **snake_params) for i in range(size)])
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                trainer.train(population)
+                duration = time.perf_counter() - start
+            results[_board_key(shape)][str(size)] = {"generations": num_generations,
+                                                     "seconds_per_generation": duration / num_generations}
+    return results
+
+
+
+# Benchmarks run by default from the command line
+BENCHMARKS = ["move", "vision", "forward", "generation"]
+
+
+def _environment():
+    """
+    Describe the machine and the commit of the benchmarks.
+
+    Returns
+    -------
+    dict
+        Versions of python and numpy, platform, processor count and git commit.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, 
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "commit": commit,
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def _parse_shape(value):
+    try:
+        height, width = value.lower().split("x")
+        return (int(height), int(width))
+    except ValueError:
+        raise argparse.ArgumentTypeError("board size must be written HEIGHTxWIDTH, e.g. 15x15")
+
+
+def run(suites=BENCHMARKS, board_sizes=None, population_sizes=None, quick=False, 
+        backend="game", workers=1):
+    """
+    Run benchmarks.
+
+    Parameters
+    ----------
+    suites : list(str), optional
+        Benchmarks to run, among "move", "vision", "forward", "generation", 
+        "allocations", "compute_input" and "imports". The default is BENCHMARKS.
+    board_sizes : list(tuple(int, int)), optional
+        Shapes of the games. The default is None, the default of each benchmark.
+    population_sizes : list(int), optional
+        Population sizes. The default is None, the default of each benchmark.
+    quick : bool, optional
+        Measure fewer steps, e.g. to check that the benchmarks run. 
+        The default is False.
+    backend : str, optional
+        Backend of the training, "game" or "vecgame". The default is "game".
+    workers : int, optional
+        Number of processes of the training. The default is 1.
+
+    Returns
+    -------
+    dict
+        - environment: versions, platform and commit,
+        - results: the results of each benchmark.
+    """
+    sizes = {}
+    if board_sizes is not None:
+        sizes["board_sizes"] = board_sizes
+    populations = {} if population_sizes is None else {"population_sizes": population_sizes}
+    steps = 100 if quick else 2000
+    
+    results = {}
+    for suite in suites:
+        if suite == "move":
+            results[suite] = bench_move(num_steps=steps, **sizes)
+        elif suite == "vision":
+            results[suite] = bench_vision(num_updates=steps, **sizes)
+        elif suite == "forward":
+            results[suite] = bench_forward(num_repeats=steps // 10, **populations)
+        elif suite == "generation":
+            results[suite] = bench_generation(num_generations=1 if quick else 2, backend=backend, 
+                                              workers=workers, **sizes, **populations)
+        elif suite == "allocations":
+            results[suite] = bench_move_allocations(num_steps=steps // 2)
+        elif suite == "compute_input":
+            results[suite] = bench_compute_input(num_steps=steps // 2)
+        elif suite == "imports":
+            results[suite] = bench_imports(repeat=1 if quick else 5)
+        else:
+            raise ValueError("unknown benchmark '{}'".format(suite))
+    return {"environment": _environment(), "results": results}
+
+
+def main(argv=None):
+    """
+    Run the benchmarks from the command line, and print the results in json.
+
+    Parameters
+    ----------
+    argv : list(str), optional
+        Command line arguments. The default is None, sys.argv.
+
+    Returns
+    -------
+    dict
+        The results, as returned by run().
+    """
+    parser = argparse.ArgumentParser(prog="python -m pysnake.bench", 
+                                     description="Benchmark the snakes, and print the results in json.")
+    parser.add_argument("--suite", nargs="+", default=BENCHMARKS,
+                        choices=BENCHMARKS + ["allocations", "compute_input", "imports"],
+                        help="Benchmarks to run. The default is {}.".format(" ".join(BENCHMARKS)))
+    parser.add_argument("--board-sizes", nargs="+", type=_parse_shape, default=None,
+                        help="Shapes of the games, e.g. 10x10 15x15.")
+    parser.add_argument("--population-sizes", nargs="+", type=int, default=None,
+                        help="Population sizes, e.g. 100 1000.")
+    parser.add_argument("--backend", default="game", choices=["game", "vecgame"],
+                        help="Backend of the training benchmark.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes of the training benchmark.")
+    parser.add_argument("--quick", action="store_true",
+                        help="Measure fewer steps, to check that the benchmarks run.")
+    parser.add_argument("--output", default=None,
+                        help="Write the results in this json file too.")
+    args = parser.parse_args(argv)
+    
+    report = run(args.suite, board_sizes=args.board_sizes, population_sizes=args.population_sizes,
+                 quick=args.quick, backend=args.backend, workers=args.workers)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return report
+
+
+
+if __name__ == "__main__":
+
+    main()
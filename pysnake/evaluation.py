@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 14:12:36 2026
+# @author: arthurd
+
+"""
+Evaluation of snakes' genomes, in the current process or in a pool of processes.
+"""
+
+
+# Useful packages
+import os
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+from multiprocessing import resource_tracker
+import numpy as np
+# PySnake modules
+import pysnake.game
+from pysnake.snake import Snake, nn_layer_dimensions
+from pysnake.vecgame import VecGame
+from pysnake.vision import get_ray_table, set_ray_table
+from pysnake.nn.neuralnetwork import BatchedNeuralNetwork
+
+
+
+def play(game, genome, seed, **snake_params):
+    """
+    Play a game until the snake dies, without rendering.
+    The result only depends on the genome, the seed and the parameters.
+
+    Parameters
+    ----------
+    game : pysnake.game.Game
+        Game in which the snake plays. It is cleaned at the end.
+    genome : numpy.ndarray
+        Genome of the snake.
+    seed : int
+        Seed of the game.
+    **snake_params : parameters
+        Parameters used to create the snake.
+
+    Returns
+    -------
+    snake : pysnake.snake.Snake
+        The dead snake, with its fitness, score and lifespan.
+    """
+    game.seed = seed
+    snake = Snake(game, genome=genome, **snake_params)
+    game.start(snake)
+    snake.next_direction()
+    is_alive = True
+    while is_alive:
+        snake.direction = snake.next_direction()
+        is_alive = snake.move()
+    snake.calculate_fitness()
+    game.clean()
+    return snake
+
+
+def evaluate(game, genomes, seeds, **snake_params):
+    """
+    Play the genomes one after the other.
+
+    Parameters
+    ----------
+    game : pysnake.game.Game
+        Game in which the snakes play.
+    genomes : numpy.ndarray
+        Genomes of the snakes, of shape (N, G).
+    seeds : numpy.ndarray
+        Seed of the game of each snake, of shape (N,).
+    **snake_params : parameters
+        Parameters used to create the snakes.
+
+    Returns
+    -------
+    results : numpy.ndarray
+        Fitness, score and lifespan of each snake, of shape (N, 3).
+    """
+    results = np.empty((len(genomes), 3))
+    for (i, (genome, seed)) in enumerate(zip(genomes, seeds)):
+        snake = play(game, genome, int(seed), **snake_params)
+        results[i] = (snake.fitness, snake.score, snake.lifespan)
+    return results
+
+
+def evaluate_lockstep(board_size, genomes, seeds, **snake_params):
+    """
+    Play all genomes at once, in a VecGame. The results are the same as
+    evaluate(), as each board plays the game of a Snake with the same seed.
+
+    Parameters
+    ----------
+    board_size : tuple(int, int)
+        Shape of the games.
+    genomes : numpy.ndarray
+        Genomes of the snakes, of shape (N, G).
+    seeds : numpy.ndarray
+        Seed of the game of each snake, of shape (N,).
+    **snake_params : parameters
+        Parameters used to create the snakes.
+
+    Returns
+    -------
+    results : numpy.ndarray
+        Fitness, score and lifespan of each snake, of shape (N, 3).
+    """
+    genomes = np.asarray(genomes)
+    layer_dimensions = nn_layer_dimensions(snake_params.get("vision_mode", 8),
+                                           snake_params.get("nn_hidden_layers", [20, 12]))
+    dtype = snake_params.get("nn_dtype", "float64")
+    
+    env = VecGame(board_size, len(genomes), **snake_params)
+    env.reset(seeds)
+    # Networks of the boards still playing
+    index = np.arange(len(genomes))
+    networks = BatchedNeuralNetwork.from_genomes(layer_dimensions, genomes, dtype=dtype)
+    while len(index) > 0:
+        alive = env.alive[index]
+        # Forget the finished boards once they are the majority
+        if 2 * np.count_nonzero(alive) <= len(index):
+            index = index[alive]
+            alive = alive[alive]
+            networks = BatchedNeuralNetwork.from_genomes(layer_dimensions, genomes[index], dtype=dtype)
+            if len(index) == 0:
+                break
+        actions = networks.predict(env.compute_inputs(index))
+        env.step(actions[alive], index[alive])
+    return env.results.copy()
+
+
+def _evaluate(backend, game, board_size, genomes, seeds, snake_params):
+    """
+    Evaluate genomes with a backend.
+
+    Parameters
+    ----------
+    backend : str
+        Either "game", to play the snakes one after the other in a Game,
+        or "vecgame", to play them in lockstep in a VecGame.
+    game : pysnake.game.Game
+        Game used by the "game" backend.
+    board_size : tuple(int, int)
+        Shape of the games.
+    genomes : numpy.ndarray
+        Genomes of the snakes, of shape (N, G).
+    seeds : numpy.ndarray
+        Seed of the game of each snake, of shape (N,).
+    snake_params : dict
+        Parameters used to create the snakes.
+
+    Returns
+    -------
+    results : numpy.ndarray
+        Fitness, score and lifespan of each snake, of shape (N, 3).
+    """
+    if backend == "game":
+        return evaluate(game, genomes, seeds, **snake_params)
+    elif backend == "vecgame":
+        return evaluate_lockstep(board_size, genomes, seeds, **snake_params)
+    raise ValueError("unknown evaluation backend '{}', options are 'game' and 'vecgame'.".format(backend))
+
+
+# -----------------------------------------------------------------------------
+# Workers
+
+# State of a worker process: its game, the snakes parameters and the shared memory
+_worker = {}
+
+
+def _attach(name):
+    """
+    Attach to a shared memory block created by the main process.
+    The main process owns the block: the worker does not track it.
+
+    Parameters
+    ----------
+    name : str
+        Name of the block.
+
+    Returns
+    -------
+    multiprocessing.shared_memory.SharedMemory
+        The block.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always tracks the block, in the tracker 
+        # shared with the main process, which unlinks the block
+        return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(board_size, snake_params, backend, ray_table):
+    """
+    Initialize a worker, with its own game and the ray table of the main process.
+
+    Parameters
+    ----------
+    board_size : tuple(int, int)
+        Shape of the game.
+    snake_params : dict
+        Parameters used to create the snakes.
+    backend : str
+        Evaluation backend, "game" or "vecgame".
+    ray_table : pysnake.vision.RayTable
+        Rays of the snakes' vision, traced once by the main process.
+
+    Returns
+    -------
+    None.
+    """
+    set_ray_table(ray_table)
+    _worker["game"] = pysnake.game.Game(board_size)
+    _worker["board_size"] = board_size
+    _worker["snake_params"] = snake_params
+    _worker["backend"] = backend
+    _worker["block"] = None
+
+
+def _evaluate_chunk(task):
+    """
+    Evaluate a chunk of genomes, read from shared memory.
+
+    Parameters
+    ----------
+    task : tuple
+        Name, shape and dtype of the shared genomes, the first and last
+        indices of the chunk and the seeds of the chunk.
+
+    Returns
+    -------
+    start : int
+        First index of the chunk.
+    results : numpy.ndarray
+        Fitness, score and lifespan of each snake of the chunk.
+    """
+    name, shape, dtype, start, stop, seeds = task
+    block = _worker["block"]
+    if block is None or block.name != name:
+        # New shared memory block
+        if block is not None:
+            block.close()
+        block = _attach(name)
+        _worker["block"] = block
+    genomes = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    results = _evaluate(_worker["backend"], _worker["game"], _worker["board_size"], 
+                        genomes[start:stop], seeds, _worker["snake_params"])
+    return start, results
+
+
+# -----------------------------------------------------------------------------
+# Evaluator
+
+class Evaluator:
+    """
+    Evaluate genomes, with one or several processes.
+
+    With several workers, genomes are written once in shared memory and
+    split in chunks, and only the fitness, score and lifespan come back.
+    Small chunks are distributed as workers get free, so that long-lived
+    snakes do not stall the pool. As each game is seeded, the results do
+    not depend on the number of workers nor on the chunks.
+
+    Attributes
+    ----------
+    board_size : tuple(int, int)
+        Shape of the games.
+    snake_params : dict
+        Parameters used to create the snakes.
+    workers : int
+        Number of processes. With 1, the genomes are played in the current process.
+    chunk_size : int
+        Number of genomes sent at once to a worker.
+        By default, each worker gets about 4 chunks per evaluation.
+    backend : str
+        "game" plays the snakes of a chunk one after the other, "vecgame" plays
+        them in lockstep in a VecGame. Both give the same results.
+
+    Example
+    -------
+        >>> with Evaluator((15, 15), snake_params, workers=8) as evaluator:
+        ...     results = evaluator.evaluate(population.genomes, seeds)
+        >>> fitness, score, lifespan = results.T
+    """
+
+    def __init__(self, board_size, snake_params, workers = 1, chunk_size = None, backend = "game"):
+        self.board_size = board_size
+        self.snake_params = snake_params
+        self.workers = workers if workers is not None else multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+        self.backend = backend
+        # Game used without workers
+        self.game = None
+        self._pool = None
+        self._block = None
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def _share(self, genomes):
+        """
+        Copy genomes in shared memory. The block is kept for the next
+        evaluations of the same size.
+
+        Parameters
+        ----------
+        genomes : numpy.ndarray
+            Genomes to share, of shape (N, G).
+
+        Returns
+        -------
+        None.
+        """
+        if self._block is None or self._block.size < genomes.nbytes:
+            self._release()
+            self._block = shared_memory.SharedMemory(create=True, size=max(genomes.nbytes, 1))
+        shared = np.ndarray(genomes.shape, dtype=genomes.dtype, buffer=self._block.buf)
+        shared[...] = genomes
+
+
+    def _release(self):
+        """
+        Free the shared memory.
+
+        Returns
+        -------
+        None.
+        """
+        if self._block is not None:
+            self._block.close()
+            self._block.unlink()
+            self._block = None
+
+
+    def evaluate(self, genomes, seeds):
+        """
+        Play all genomes, each one in a game with its own seed.
+
+        Parameters
+        ----------
+        genomes : numpy.ndarray
+            Genomes of the snakes, of shape (N, G).
+        seeds : numpy.ndarray
+            Seed of the game of each snake, of shape (N,).
+
+        Returns
+        -------
+        results : numpy.ndarray
+            Fitness, score and lifespan of each snake, of shape (N, 3).
+        """
+        seeds = np.asarray(seeds)
+        if self.workers <= 1:
+            if self.game is None and self.backend == "game":
+                self.game = pysnake.game.Game(self.board_size)
+            return _evaluate(self.backend, self.game, self.board_size, genomes, seeds, self.snake_params)
+
+        if self._pool is None:
+            # Start the resource tracker first, so that the workers share it
+            if os.name == "posix":
+                resource_tracker.ensure_running()
+            # The rays are traced once, for all workers
+            ray_table = get_ray_table(self.board_size, self.snake_params.get("vision_mode", 8))
+            self._pool = multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                              initargs=(self.board_size, self.snake_params, self.backend, ray_table))
+        genomes = np.ascontiguousarray(genomes)
+        self._share(genomes)
+        chunk_size = self.chunk_size or max(1, math.ceil(len(genomes) / (4 * self.workers)))
+        tasks = [(self._block.name, genomes.shape, genomes.dtype.str, start,
+                  min(start + chunk_size, len(genomes)), seeds[start:start + chunk_size])
+                 for start in range(0, len(genomes), chunk_size)]
+
+        results = np.empty((len(genomes), 3))
+        for (start, chunk_results) in self._pool.imap_unordered(_evaluate_chunk, tasks):
+            results[start:start + len(chunk_results)] = chunk_results
+        return results
+
+
+    def close(self):
+        """
+        Stop the workers and free the shared memory.
+
+        Returns
+        -------
+        None.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        self._release()
@@ -4,25 +4,37 @@
 
 
 # Useful packages
-import os
 import numpy as np
 import random as rd
-# Test if pygame is installed
-try:
-    import pygame
-except ModuleNotFoundError:
-    print("Module PyGame is not installed.\nEither install this package or turn off the 'render' parameter in the config.ini file.")
 
 # PySnake modules
 from pysnake.enum import Item, Direction
 from pysnake.grid import Cell, Grid
 from pysnake.snake import Snake
-from pysnake.windraw import WindowGame
-from pysnake.io import save_snake
-# Neural Network and Genetic Algorithm
-from pysnake.gen.population import Population
 from pysnake.nn.functional import softmax, relu, tanh, leaky_relu, linear
 
+# pygame is only imported to render the games, see load_pygame()
+pygame = None
+
+
+def load_pygame():
+    """
+    Import pygame, used to render the games.
+    Headless training and simulations never call it.
+
+    Returns
+    -------
+    module
+        The pygame module.
+    """
+    global pygame
+    if pygame is None:
+        try:
+            import pygame
+        except ModuleNotFoundError as error:
+            raise ModuleNotFoundError("Module PyGame is not installed.\nEither install this package "
+                                      "or turn off the 'render' parameter in the config.ini file.") from error
+    return pygame
 
 
 class Game:
@@ -114,19 +126,14 @@ class Game:
         apple : pysnake.grid.Cell
             Cell containing the new apple.
         """
-        height, width = self.shape
-        available_coord = []
-        
-        # Check the available cells
-        for i in range(height):
-            for j in range(width):
-                cell = self.grid[i, j]
-                # If the cell is empty, add it to the available cells list
-                if cell.is_empty():
-                    available_coord.append(cell.coord)
+        # The grid keeps an index of its empty cells
+        num_empty = self.grid.num_empty
+        if num_empty == 0:
+            raise IndexError("cannot generate an apple, the grid is full.")
                     
-        # Choose a position among all
-        coord = rd.choices(available_coord)[0]
+        # Choose a position among all, with one draw as random.choices
+        index = int(rd.random() * num_empty)
+        coord = self.grid.empty_coord(index)
         apple = Cell(coord, Item.APPLE)
                 
         return apple
@@ -140,6 +147,9 @@ class Game:
         -------
         None.
         """
+        # Reset the order of the empty cells as in a new game, so that 
+        # the next apples only depend on the seed and not on the previous games
+        is_used = len(self.snakes) > 0 or len(self.apples) > 0
         # Kill the snakes
         for snake in self.snakes:
             snake.kill()
@@ -148,6 +158,8 @@ class Game:
         for apple in self.apples:
             self.grid.set_empty(apple.coord)
         self.apples = []
+        if is_used:
+            self.grid.reindex()
         
 
     def start(self, snake=None, **kwargs):
@@ -185,6 +197,8 @@ class GameApplication:
     
     
     def __init__(self, config):
+        # The training stack is only needed by the application, not by Game
+        from pysnake.trainer import Trainer, snake_params_from_config
 
         # Main Game
         # ---------
@@ -197,6 +211,8 @@ class GameApplication:
         self.show = eval(config.get('WindowGame', 'render'))
         # Render the game in pygame
         if self.show:
+            load_pygame()
+            from pysnake.windraw import WindowGame
             # Create a pygame screen
             self.cell_size = eval(config.get('WindowGame', 'cell_size'))
             screen_size = (self.cell_size * (self.board_size[1] * 2), 
@@ -229,38 +245,12 @@ class GameApplication:
         
         # Snakes Inner Params
         # -------------------
-        self.snake_params = {
-            "length": eval(config.get('Snake', 'length')),
-            "vision_type": eval(config.get('Snake', 'vision_type')),
-            "vision_mode": eval(config.get('Snake', 'vision_mode')),
-            "lifespan_max": eval(config.get('Snake', 'lifespan_max')),
-            "hunger_max": eval(config.get('Snake', 'hunger_max')),
-            # Neural Network
-            "nn_hidden_layers": eval(config.get('NeuralNetwork', 'hidden_layers')),
-            # self.activation_hidden = eval(config.get('NeuralNetwork', 'activation_hidden')),
-            # self.activation_output = eval(config.get('NeuralNetwork', 'activation_output'))
-            }
+        self.snake_params = snake_params_from_config(config)
                             
         # Genetic Algorithm
-        # -----------------       
-        # Saving
-        self.save_best_individuals = eval(config.get('GeneticAlgorithm', 'save_best_individuals'))
-        self.save_generations = eval(config.get('GeneticAlgorithm', 'save_generations'))
-        self.save_steps = eval(config.get('GeneticAlgorithm', 'save_steps'))
-        self.save_dir = eval(config.get('GeneticAlgorithm', 'save_dir'))
-        # Training
-        self.num_generations = eval(config.get('GeneticAlgorithm', 'num_generations'))
-        self.num_parents = eval(config.get('GeneticAlgorithm', 'num_parents'))
-        self.num_offspring = eval(config.get('GeneticAlgorithm', 'num_offspring'))
-        self.num_population = self.num_parents + self.num_offspring
-        self.eta_SBX = eval(config.get('GeneticAlgorithm', 'eta_SBX'))
-        self.probability_SBX = eval(config.get('GeneticAlgorithm', 'probability_SBX'))
-        self.probability_SPBX = eval(config.get('GeneticAlgorithm', 'probability_SPBX'))
-        self.crossover_selection_type = eval(config.get('GeneticAlgorithm', 'crossover_selection_type'))
-        self.mutation_rate = eval(config.get('GeneticAlgorithm', 'mutation_rate'))
-        # self.mutation_rate_type = str(config.get('GeneticAlgorithm', 'mutation_rate_type'))
-        self.gaussian_mu = eval(config.get('GeneticAlgorithm', 'gaussian_mu'))
-        self.gaussian_std = eval(config.get('GeneticAlgorithm', 'gaussian_std'))
+        # -----------------
+        # Headless trainer, reading the [GeneticAlgorithm] section
+        self.trainer = Trainer.from_config(config)
         
 
     def _player_controler(self, snake):
@@ -392,148 +382,77 @@ class GameApplication:
                     self._pause = True
                     
     
-    def train(self, population=None):
+    def _play_generation(self, genomes, seeds):
         """
-        Train a range of snakes and evolve them.
+        Play genomes one after the other in the rendered game.
 
         Parameters
         ----------
-        population : pysnake.gen.population.Population, optional
-            Initial population to start from. The default is None.
+        genomes : numpy.ndarray
+            Genomes of the snakes, of shape (N, G).
+        seeds : numpy.ndarray
+            Seed of the game of each snake, of shape (N,).
 
         Returns
         -------
-        population : pysnake.gen.population.Population
-            Last evolved population.
-        fitness : list(float)
-            Fitness of all best individuals from the initial population to 
-            the last one.
+        results : numpy.ndarray
+            Fitness, score and lifespan of each snake, of shape (N, 3).
         """
-        fitness = []  # For tracking average fitness over generation
-        # Always fix the seed for training
-        if self.seed is None:
-            self.seed = 0
-        
-        # Create and initialize the population
-        if population is None:
-            individuals = [Snake(Game(self.board_size, seed=self.seed+i), **self.snake_params) for i in range(self.num_population)]                
-            population = Population(individuals)
-               
-        for generation in range(self.num_generations):
-            next_individuals = []  # For setting next population
-            
-            # Play all snakes in their games environment
-            for i in range(self.num_population):                
-                chromosomes = population.individuals[i].chromosomes
-                snake = Snake(self.game, chromosomes=chromosomes, **self.snake_params)
-                self.game.start(snake)
-                # Init activation output for visuals
-                snake.next_direction()  
-                
-                # Run the game until the end
-                is_alive = True
-                self._pause = False
-                while is_alive:
-                    
-                    # Render the game
-                    if self.show:
-                        self._player_controler(snake)
-                        self.window_game.draw(show_grid=self.show_grid, show_vision=self.show_vision)
-                        
-                        # Ellapsed time between two frames
-                        self.clock.tick(self.fps_train)   
-
-                    if not self._pause:
-                        snake.direction = snake.next_direction()
-                        is_alive = snake.move()
-                        
-                        if not is_alive:
-                            # Update the population wit the final fitness
-                            snake.calculate_fitness()
-                            population.individuals[i] = snake  
-                            self.game.clean()
-                            # Update the seed
-                            if self.seed is not None:
-                                self.seed += 1
-                                self.game.seed = self.seed
-            
-            # Save ?
-            if self.save_best_individuals and generation % self.save_steps == 0:
-                dirpath = self.save_dir + os.sep + "fittest"
-                filename = "snake_" + str(generation) + ".json"
-                save_snake(population.fittest, filename, dirpath = dirpath)
-
-            if self.save_generations and generation % self.save_steps == 0:
-                dirpath = self.save_dir + os.sep + "generation_" + str(generation)
-                for (i, snake) in enumerate(population.individuals):
-                    snake.id = i
-                    filename ='snake_' + str(i) + '.json'
-                    save_snake(snake, filename, dirpath = dirpath)
-            
-            # Display a log each generations
-            print("----------------------")
-            print("Generation  : {0:4d}/{1}".format(generation + 1, self.num_generations), end = " | ")
-            print("best fitness: {0:2.3E}".format(population.fittest.fitness), end = " | ")
-            print("best score  : {0:2d}".format(population.fittest.score), end = " | ")
-            print("lifespan    : {0:3d}".format( population.fittest.lifespan), end = " | ")
-            
-            # Get best individuals from current pop
-            best_from_pop = population.select_elitism(self.num_parents)
-            next_individuals.extend(best_from_pop)
-            
-            while len(next_individuals) < self.num_population:
-                parent1, parent2 = population.select_roulette_wheel(2)
-                # parent1, parent2 = pop.select_tournament(2, 100)
+        results = np.empty((len(genomes), 3))
+        for (i, (genome, seed)) in enumerate(zip(genomes, seeds)):
+            self.game.seed = int(seed)
+            snake = Snake(self.game, genome=genome, **self.snake_params)
+            self.game.start(snake)
+            # Init activation output for visuals
+            snake.next_direction()  
             
-                # Create offpsring through crossover
-                if rd.random() > self.probability_SBX:
-                    chromosomes_child1, chromosomes_child2 = population.crossover_simulated_binary(parent1, parent2, eta=100)
-                else:
-                    chromosomes_child1, chromosomes_child2 = population.crossover_single_point(parent1, parent2)
+            # Run the game until the end
+            is_alive = True
+            self._pause = False
+            while is_alive:
                 
-                # Create the new individuals
-                snake_child1 = Snake(Game(self.board_size), chromosomes=chromosomes_child1, **self.snake_params)
-                snake_child2 = Snake(Game(self.board_size), chromosomes=chromosomes_child2, **self.snake_params)    
-               
-                # Mutate their genes
-                mutation_rate = self.mutation_rate
-                snake_child1.mutate(mutation_rate)
-                snake_child2.mutate(mutation_rate)
+                # Render the game
+                self._player_controler(snake)
+                self.window_game.draw(show_grid=self.show_grid, show_vision=self.show_vision)
                 
-                next_individuals.extend([snake_child1, snake_child2])
-                                   
-            # Track average fitness
-            fitness.append(population.mean_fitness)
-    
-            # Set the next generation
-            population.individuals = next_individuals
-             
-        print("======================")
-        print("Done !")
-        print("Best fitness : {}".format(population.fittest.fitness))
-        print("Best individual :\n")
-        print(population.fittest)
-                        
-        return population, fitness
-    
-        
-    
-    
+                # Ellapsed time between two frames
+                self.clock.tick(self.fps_train)   
 
-if __name__ == "__main__":
+                if not self._pause:
+                    snake.direction = snake.next_direction()
+                    is_alive = snake.move()
+                    
+            # Update the population wit the final fitness
+            snake.calculate_fitness()
+            results[i] = (snake.fitness, snake.score, snake.lifespan)
+            self.game.clean()
+        return results
     
-    # Test the game
-    import configparser
-    # Load the config
-    config_file = "../config.ini"
-    config = configparser.ConfigParser()
-    config.read(config_file)
-    snake_game = GameApplication(config)
-    snake_game.play()
-
-
-
+    
+    def train(self, population=None, resume=None):
+        """
+        Train a range of snakes and evolve them, with self.trainer.
+        With rendering, the snakes of each generation are played in the window.
 
+        Parameters
+        ----------
+        population : pysnake.gen.population.Population, optional
+            Initial population to start from. The default is None.
+        resume : str, optional
+            Checkpoint to resume the training from. The default is None.
 
+        Returns
+        -------
+        population : pysnake.gen.population.Population
+            Last evaluated population, of pysnake.snake.SnakeGenome.
+        fitness : list(float)
+            Mean fitness of the generations.
+        """
+        self.trainer.seed = self.seed
+        play_generation = self._play_generation if self.show else None
+        population, fitness = self.trainer.train(population, play_generation = play_generation, resume = resume)
+        self.seed = self.trainer.seed
+        self.game.seed = self.seed
+        return population, fitness
+    
         
-        
\ No newline at end of file
@@ -5,5 +5,5 @@
 
 
 from pysnake.gen.chromosome import Chromosome, ChromosomeBinary
-from pysnake.gen.individual import Individual
-from pysnake.gen.population import Population
\ No newline at end of file
+from pysnake.gen.individual import Individual, GenomeIndividual
+from pysnake.gen.population import Population, GenomePopulation
\ No newline at end of file
@@ -7,6 +7,43 @@ from abc import ABC, abstractmethod
 import numpy as np
 
 
+# Above this probability, mutated genes are drawn with a dense mask
+SPARSE_MUTATION_MAX = 0.05
+
+
+def sample_mutations(size, prob_mutation, random_state = None):
+    """
+    Draw the genes that mutate, each one independently with a probability
+    prob_mutation. For low probabilities, only the number of mutations
+    is drawn (binomial law) and then their positions, instead of one 
+    random number per gene.
+
+    Parameters
+    ----------
+    size : int
+        Number of genes.
+    prob_mutation : float
+        Probability that a gene mutate.
+    random_state : numpy.random.RandomState, optional
+        Random generator. The default is None, numpy's global generator.
+
+    Returns
+    -------
+    indices : numpy.ndarray
+        Indices of the mutated genes, sorted.
+    """
+    rng = np.random if random_state is None else random_state
+    if prob_mutation > SPARSE_MUTATION_MAX:
+        return np.flatnonzero(rng.random_sample(size) <= prob_mutation)
+    num_mutations = rng.binomial(size, prob_mutation)
+    # Draw distinct positions, drawing again the duplicates
+    indices = np.unique(rng.randint(size, size=num_mutations))
+    while len(indices) < num_mutations:
+        missing = rng.randint(size, size=num_mutations - len(indices))
+        indices = np.unique(np.concatenate((indices, missing)))
+    return indices
+
+
 
 class ChromosomeSkeleton(ABC):
     """
@@ -16,8 +53,10 @@ class ChromosomeSkeleton(ABC):
     ----------
     id: int
         Identifiant of a chromosome, used to track the evolution of genes.
-    genes: list
-        List of elements (int, float, etc.).
+    genes: numpy.ndarray
+        Flat array of elements (int, float, etc.). It can be a view of a 
+        larger genome. Assigning genes copies them, and detaches the 
+        chromosome from that genome.
     size: int
         Length of genes.
     dtype: type
@@ -75,6 +114,8 @@ class ChromosomeSkeleton(ABC):
     def _process_genes(self, value):
         """
         Flatten genes to a 1D vector.
+        Contiguous arrays are not copied: the genes are a view of the given
+        array, e.g. a slice of an individual's genome.
 
         Parameters
         ----------
@@ -87,11 +128,31 @@ class ChromosomeSkeleton(ABC):
             Reshaped genes.
         """
         # Pre-process the genes in a flat array
-        genes = np.array(value)
+        genes = np.asarray(value)
         genes = genes.reshape(genes.size)
         return genes
 
     
+    def _write_genes(self, value):
+        """
+        Write genes in place, e.g. in the genome the chromosome is a view of.
+        Unlike setting genes, the memory is kept shared.
+
+        Parameters
+        ----------
+        value : numpy.ndarray
+            Genes of the same size as the chromosome.
+
+        Returns
+        -------
+        None.
+        """
+        genes = np.asarray(value).reshape(-1)
+        if genes.size != self.size:
+            raise ValueError("cannot write {0} genes in a chromosome of size {1}.".format(genes.size, self.size))
+        self.__genes[...] = genes
+
+    
     def __getitem__(self, index):
         return self.genes[index]
     
@@ -113,11 +174,18 @@ class ChromosomeSkeleton(ABC):
        
     @property
     def genes(self):
+        """
+        Genes of the chromosome, possibly a view of a larger genome, such as
+        the flat genome of a snake's neural network. Mutations write in place.
+        Assigning genes copies the values: the chromosome is then detached 
+        from that genome, and the network is not changed.
+        """
         return self.__genes
     
     @genes.setter
     def genes(self, value):
-        genes = self._process_genes(value)
+        # New genes are a copy, they never share the memory of another array
+        genes = self._process_genes(np.array(value))
         self.__genes = genes
         self.__dtype = genes.dtype
             
@@ -161,13 +229,16 @@ class Chromosome(ChromosomeSkeleton):
     
     def mutate(self, prob_mutation, mu = 0, sigma = 1):
         # Determine which genes will be mutated
-        mutation_array = np.random.random(self.genes.shape) <= prob_mutation
+        mutation_indices = sample_mutations(self.size, prob_mutation)
         # Create gaussian distribution around each one
-        gaussian_mutation = np.random.normal(mu, sigma, size=self.genes.shape)
+        gaussian_mutation = np.random.normal(mu, sigma, size=len(mutation_indices))
         if self.dtype == int:
             gaussian_mutation = gaussian_mutation.round().astype(self.dtype)
+        else:
+            # Keep the genes' floating point type (e.g. float32)
+            gaussian_mutation = gaussian_mutation.astype(self.dtype, copy=False)
         # Update
-        self.genes[mutation_array] += gaussian_mutation[mutation_array]
+        self.genes[mutation_indices] += gaussian_mutation
         
 
 # =============================================================================
@@ -185,9 +256,9 @@ class ChromosomeBinary(ChromosomeSkeleton):
         
     def mutate(self, prob_mutation):
         # Determine which genes will be mutated
-        mutation_array = np.random.random(self.genes.shape) <= prob_mutation
+        mutation_indices = sample_mutations(self.size, prob_mutation)
         # Update
-        self.genes[mutation_array] = 1 - self.genes[mutation_array]
+        self.genes[mutation_indices] = 1 - self.genes[mutation_indices]
 
         
     def _binary_check(self):
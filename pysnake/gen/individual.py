@@ -5,6 +5,8 @@
 
 from abc import ABC, abstractmethod
 
+from pysnake.gen.chromosome import Chromosome
+
 
 class Individual(ABC):
     """
@@ -125,3 +127,64 @@ class Individual(ABC):
         string += str(self.chromosomes[-1])
 
         return string
+
+
+
+class GenomeIndividual(Individual):
+    """
+    Individual defined by a flat genome, whose chromosomes are consecutive
+    slices (see pysnake.gen.population.GenomePopulation). The chromosomes 
+    are views of the genome, only created when they are accessed, so that 
+    large populations stay cheap to load.
+    
+    Attributes
+    ----------
+    genome : numpy.ndarray
+        Genes of the individual, of shape (G,).
+    chromosome_ids : list
+        Identifiant of each chromosome.
+    chromosome_slices : list(slice)
+        Position of each chromosome in the genome.
+    fitness : float
+        Reward of the individual, as evaluated when it was saved.
+    """
+    
+    def __init__(self, genome, chromosome_ids, chromosome_slices, fitness = 0, id = None):
+        self.genome = genome
+        self.chromosome_ids = list(chromosome_ids)
+        self.chromosome_slices = list(chromosome_slices)
+        self.fitness = fitness
+        self.id = id
+        self._chromosomes = None
+        
+    def encode_chromosomes(self):
+        """
+        Create the chromosomes as views of the genome.
+
+        Returns
+        -------
+        list(pysnake.gen.chromosome.Chromosome)
+            Chromosomes of the individual.
+        """
+        return [Chromosome(self.genome[index], id = chromosome_id, enable_crossover = True)
+                for (chromosome_id, index) in zip(self.chromosome_ids, self.chromosome_slices)]
+    
+    def calculate_fitness(self):
+        """
+        The fitness is given, as the individual was evaluated elsewhere.
+
+        Returns
+        -------
+        None.
+        """
+        pass
+    
+    @property
+    def chromosomes(self):
+        if self._chromosomes is None:
+            self._chromosomes = self.encode_chromosomes()
+        return self._chromosomes
+    
+    @chromosomes.setter
+    def chromosomes(self, value):
+        self._chromosomes = value
@@ -10,7 +10,114 @@ Original code from https://github.com/Chrispresso/SnakeAI.
 
 import numpy as np  
 
-from pysnake.gen.chromosome import Chromosome, ChromosomeBinary
+from pysnake.gen.chromosome import Chromosome, ChromosomeBinary, sample_mutations
+
+
+
+def elitism(fitness, num_individuals):
+    """
+    Select the top X best individuals.
+    Only the top X are sorted, after a partition of the fitness array.
+
+    Parameters
+    ----------
+    fitness : numpy.ndarray
+        Fitness of the individuals.
+    num_individuals : int
+        Top X individuals to select.
+
+    Returns
+    -------
+    numpy.ndarray
+        Indices of the top X individuals, from the best one.
+    """
+    num_individuals = min(num_individuals, len(fitness))
+    if num_individuals <= 0:
+        return np.empty(0, dtype=int)
+    top = np.argpartition(-fitness, num_individuals - 1)[:num_individuals]
+    return top[np.argsort(-fitness[top], kind="stable")]
+
+
+def tournament(fitness, num_individuals, tournament_size, random_state = None):
+    """
+    Run num_individuals tournaments at once, between tournament_size 
+    individuals drawn with replacement.
+
+    Parameters
+    ----------
+    fitness : numpy.ndarray
+        Fitness of the individuals.
+    num_individuals : int
+        Number of tournaments, i.e. of individuals to select.
+    tournament_size : int
+        Number of competitors in a tournament.
+    random_state : numpy.random.RandomState, optional
+        Random generator. The default is None, numpy's global generator.
+
+    Returns
+    -------
+    numpy.ndarray
+        Indices of the winners.
+    """
+    rng = np.random if random_state is None else random_state
+    competitors = rng.randint(len(fitness), size=(num_individuals, tournament_size))
+    winners = np.argmax(fitness[competitors], axis=1)
+    return competitors[np.arange(num_individuals), winners]
+
+
+def roulette_wheel(wheel, num_individuals, random_state = None):
+    """
+    Spin a roulette wheel num_individuals times.
+
+    Parameters
+    ----------
+    wheel : numpy.ndarray
+        Cumulative sum of the fitness of the individuals.
+    num_individuals : int
+        Number of individuals to select.
+    random_state : numpy.random.RandomState, optional
+        Random generator. The default is None, numpy's global generator.
+
+    Returns
+    -------
+    numpy.ndarray
+        Indices of the selected individuals.
+    """
+    rng = np.random if random_state is None else random_state
+    picks = rng.uniform(0, wheel[-1], num_individuals)
+    # First individual whose cumulative fitness is above the pick
+    selection = np.searchsorted(wheel, picks, side="right")
+    return np.minimum(selection, len(wheel) - 1)
+
+
+def stochastic_universal(wheel, num_individuals, random_state = None):
+    """
+    Stochastic Universal Sampling. The wheel is spun once, with 
+    num_individuals equally spaced pointers. Individuals are selected 
+    with the same probabilities as in a roulette wheel, but an individual 
+    is selected either floor or ceil of its expected number of times.
+
+    Parameters
+    ----------
+    wheel : numpy.ndarray
+        Cumulative sum of the fitness of the individuals.
+    num_individuals : int
+        Number of individuals to select.
+    random_state : numpy.random.RandomState, optional
+        Random generator. The default is None, numpy's global generator.
+
+    Returns
+    -------
+    numpy.ndarray
+        Indices of the selected individuals, in a random order.
+    """
+    rng = np.random if random_state is None else random_state
+    step = wheel[-1] / num_individuals
+    pointers = rng.uniform(0, step) + step * np.arange(num_individuals)
+    selection = np.searchsorted(wheel, pointers, side="right")
+    selection = np.minimum(selection, len(wheel) - 1)
+    # Shuffle, as the selected individuals are used in pairs
+    return rng.permutation(selection)
 
 
 class Population:
@@ -61,8 +168,8 @@ class Population:
         """
         for individual in self.individuals:
             individual.calculate_fitness()
-            
-            
+    
+    
     def select_elitism(self, num_individuals):
         """
         Select the top X best individuals.
@@ -77,8 +184,8 @@ class Population:
         list(pysnake.gen.individual.Individual)
             List of the top X individuals.
         """
-        individuals = sorted(self.individuals, key = lambda individual: individual.fitness, reverse=True)
-        return individuals[:num_individuals]
+        selection = elitism(self.fitness, num_individuals)
+        return [self.individuals[index] for index in selection]
     
     
     def select_roulette_wheel(self, num_individuals):
@@ -95,18 +202,27 @@ class Population:
         list(pysnake.gen.individual.Individual)
             List of the selected individuals.
         """
-        selection = []
-        wheel = np.sum(individual.fitness for individual in self.individuals)
-        for _ in range(num_individuals):
-            pick = np.random.uniform(0, wheel)
-            current = 0
-            for individual in self.individuals:
-                current += individual.fitness
-                if current > pick:
-                    selection.append(individual)
-                    break
+        selection = roulette_wheel(np.cumsum(self.fitness), num_individuals)
+        return [self.individuals[index] for index in selection]
     
-        return selection
+    
+    def select_stochastic_universal(self, num_individuals):
+        """
+        Select individuals with Stochastic Universal Sampling, a lower 
+        variance alternative to the roulette wheel.
+
+        Parameters
+        ----------
+        num_individuals : int
+            Number of individuals to select.
+
+        Returns
+        -------
+        list(pysnake.gen.individual.Individual)
+            List of the selected individuals, in a random order.
+        """
+        selection = stochastic_universal(np.cumsum(self.fitness), num_individuals)
+        return [self.individuals[index] for index in selection]
     
         
     def select_tournament(self, num_individuals, tournament_size):
@@ -122,16 +238,11 @@ class Population:
 
         Returns
         -------
-       list(pysnake.gen.individual.Individual)
+        list(pysnake.gen.individual.Individual)
             List of the selected individuals.
         """
-        selection = []
-        for _ in range(num_individuals):
-            tournament = np.random.choice(self.individuals, tournament_size)
-            best_from_tournament = max(tournament, key = lambda individual: individual.fitness)
-            selection.append(best_from_tournament)
-            
-        return selection
+        selection = tournament(self.fitness, num_individuals, tournament_size)
+        return [self.individuals[index] for index in selection]
     
     
     def crossover_simulated_binary(self, parent1, parent2, eta=100):
@@ -164,6 +275,9 @@ class Population:
                 child_genes1 = 0.5 * ((1 + gamma)*genes1 + (1 - gamma)*genes2)
                 # Calculate Child 2 chromosome (Eq. 9.10)
                 child_genes2 = 0.5 * ((1 - gamma)*genes1 + (1 + gamma)*genes2)
+                # Keep the parents' floating point type
+                child_genes1 = child_genes1.astype(genes1.dtype, copy=False)
+                child_genes2 = child_genes2.astype(genes2.dtype, copy=False)
             
                 # Create the new chromosome with the updated genes
                 chromosome1 = Chromosome(child_genes1, id=chromosome1.id, enable_crossover=True)
@@ -218,6 +332,14 @@ class Population:
     # -------------------------------------------------------------------------
     # Getters and setters
 
+    @property
+    def individuals(self):
+        return self.__individuals
+
+    @individuals.setter
+    def individuals(self, value):
+        self.__individuals = value
+
     @property
     def size(self):
         return len(self.individuals)
@@ -287,5 +409,439 @@ class Population:
         
         return string
     
+
+
+class GenomePopulation:
+    """
+    Population whose genomes are stored in one matrix of shape (P, G), 
+    for P individuals of G genes. The chromosomes of an individual are
+    consecutive slices of its row.
+    Selection returns rows indices, and crossovers and mutations work on 
+    all the rows at once.
+    
+    Attributes
+    ----------
+    id : int
+        Identifiant of the population.
+    genomes : numpy.ndarray
+        Genes of all individuals, of shape (P, G).
+    fitness : numpy.ndarray
+        Fitness of all individuals, of shape (P,).
+    chromosome_ids : list
+        Identifiant of each chromosome.
+    chromosome_slices : list(slice)
+        Position of each chromosome in a genome.
+    size : int
+        Number of individuals in the population.
+    mean_fitness : float
+        Fitness mean of all individuals.
+    std_fitness : float
+        Fitness standard deviation of all individuals.
+        
+    Example
+    -------
+        >>> population = GenomePopulation.from_individuals(snakes)
+        >>> next_population = population.breed(num_parents=500, num_offspring=1000)
+        >>> snake = Snake(game, genome=next_population[0])
+    """
+    
+    def __init__(self, genomes, chromosome_ids, chromosome_slices, fitness = None, id = None):
+        self.genomes = genomes
+        self.chromosome_ids = list(chromosome_ids)
+        self.chromosome_slices = list(chromosome_slices)
+        self.fitness = np.zeros(len(genomes)) if fitness is None else np.asarray(fitness, dtype=float)
+        self.__id = id
+        self.__size = self.size
+        self.__mean_fitness = self.mean_fitness
+        self.__std_fitness = self.std_fitness
+        # Chromosome and position in this chromosome of each gene
+        sizes = [index.stop - index.start for index in self.chromosome_slices]
+        self._gene_chromosome = np.repeat(np.arange(len(sizes)), sizes)
+        self._gene_position = np.concatenate([np.arange(size) for size in sizes])
+        self._chromosome_sizes = np.array(sizes)
+        
     
+    @classmethod
+    def from_individuals(cls, individuals, id = None):
+        """
+        Gather the chromosomes of individuals in a genome matrix.
 
+        Parameters
+        ----------
+        individuals : list(pysnake.gen.individual.Individual)
+            Individuals with the same chromosomes layout.
+        id : int, optional
+            Identifiant of the population. The default is None.
+
+        Returns
+        -------
+        pysnake.gen.population.GenomePopulation
+            The population of genomes.
+        """
+        chromosomes = individuals[0].chromosomes
+        chromosome_ids = [chromosome.id for chromosome in chromosomes]
+        bounds = np.cumsum([0] + [chromosome.size for chromosome in chromosomes])
+        chromosome_slices = [slice(start, end) for (start, end) in zip(bounds[:-1], bounds[1:])]
+        genomes = np.empty((len(individuals), bounds[-1]), dtype=chromosomes[0].dtype)
+        for (i, individual) in enumerate(individuals):
+            for (chromosome, index) in zip(individual.chromosomes, chromosome_slices):
+                genomes[i, index] = chromosome.genes
+        fitness = [individual.fitness for individual in individuals]
+        return cls(genomes, chromosome_ids, chromosome_slices, fitness=fitness, id=id)
+    
+    
+    # -------------------------------------------------------------------------
+    # Methods
+    
+    def chromosomes(self, index):
+        """
+        Chromosomes of an individual, as views of its genome.
+
+        Parameters
+        ----------
+        index : int
+            Index of the individual.
+
+        Returns
+        -------
+        list(pysnake.gen.chromosome.Chromosome)
+            Chromosomes of the individual.
+        """
+        return [Chromosome(self.genomes[index, chromosome_slice], id=chromosome_id, enable_crossover=True)
+                for (chromosome_id, chromosome_slice) in zip(self.chromosome_ids, self.chromosome_slices)]
+    
+    
+    def select_elitism(self, num_individuals):
+        """
+        Select the top X best individuals.
+
+        Parameters
+        ----------
+        num_individuals : int
+            Top X individuals to select.
+
+        Returns
+        -------
+        numpy.ndarray
+            Indices of the top X individuals, from the best one.
+        """
+        return elitism(self.fitness, num_individuals)
+    
+    
+    def select_tournament(self, num_individuals, tournament_size, random_state = None):
+        """
+        Select the best individuals in a sub list of individuals X times.
+        All tournaments are drawn at once.
+
+        Parameters
+        ----------
+        num_individuals : int
+            Number of individuals to select.
+        tournament_size : int
+            Size of the competitive tournament.
+        random_state : numpy.random.RandomState, optional
+            Random generator. The default is None, numpy's global generator.
+
+        Returns
+        -------
+        numpy.ndarray
+            Indices of the selected individuals.
+        """
+        return tournament(self.fitness, num_individuals, tournament_size, random_state)
+    
+    
+    def select_roulette_wheel(self, num_individuals, random_state = None):
+        """
+        Select individuals in a roulette wheel game, 
+        with a probability proportional to their fitness.
+
+        Parameters
+        ----------
+        num_individuals : int
+            Number of individuals to select.
+        random_state : numpy.random.RandomState, optional
+            Random generator. The default is None, numpy's global generator.
+
+        Returns
+        -------
+        numpy.ndarray
+            Indices of the selected individuals.
+        """
+        return roulette_wheel(np.cumsum(self.fitness), num_individuals, random_state)
+    
+    
+    def select_stochastic_universal(self, num_individuals, random_state = None):
+        """
+        Select individuals with Stochastic Universal Sampling, a lower 
+        variance alternative to the roulette wheel.
+
+        Parameters
+        ----------
+        num_individuals : int
+            Number of individuals to select.
+        random_state : numpy.random.RandomState, optional
+            Random generator. The default is None, numpy's global generator.
+
+        Returns
+        -------
+        numpy.ndarray
+            Indices of the selected individuals, in a random order.
+        """
+        return stochastic_universal(np.cumsum(self.fitness), num_individuals, random_state)
+    
+    
+    def select(self, num_individuals, selection_type = "roulette_wheel", tournament_size = 100,
+               random_state = None):
+        """
+        Select individuals, for example parents.
+
+        Parameters
+        ----------
+        num_individuals : int
+            Number of individuals to select.
+        selection_type : str, optional
+            Selection method, either "roulette_wheel", "stochastic_universal"
+            or "tournament". The default is "roulette_wheel".
+        tournament_size : int, optional
+            Size of the tournaments, for the "tournament" selection. 
+            The default is 100.
+        random_state : numpy.random.RandomState, optional
+            Random generator. The default is None, numpy's global generator.
+
+        Raises
+        ------
+        ValueError
+            If the selection type is unknown.
+
+        Returns
+        -------
+        numpy.ndarray
+            Indices of the selected individuals.
+        """
+        if selection_type == "roulette_wheel":
+            return self.select_roulette_wheel(num_individuals, random_state)
+        elif selection_type == "stochastic_universal":
+            return self.select_stochastic_universal(num_individuals, random_state)
+        elif selection_type == "tournament":
+            return self.select_tournament(num_individuals, tournament_size, random_state)
+        raise ValueError("unknown selection type {0}. Options are 'roulette_wheel', "
+                         "'stochastic_universal', 'tournament'.".format(selection_type))
+    
+    
+    def crossover_simulated_binary(self, genomes1, genomes2, eta = 100, random_state = None):
+        """
+        Simulated Binary Crossover of pairs of genomes.
+
+        Parameters
+        ----------
+        genomes1 : numpy.ndarray
+            Genomes of the first parents, of shape (N, G).
+        genomes2 : numpy.ndarray
+            Genomes of the second parents, of shape (N, G).
+        eta : float, optional
+            Distribution index. The higher, the closer the children are to 
+            their parents. The default is 100.
+        random_state : numpy.random.RandomState, optional
+            Random generator. The default is None, numpy's global generator.
+
+        Returns
+        -------
+        children1 : numpy.ndarray
+            Genomes of the first children, of shape (N, G).
+        children2 : numpy.ndarray
+            Genomes of the second children, of shape (N, G).
+        """
+        rng = np.random if random_state is None else random_state
+        rand = rng.random_sample(genomes1.shape)
+        # Both cases of equation 9.11
+        gamma = np.where(rand <= 0.5, 
+                         2 * rand, 
+                         1.0 / (2.0 * (1.0 - rand))) ** (1.0 / (eta + 1))
+        # Equations 9.9 and 9.10
+        children1 = 0.5 * ((1 + gamma)*genomes1 + (1 - gamma)*genomes2)
+        children2 = 0.5 * ((1 - gamma)*genomes1 + (1 + gamma)*genomes2)
+        # Keep the parents' floating point type
+        return children1.astype(genomes1.dtype, copy=False), children2.astype(genomes2.dtype, copy=False)
+    
+    
+    def crossover_single_point(self, genomes1, genomes2, random_state = None):
+        """
+        Single point crossover of pairs of genomes. 
+        Each chromosome is cut at its own random point.
+
+        Parameters
+        ----------
+        genomes1 : numpy.ndarray
+            Genomes of the first parents, of shape (N, G).
+        genomes2 : numpy.ndarray
+            Genomes of the second parents, of shape (N, G).
+        random_state : numpy.random.RandomState, optional
+            Random generator. The default is None, numpy's global generator.
+
+        Returns
+        -------
+        children1 : numpy.ndarray
+            Genomes of the first children, of shape (N, G).
+        children2 : numpy.ndarray
+            Genomes of the second children, of shape (N, G).
+        """
+        rng = np.random if random_state is None else random_state
+        num_pairs = len(genomes1)
+        # One point per chromosome and pair
+        points = (rng.random_sample((num_pairs, len(self._chromosome_sizes))) * self._chromosome_sizes).astype(int)
+        # Genes before the point come from the first parent
+        mask = self._gene_position < points[:, self._gene_chromosome]
+        children1 = np.where(mask, genomes1, genomes2)
+        children2 = np.where(mask, genomes2, genomes1)
+        return children1, children2
+    
+    
+    def mutate_gaussian(self, genomes, prob_mutation, mu = 0, sigma = 1, random_state = None):
+        """
+        Mutate genes in place, adding gaussian noise.
+        The mutated genes are drawn over the whole matrix at once.
+
+        Parameters
+        ----------
+        genomes : numpy.ndarray
+            Genomes to mutate, of shape (N, G).
+        prob_mutation : float
+            Probability that a gene mutate.
+        mu : float, optional
+            Mean of the gaussian law. The default is 0.
+        sigma : float, optional
+            Standard deviation of the gaussian law. The default is 1.
+        random_state : numpy.random.RandomState, optional
+            Random generator. The default is None, numpy's global generator.
+
+        Returns
+        -------
+        None.
+        """
+        rng = np.random if random_state is None else random_state
+        mutation_indices = sample_mutations(genomes.size, prob_mutation, random_state)
+        rows, columns = np.divmod(mutation_indices, genomes.shape[1])
+        gaussian_mutation = rng.normal(mu, sigma, size=len(mutation_indices))
+        genomes[rows, columns] += gaussian_mutation.astype(genomes.dtype, copy=False)
+        
+        
+    def breed(self, num_parents, num_offspring, probability_SBX = 0.5, eta = 100, 
+              prob_mutation = 0.005, mu = 0, sigma = 1, selection_type = "roulette_wheel",
+              tournament_size = 100, random_state = None):
+        """
+        Create the next generation. The best individuals are kept unchanged,
+        and offspring are created from pairs of selected parents, through 
+        crossover and gaussian mutation. All parents are selected at once.
+
+        Parameters
+        ----------
+        num_parents : int
+            Number of best individuals kept in the next generation.
+        num_offspring : int
+            Number of new individuals.
+        probability_SBX : float, optional
+            A pair of parents uses the Simulated Binary Crossover when a 
+            uniform draw is above probability_SBX, otherwise the single point 
+            crossover: SBX occurs with a probability 1 - probability_SBX. 
+            The default is 0.5.
+        eta : float, optional
+            Distribution index of the Simulated Binary Crossover. The default is 100.
+        prob_mutation : float, optional
+            Probability that a gene of an offspring mutate. The default is 0.005.
+        mu : float, optional
+            Mean of the gaussian mutation. The default is 0.
+        sigma : float, optional
+            Standard deviation of the gaussian mutation. The default is 1.
+        selection_type : str, optional
+            Selection of the parents, see GenomePopulation.select().
+            The default is "roulette_wheel".
+        tournament_size : int, optional
+            Size of the tournaments, for the "tournament" selection. 
+            The default is 100.
+        random_state : numpy.random.RandomState, optional
+            Random generator of the selection, crossover and mutation.
+            The default is None, numpy's global generator.
+
+        Returns
+        -------
+        pysnake.gen.population.GenomePopulation
+            The next generation, of size num_parents + num_offspring.
+        """
+        rng = np.random if random_state is None else random_state
+        elites = self.select_elitism(num_parents)
+        # Two children per pair of parents
+        num_pairs = (num_offspring + 1) // 2
+        parents = self.select(2 * num_pairs, selection_type=selection_type, tournament_size=tournament_size,
+                              random_state=random_state)
+        genomes1 = self.genomes[parents[0::2]]
+        genomes2 = self.genomes[parents[1::2]]
+        
+        # Crossover, choosing the type per pair
+        use_SBX = rng.random_sample(num_pairs) > probability_SBX
+        children = np.empty((num_pairs, 2, self.genomes.shape[1]), dtype=self.genomes.dtype)
+        children[use_SBX, 0], children[use_SBX, 1] = self.crossover_simulated_binary(
+            genomes1[use_SBX], genomes2[use_SBX], eta=eta, random_state=random_state)
+        children[~use_SBX, 0], children[~use_SBX, 1] = self.crossover_single_point(
+            genomes1[~use_SBX], genomes2[~use_SBX], random_state=random_state)
+        offspring = children.reshape(2 * num_pairs, -1)[:num_offspring]
+        
+        # Only the offspring mutate
+        self.mutate_gaussian(offspring, prob_mutation, mu=mu, sigma=sigma, random_state=random_state)
+        
+        genomes = np.concatenate((self.genomes[elites], offspring))
+        return GenomePopulation(genomes, self.chromosome_ids, self.chromosome_slices)
+    
+    
+    # -------------------------------------------------------------------------
+    # Getters and setters
+
+    @property
+    def size(self):
+        return len(self.genomes)
+
+    @size.setter
+    def size(self, value):
+        raise AttributeError("attribute 'size' of 'GenomePopulation' objects is not writable.",
+                             "Change attribute 'genomes' instead.")
+
+    @property
+    def mean_fitness(self):
+        return np.mean(self.fitness)
+
+    @mean_fitness.setter
+    def mean_fitness(self, value):
+        raise AttributeError("attribute 'mean_fitness' of 'GenomePopulation' objects is not writable.",
+                             "Change attribute 'fitness' instead.")
+
+    @property
+    def std_fitness(self):
+        return np.std(self.fitness)
+    
+    @std_fitness.setter
+    def std_fitness(self, value):
+        raise AttributeError("attribute 'std_fitness' of 'GenomePopulation' objects is not writable.",
+                             "Change attribute 'fitness' instead.") 
+
+    @property
+    def id(self):
+        return self.__id
+
+    @id.setter
+    def id(self, value):
+        raise AttributeError("attribute 'id' of 'GenomePopulation' objects is not writable.")
+
+
+    # -------------------------------------------------------------------------
+    # Access
+
+    def __getitem__(self, index):
+        return self.genomes[index]
+    
+    def __str__(self):
+        string =  "GenomePopulation: {0}\n".format(self.id if self.id is not None else "")
+        string += "            size: {0}\n".format(self.size)
+        string += "           genes: {0}\n".format(self.genomes.shape[1])
+        string += "        mean fit: {0}\n".format(self.mean_fitness)
+        string += "         std fit: {0}".format(self.std_fitness)
+        
+        return string
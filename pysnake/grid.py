@@ -3,12 +3,22 @@
 # @author: arthurd
 
 
+import numpy as np
+# PySnake modules
 from pysnake.enum import Item
 
 
+# Map an item value (as stored in the grid's array) to its Item
+_ITEMS = {item.value: item for item in Item}
+_EMPTY = Item.EMPTY.value
+
+
 class Cell:
     """
     Define a cell of a grid.
+    
+    Cells are immutable flyweights: they are interned per (coord, item), so
+    creating twice the same cell returns the same object.
 
     Attributes
     ----------
@@ -22,11 +32,36 @@ class Cell:
         Value of the item.
     """
     
-    def __init__(self, coord, item):
-        self.coord = coord
-        self.item = item
-        self.name = item.name
-        self.value = item.value
+    __slots__ = ('coord', 'item', 'name', 'value')
+    # Interned cells, indexed by (coord, item)
+    _cells = {}
+    
+    def __new__(cls, coord, item):
+        coord = tuple(coord)
+        key = (coord, item)
+        cell = cls._cells.get(key)
+        if cell is None:
+            cell = object.__new__(cls)
+            coord = (int(coord[0]), int(coord[1]))
+            object.__setattr__(cell, 'coord', coord)
+            object.__setattr__(cell, 'item', item)
+            object.__setattr__(cell, 'name', item.name)
+            object.__setattr__(cell, 'value', item.value)
+            cls._cells[key] = cell
+        return cell
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("'Cell' objects are immutable. Create a new cell instead.")
+        
+    def __delattr__(self, name):
+        raise AttributeError("'Cell' objects are immutable.")
+        
+    def __reduce__(self):
+        # Unpickled cells are interned too
+        return (Cell, (self.coord, self.item))
+    
+    def __repr__(self):
+        return "Cell({0}, {1})".format(self.coord, self.item)
         
         
     def is_wall(self):
@@ -81,17 +116,28 @@ class Grid:
     """
     Contains a grid of cells.
     
+    The grid is stored as a compact array of items values (see pysnake.enum.Item),
+    and cells are only created on demand when accessing the grid with grid[i, j].
+    
     Attributes
     ----------
     shape: tuple(int, int)
         Shape of the grid.
+    items: numpy.ndarray
+        Array of shape (height, width) and type int8, containing the value
+        of the item in each cell. If you write in this array directly,
+        call reindex() to update the index of empty cells.
+    num_empty: int
+        Number of empty cells in the grid.
     values: list(list(pysnake.grid.Cell))
-        Cells in the grid.
+        Cells in the grid. This list is created from items, so modifying
+        it will not update the grid.
     """
     
     def __init__(self, shape, fill_value=Item.EMPTY):
-        self.shape = shape
-        self.values = self._init_grid(fill_value)
+        self.shape = tuple(shape)
+        self.items = self._init_grid(fill_value)
+        self.reindex()
 
             
     def _init_grid(self, fill_value):
@@ -105,23 +151,10 @@ class Grid:
 
         Returns
         -------
-        values : list(list(pysnake.grid.Cell))
-            Grid of cells.
+        items : numpy.ndarray
+            Grid of items values.
         """
-        # Get the height and width from the shape
-        height, width = self.shape
-        # Create the grid
-        values = []
-        for i in range(height):
-            row = []
-            for j in range(width):
-                coord = (i, j)
-                # Create an empty cell
-                cell = Cell(coord, fill_value)
-                row.append(cell)
-            values.append(row)
-        
-        return values
+        return np.full(self.shape, fill_value.value, dtype=np.int8)
     
     def add_wall_borders(self):
         """
@@ -131,13 +164,12 @@ class Grid:
         -------
         None.
         """
-        height, width = self.shape
-        for i in range(height):
-            for j in range(width):
-                if i == 0 or i == height - 1:
-                    self[i, j] = Cell((i, j), Item.WALL)
-                elif j == 0 or j == width - 1:
-                    self[i, j] = Cell((i, j), Item.WALL)
+        wall = Item.WALL.value
+        self.items[0, :] = wall
+        self.items[-1, :] = wall
+        self.items[:, 0] = wall
+        self.items[:, -1] = wall
+        self.reindex()
         
     def pad(self, padding):
         """
@@ -152,21 +184,93 @@ class Grid:
         -------
         None.
         """
-        # Increase the shape of 
+        pad_i, pad_j = padding
+        self.items = np.pad(self.items, ((pad_i, pad_i), (pad_j, pad_j)), 
+                            mode='constant', constant_values=Item.EMPTY.value)
+        self.shape = self.items.shape
+        self.reindex()
+        
+        
+    def reindex(self):
+        """
+        Rebuild the index of empty cells from the items array.
+        
+        Empty cells are stored as flat indices (i * width + j) in a list, and
+        each cell knows its position in this list. This allows to add or
+        remove an empty cell in constant time (swap-remove).
+
+        Returns
+        -------
+        None.
+        """
+        flat_items = self.items.reshape(-1)
+        empty = np.flatnonzero(flat_items == _EMPTY)
+        position = np.full(flat_items.size, -1, dtype=np.intp)
+        position[empty] = np.arange(empty.size)
+        self._empty = empty.tolist()
+        self._empty_position = position.tolist()
+        
+    def _set_item(self, coord, value):
+        """
+        Set an item value at coordinates, and keep the index of empty cells
+        up to date.
+
+        Parameters
+        ----------
+        coord : tuple(int, int)
+            Coordinates in (i, j) format.
+        value : int
+            Value of the item to set.
+
+        Returns
+        -------
+        None.
+        """
         height, width = self.shape
-        new_height, new_width = height + 2*padding[0], width + 2*padding[1]
-        values = []
-        for i in range(new_height):
-            row = []
-            for j in range(new_width):
-                if (i > 0 and i < new_height - 1) and (j > 0 and j < new_width - 1):
-                    cell = self[i-1, j-1]
-                row.append(cell)
-            values.append(row)
+        i, j = coord
+        index = (i % height) * width + (j % width)
+        previous = self.items[i, j]
+        self.items[i, j] = value
         
-        # And update the grid
-        self.values = values
-        self.shape = (new_height, new_width) 
+        # An empty cell is now used
+        if previous == _EMPTY and value != _EMPTY:
+            position = self._empty_position[index]
+            last = self._empty.pop()
+            # Swap the last empty cell with the removed one
+            if last != index:
+                self._empty[position] = last
+                self._empty_position[last] = position
+            self._empty_position[index] = -1
+        # A cell is released
+        elif previous != _EMPTY and value == _EMPTY:
+            self._empty_position[index] = len(self._empty)
+            self._empty.append(index)
+            
+    def empty_coord(self, index):
+        """
+        Get the coordinates of an empty cell from the index of empty cells.
+        The order of this index depends on the history of the grid, but it is
+        always the same for the same sequence of updates.
+
+        Parameters
+        ----------
+        index : int
+            Position of the empty cell in the index, in [0, num_empty).
+
+        Returns
+        -------
+        tuple(int, int)
+            Coordinates (i, j) of the empty cell.
+        """
+        return divmod(self._empty[index], self.shape[1])
+    
+    @property
+    def num_empty(self):
+        return len(self._empty)
+    
+    @num_empty.setter
+    def num_empty(self, value):
+        raise AttributeError("attribute 'num_empty' of 'Grid' objects is not writable.")
         
         
     # Shortcut to set an element in the grid at coord
@@ -184,7 +288,7 @@ class Grid:
         None.
         """
         for coord in coords:
-            self[coord] = Cell(coord, Item.WALL)
+            self._set_item(coord, Item.WALL.value)
     
     def set_empty(self, *coords):
         """
@@ -200,7 +304,7 @@ class Grid:
         None.
         """
         for coord in coords:
-            self[coord] = Cell(coord, Item.EMPTY)
+            self._set_item(coord, Item.EMPTY.value)
     
     def set_apple(self, *coords):
         """
@@ -216,7 +320,7 @@ class Grid:
         None.
         """
         for coord in coords:
-            self[coord] = Cell(coord, Item.APPLE)
+            self._set_item(coord, Item.APPLE.value)
         
     def set_snake(self, *coords):
         """
@@ -232,7 +336,7 @@ class Grid:
         None.
         """
         for coord in coords:
-            self[coord] = Cell(coord, Item.SNAKE)
+            self._set_item(coord, Item.SNAKE.value)
         
     def set_cell(self, *cells):
         """
@@ -248,7 +352,7 @@ class Grid:
         None.
         """
         for cell in cells:
-            self[cell.coord] = cell
+            self._set_item(cell.coord, cell.value)
     
     
     # Check the type of a game cell
@@ -266,8 +370,7 @@ class Grid:
         bool
             True if the cell contains a Wall item.
         """
-        grid_cell = self[cell.coord]
-        return grid_cell.is_wall()
+        return self.items[cell.coord] == Item.WALL.value
             
     def is_empty(self, cell):
         """
@@ -283,8 +386,7 @@ class Grid:
         bool
             True if the cell contains an Empty item.
         """
-        grid_cell = self[cell.coord]
-        return grid_cell.is_empty()
+        return self.items[cell.coord] == Item.EMPTY.value
 
     def is_apple(self, cell):
         """
@@ -300,8 +402,7 @@ class Grid:
         bool
             True if the cell contains an Apple item.
         """
-        grid_cell = self[cell.coord]
-        return grid_cell.is_apple()
+        return self.items[cell.coord] == Item.APPLE.value
 
     def is_snake(self, cell):
         """
@@ -317,8 +418,7 @@ class Grid:
         bool
             True if the cell contains a Snake item.
         """
-        grid_cell = self[cell.coord]
-        return grid_cell.is_snake()
+        return self.items[cell.coord] == Item.SNAKE.value
     
     
     def is_outside(self, cell):
@@ -344,6 +444,52 @@ class Grid:
             return True
         return False
         
+    
+    # Array accessors, for vectorized computations
+    def mask(self, item):
+        """
+        Get the cells containing an item, as a boolean array.
+
+        Parameters
+        ----------
+        item : pysnake.enum.Item
+            Item to look for.
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean array of shape (height, width), True where the item is.
+        """
+        return self.items == item.value
+    
+    def coords(self, item):
+        """
+        Get the coordinates of all cells containing an item.
+
+        Parameters
+        ----------
+        item : pysnake.enum.Item
+            Item to look for.
+
+        Returns
+        -------
+        numpy.ndarray
+            Array of shape (n, 2), with the (i, j) coordinates of the n cells
+            containing the item, in row-major order.
+        """
+        return np.argwhere(self.items == item.value)
+    
+    def ravel(self):
+        """
+        Get a flat view of the items array, indexed by i * width + j.
+
+        Returns
+        -------
+        numpy.ndarray
+            Flat array of shape (height * width,). Writing to this array updates the grid.
+        """
+        return self.items.reshape(-1)
+        
             
     # Custom methods to make tasks easier
     def row(self, index):
@@ -360,7 +506,7 @@ class Grid:
         list(pysnake.grid.Cell)
             Row at index 'index'.
         """
-        return self.values[index]
+        return [self[index, j] for j in range(self.shape[1])]
     
     
     def col(self, index):
@@ -377,7 +523,16 @@ class Grid:
         list(pysnake.grid.Cell)
             Column at index 'index'.
         """
-        return [row[index] for row in self.values]
+        return [self[i, index] for i in range(self.shape[0])]
+    
+    
+    @property
+    def values(self):
+        return [self.row(i) for i in range(self.shape[0])]
+    
+    @values.setter
+    def values(self, value):
+        raise AttributeError("attribute 'values' of 'Grid' objects is not writable. Change attribute 'items' instead.")
     
             
     def __getitem__(self, tuple_index):
@@ -395,7 +550,7 @@ class Grid:
             Grid's cell at tuple_index coordinates.
         """
         i, j = tuple_index
-        return self.values[i][j]
+        return Cell((i, j), _ITEMS[int(self.items[i, j])])
     
     
     def __setitem__(self, tuple_index, value):
@@ -413,8 +568,7 @@ class Grid:
         -------
         None.
         """
-        i, j = tuple_index
-        self.values[i][j] = value
+        self._set_item(tuple_index, value.value)
     
         
     def __str__(self):
@@ -426,19 +580,16 @@ class Grid:
         str
             String grid.
         """
+        symbols = {Item.WALL.value: "##",
+                   Item.EMPTY.value: "  ",
+                   Item.APPLE.value: " *",
+                   Item.SNAKE.value: "[]"}
         height, width = self.shape
         grid = ""
         for i in range(height):
             row = "\n\t"
             for j in range(width):
-                if self[i, j].is_wall():
-                    row += "##"
-                elif self[i, j].is_empty():
-                    row += "  "
-                elif self[i, j].is_apple():
-                    row += " *"
-                elif self[i, j].is_snake():
-                    row += "[]"
+                row += symbols[self.items[i, j]]
             grid += row
         
         return grid
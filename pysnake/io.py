@@ -6,11 +6,26 @@
 # Useful packages
 import os
 import json
+import math
+import multiprocessing
 import numpy as np
 # PySnake modules
-from pysnake.snake import Snake
+from pysnake.snake import Snake, SnakeGenome, compute_fitness, nn_layer_dimensions
+from pysnake.nn.neuralnetwork import genome_layout
 import pysnake.game
-from pysnake.gen.population import Population
+from pysnake.gen.population import Population, GenomePopulation, elitism
+
+
+# Population archive: magic string, length of the json header (uint32), 
+# header, then the columns and the genomes, aligned on 64 bytes
+_ARCHIVE_MAGIC = b"PYSNKPOP"
+_ARCHIVE_VERSION = 1
+_ARCHIVE_ALIGNMENT = 64
+_ARCHIVE_COLUMNS = np.dtype([("id", "<i8"), 
+                             ("fitness", "<f8"), 
+                             ("score", "<i8"), 
+                             ("lifespan", "<i8"), 
+                             ("seed", "<i8")])
 
 
 
@@ -56,9 +71,32 @@ def open_files(dir_path, ext="json"):
     return files_list
 
 
+def _is_npz(filename):
+    """
+    Check if a snake file uses the binary format, from its extension.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file.
+
+    Returns
+    -------
+    bool
+        True for a .npz file, False for a json file.
+    """
+    return os.path.splitext(filename)[1].lower() == '.npz'
+
+
 def save_snake(snake, filename, dirpath = '.'):
     """
-    Save a Snake in json format.
+    Save a Snake in json or npz format, depending on the extension of the 
+    file. Without extension, the snake is saved in json.
+    
+    In the npz format, the genome of the neural network is stored as a
+    binary array, the body as an array of coordinates and the other 
+    attributes as a json string in 'metadata'. Use it for large or numerous 
+    snakes, it is several times smaller and faster to load.
 
     Parameters
     ----------
@@ -85,8 +123,23 @@ def save_snake(snake, filename, dirpath = '.'):
             'vision_mode': snake.vision_mode,
             'vision_type': snake.vision_type,
             'nn_hidden_layers': snake.nn_hidden_layers,
+            'nn_dtype': snake.nn_dtype,
             'body': [],
             'params': {}}
+        
+    if not os.path.exists(dirpath):
+        os.makedirs(dirpath)
+        
+    # Binary format
+    if _is_npz(filename):
+        del data['body'], data['params']
+        data['nn_hidden_layers'] = list(data['nn_hidden_layers'])
+        with open(dirpath + os.sep + filename, 'wb') as f:
+            np.savez(f, 
+                     genome = snake.genome,
+                     body = np.array([cell.coord for cell in snake.body]),
+                     metadata = np.array(json.dumps(data)))
+        return
     
     for (key, param) in snake.nn.params.items():
         data['params'][key] =  param.tolist()
@@ -100,16 +153,36 @@ def save_snake(snake, filename, dirpath = '.'):
     if filename.split('.')[-1] != 'json':
         filename += '.json'
         
-    if not os.path.exists(dirpath):
-        os.makedirs(dirpath)
-        
     with open(dirpath + os.sep + filename, 'w') as f:
         json.dump(data, f)   
 
+
+def _load_npz(filename):
+    """
+    Read a snake saved in npz format.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file to open.
+
+    Returns
+    -------
+    data : dict
+        Attributes of the snake, with its body as a list of coordinates.
+    genome : numpy.ndarray
+        Genome of the snake's neural network.
+    """
+    with np.load(filename) as arrays:
+        data = json.loads(str(arrays['metadata']))
+        data['body'] = [tuple(coord) for coord in arrays['body'].tolist()]
+        genome = arrays['genome']
+    return data, genome
+
         
 def load_snake(filename, game=None, keepseed=True):
     """
-    Load a Snake from a json file.
+    Load a Snake from a json or npz file, depending on its extension.
 
     Parameters
     ----------
@@ -128,8 +201,13 @@ def load_snake(filename, game=None, keepseed=True):
         Loaded Snake.
     """
     # Open the file
-    with open(filename) as f:
-        data = json.load(f)
+    if _is_npz(filename):
+        data, genome = _load_npz(filename)
+        nn_params = {'genome': genome}
+    else:
+        with open(filename) as f:
+            data = json.load(f)
+        nn_params = None
     
     if game is None:
         shape = data['game_shape']
@@ -138,16 +216,22 @@ def load_snake(filename, game=None, keepseed=True):
             seed = data['seed']
         game = pysnake.game.Game(shape, seed = seed)
     
-    params = {}
-    for (key, param) in data['params'].items():
-        params[key] = np.array(param)
+    # Snakes saved before the dtype option are in float64
+    dtype = data.get('nn_dtype', 'float64')
+    if nn_params is None:
+        params = {}
+        for (key, param) in data['params'].items():
+            params[key] = np.array(param, dtype=dtype)
+        nn_params = {'nn_params': params}
         
     snake = Snake(game, 
-                  nn_params=params, 
+                  nn_dtype=dtype,
                   vision_type=data['vision_type'],
                   vision_mode=data['vision_mode'], 
                   length=data['length'], 
-                  id=data['id'])
+                  nn_hidden_layers=data.get('nn_hidden_layers', [20, 12]),
+                  id=data['id'],
+                  **nn_params)
     # Snake is init
     # previous_body = snake.body
     # for cell in previous_body:
@@ -160,7 +244,7 @@ def load_snake(filename, game=None, keepseed=True):
 
 def load_params(filename):
     """
-    Load only Neural Network params from a snake json file.
+    Load only Neural Network params from a snake json or npz file.
 
     Parameters
     ----------
@@ -173,49 +257,461 @@ def load_params(filename):
         Neural Network params for weights, biases and activation outputs.
         - W_{i}: weights,
         - b_{i}: biases,
-        - A_{i}: activation outputs.
+        - A_{i}: activation outputs, only saved in json.
     """
     # Open the file
-    with open(filename) as f:
-        data = json.load(f)
+    if _is_npz(filename):
+        data, genome = _load_npz(filename)
+        layer_dimensions = [data['vision_mode']*3 + 4*2] + list(data['nn_hidden_layers']) + [4]
+        layout, _ = genome_layout(layer_dimensions)
+        data['params'] = {key: genome[index].reshape(shape) for (key, (index, shape)) in layout.items()}
+    else:
+        with open(filename) as f:
+            data = json.load(f)
     
+    dtype = data.get('nn_dtype', 'float64')
     params = {'length': data['length'],
               'id': data['id'],
               'vision_mode': data['vision_mode'],
               'vision_type': data['vision_type'],
+              'nn_dtype': dtype,
               'nn_params': {}
               }
     
     for (key, param) in data['params'].items():
-        params['nn_params'][key] = np.array(param)
+        params['nn_params'][key] = np.array(param, dtype=dtype)
     
     return params
 
 
-def load_population(dirpath, game=None):
+def read_genome(filename):
     """
-    Load a population made of snake json files in a directory.
+    Read a snake from a json or npz file as a genome, without creating its
+    Game nor its Snake.
 
     Parameters
     ----------
-    dirpath : str
-        Path to the directory in which all individuals are saved in a json format.
+    filename : str
+        Name of the file to open.
+
+    Returns
+    -------
+    pysnake.snake.SnakeGenome
+        The snake's genome. Its fitness is computed from the saved score 
+        and lifespan. Use its method to_snake() to play it.
+    """
+    if _is_npz(filename):
+        data, genome = _load_npz(filename)
+    else:
+        with open(filename) as f:
+            data = json.load(f)
+        
+    dtype = data.get('nn_dtype', 'float64')
+    snake_params = {'length': data['length'],
+                    'vision_type': data['vision_type'],
+                    'vision_mode': data['vision_mode'],
+                    'nn_hidden_layers': list(data.get('nn_hidden_layers', [20, 12])),
+                    'nn_dtype': dtype}
+    if not _is_npz(filename):
+        # Gather the weights and biases in the layout of the neural network
+        layout, size = genome_layout(nn_layer_dimensions(snake_params['vision_mode'], 
+                                                         snake_params['nn_hidden_layers']))
+        genome = np.empty(size, dtype=dtype)
+        for (key, (index, shape)) in layout.items():
+            genome[index] = np.asarray(data['params'][key], dtype=dtype).ravel()
+            
+    score, lifespan = data.get('score', 0), data.get('lifespan', 0)
+    return SnakeGenome(genome, data['game_shape'], snake_params,
+                       seed = data['seed'],
+                       fitness = compute_fitness(score, lifespan),
+                       score = score,
+                       lifespan = lifespan,
+                       id = data['id'])
+
+
+def load_population(path, game=None, workers=1):
+    """
+    Load a population made of snake json or npz files in a directory, or 
+    saved in a population archive with save_population_archive(). 
+    
+    The individuals are pysnake.snake.SnakeGenome: only their genomes are 
+    loaded, and their Game and Snake are created when they are played, 
+    with their method to_snake(). The genomes of an archive are read from 
+    the file when they are used. The files of a directory are read by
+    several processes with workers > 1.
+
+    Parameters
+    ----------
+    path : str
+        Path to the directory in which all individuals are saved, 
+        or to a population archive.
     game : pysnake.game.Game, optional
-        Game in which to add the population. 
+        Not used, the snakes are added to a game by to_snake(). 
         The default is None.
+    workers : int, optional
+        Number of processes reading the files of a directory. 
+        None uses all the cores. The default is 1.
 
     Returns
     -------
     pysnake.gen.population.Population
         Loaded population.
     """
-    individuals = []
-    files = open_files(dirpath, ext='json')
-    for file in files:
-        snake = load_snake(file)
-        individuals.append(snake)
+    if os.path.isfile(path):
+        return PopulationArchive(path).population()
+    
+    files = open_files(path, ext='.json') + open_files(path, ext='.npz')
+    workers = workers if workers is not None else multiprocessing.cpu_count()
+    if workers > 1 and len(files) > 1:
+        chunk_size = max(1, math.ceil(len(files) / (4 * workers)))
+        with multiprocessing.Pool(workers) as pool:
+            individuals = pool.map(read_genome, files, chunk_size)
+    else:
+        individuals = [read_genome(file) for file in files]
     return Population(individuals)
 
 
+def _align(offset):
+    return -(-offset // _ARCHIVE_ALIGNMENT) * _ARCHIVE_ALIGNMENT
+
+
+def save_population_archive(filename, genomes, board_size, snake_params, seeds, results, 
+                            ids = None, **metadata):
+    """
+    Save an evaluated population of snakes in one binary file, which can be
+    opened as a memory map with PopulationArchive: the genomes are stored
+    in one (P, G) matrix, next to the id, fitness, score, lifespan and seed
+    columns of the individuals.
+    The file is written next to its destination and then renamed.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the archive, e.g. "saves/generation_0.pop".
+    genomes : pysnake.gen.population.GenomePopulation or numpy.ndarray
+        Genomes of the snakes, of shape (P, G).
+    board_size : tuple(int)
+        Shape of the games.
+    snake_params : dict
+        Parameters used to create the snakes.
+    seeds : numpy.ndarray
+        Seed of the game of each snake.
+    results : numpy.ndarray
+        Fitness, score and lifespan of each snake, of shape (P, 3).
+    ids : numpy.ndarray, optional
+        Identifiant of each snake. The default is None, their index.
+    **metadata : parameters
+        Other values to save, serializable in json (e.g. the generation).
+
+    Returns
+    -------
+    None.
+    """
+    genomes = np.asarray(getattr(genomes, "genomes", genomes))
+    num_individuals, genome_size = genomes.shape
+    results = np.asarray(results)
+    columns = np.empty(num_individuals, dtype=_ARCHIVE_COLUMNS)
+    columns["id"] = np.arange(num_individuals) if ids is None else ids
+    columns["fitness"] = results[:, 0]
+    columns["score"] = results[:, 1]
+    columns["lifespan"] = results[:, 2]
+    columns["seed"] = seeds
+    dtype = genomes.dtype.newbyteorder("<")
+    
+    # Positions of the blocks, after the header
+    header = {"version": _ARCHIVE_VERSION,
+              "size": num_individuals,
+              "genome_size": genome_size,
+              "dtype": dtype.str,
+              "board_size": list(board_size),
+              "snake_params": snake_params,
+              "metadata": metadata}
+    offsets = (0, 0)
+    while True:
+        header["columns_offset"], header["genomes_offset"] = offsets
+        header_bytes = json.dumps(header).encode()
+        columns_offset = _align(len(_ARCHIVE_MAGIC) + 4 + len(header_bytes))
+        genomes_offset = _align(columns_offset + columns.nbytes)
+        # The offsets are written in the header, which may move them
+        if offsets == (columns_offset, genomes_offset):
+            break
+        offsets = (columns_offset, genomes_offset)
+    header_bytes = header_bytes.ljust(columns_offset - len(_ARCHIVE_MAGIC) - 4)
+    
+    dirpath = os.path.dirname(filename)
+    if dirpath and not os.path.exists(dirpath):
+        os.makedirs(dirpath)
+    temporary = filename + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(_ARCHIVE_MAGIC)
+        f.write(np.uint32(len(header_bytes)).astype("<u4").tobytes())
+        f.write(header_bytes)
+        f.write(columns.tobytes())
+        f.write(bytes(genomes_offset - columns_offset - columns.nbytes))
+        np.ascontiguousarray(genomes, dtype=dtype).tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, filename)
+
+
+class PopulationArchive:
+    """
+    Population of snakes saved with save_population_archive(), opened as a
+    memory map: only the genomes which are used are read from the file,
+    e.g. to get the best snakes of a large population.
+    
+    Attributes
+    ----------
+    filename : str
+        Path to the archive.
+    board_size : tuple(int)
+        Shape of the games.
+    snake_params : dict
+        Parameters used to create the snakes.
+    metadata : dict
+        Other saved values.
+    columns : numpy.memmap
+        Id, fitness, score, lifespan and seed of the snakes, 
+        as a structured array of shape (P,).
+    genomes : numpy.memmap
+        Genomes of the snakes, of shape (P, G).
+    size : int
+        Number of snakes.
+    
+    Example
+    -------
+        >>> archive = PopulationArchive("saves/generation_0.pop")
+        >>> best = archive.top(10)
+        >>> snake = best[0].to_snake()
+    """
+    
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            magic = f.read(len(_ARCHIVE_MAGIC))
+            if magic != _ARCHIVE_MAGIC:
+                raise ValueError("'{}' is not a population archive".format(filename))
+            header_length = int(np.frombuffer(f.read(4), dtype="<u4")[0])
+            header = json.loads(f.read(header_length).decode())
+        if header["version"] > _ARCHIVE_VERSION:
+            raise ValueError("population archive version {} is not supported".format(header["version"]))
+            
+        self.board_size = tuple(header["board_size"])
+        self.snake_params = header["snake_params"]
+        self.metadata = header["metadata"]
+        self.__size = header["size"]
+        shape = (header["size"], header["genome_size"])
+        if header["size"] > 0:
+            self.columns = np.memmap(filename, dtype=_ARCHIVE_COLUMNS, mode="r",
+                                     offset=header["columns_offset"], shape=shape[:1])
+            self.genomes = np.memmap(filename, dtype=np.dtype(header["dtype"]), mode="r",
+                                     offset=header["genomes_offset"], shape=shape)
+        else:
+            self.columns = np.empty(0, dtype=_ARCHIVE_COLUMNS)
+            self.genomes = np.empty(shape, dtype=np.dtype(header["dtype"]))
+            
+            
+    # -------------------------------------------------------------------------
+    # Methods
+    
+    def individual(self, index):
+        """
+        Get one snake, without reading the others.
+
+        Parameters
+        ----------
+        index : int
+            Index of the snake in the archive.
+
+        Returns
+        -------
+        pysnake.snake.SnakeGenome
+            The snake, whose genome is a read-only view of the file.
+        """
+        row = self.columns[index]
+        return SnakeGenome(self.genomes[index], self.board_size, self.snake_params,
+                           seed = int(row["seed"]),
+                           fitness = float(row["fitness"]),
+                           score = int(row["score"]),
+                           lifespan = int(row["lifespan"]),
+                           id = int(row["id"]))
+        
+    def top(self, num_individuals):
+        """
+        Get the best snakes. Only their genomes are read.
+
+        Parameters
+        ----------
+        num_individuals : int
+            Number of snakes to get.
+
+        Returns
+        -------
+        list(pysnake.snake.SnakeGenome)
+            The best snakes, from the best one.
+        """
+        indices = elitism(np.asarray(self.columns["fitness"]), num_individuals)
+        return [self.individual(index) for index in indices]
+    
+    def snake(self, index, game = None, keepseed = True):
+        """
+        Create one snake of the archive, to play it.
+
+        Parameters
+        ----------
+        index : int
+            Index of the snake in the archive.
+        game : pysnake.game.Game, optional
+            Game in which to add the Snake. The default is None.
+        keepseed : bool, optional
+            Create the game with the seed of the evaluation. 
+            The default is True.
+
+        Returns
+        -------
+        pysnake.snake.Snake
+            The snake.
+        """
+        return self.individual(index).to_snake(game = game, keepseed = keepseed)
+    
+    def population(self):
+        """
+        Population of all the snakes, whose genomes are read when they are used.
+
+        Returns
+        -------
+        pysnake.gen.population.Population
+            Population of pysnake.snake.SnakeGenome.
+        """
+        return Population([self.individual(index) for index in range(self.size)])
+    
+    
+    # -------------------------------------------------------------------------
+    # Getters and setters
+    
+    @property
+    def size(self):
+        return self.__size
+    
+    @size.setter
+    def size(self, value):
+        raise AttributeError("attribute 'size' of 'PopulationArchive' objects is not writable.")
+    
+    @property
+    def fittest(self):
+        return self.top(1)[0]
+    
+    @fittest.setter
+    def fittest(self, value):
+        raise AttributeError("attribute 'fittest' of 'PopulationArchive' objects is not writable.")
+        
+    
+    # -------------------------------------------------------------------------
+    # Access
+    
+    def __len__(self):
+        return self.size
+    
+    def __getitem__(self, index):
+        return self.individual(index)
+
+
+def save_checkpoint(filename, genomes, generation, seeds, results, fitness_history, 
+                    seed, random_state = None, **metadata):
+    """
+    Save the state of a training in a .npz file, atomically: the file is
+    written next to its destination and then renamed, so that a crash 
+    never leaves a partial checkpoint. The state of the random generator
+    used to breed the generations is saved as well.
 
+    Parameters
+    ----------
+    filename : str
+        Path to the checkpoint.
+    genomes : pysnake.gen.population.GenomePopulation
+        Last evaluated generation.
+    generation : int
+        Index of the last evaluated generation.
+    seeds : numpy.ndarray
+        Seed of the game of each individual of the generation.
+    results : numpy.ndarray
+        Fitness, score and lifespan of each individual of the generation.
+    fitness_history : list(float)
+        Mean fitness of all evaluated generations.
+    seed : int
+        Seed of the next generation.
+    random_state : numpy.random.RandomState, optional
+        Random generator of the breeding. The default is None, numpy's 
+        global generator.
+    **metadata : parameters
+        Other values to save, serializable in json (e.g. the snakes' parameters).
 
+    Returns
+    -------
+    None.
+    """
+    np_state = (np.random if random_state is None else random_state).get_state()
+    state = {"generation": int(generation),
+             "seed": int(seed),
+             "population_id": genomes.id,
+             "numpy_random_state": [np_state[0], int(np_state[2]), int(np_state[3]), float(np_state[4])],
+             "metadata": metadata}
+    
+    dirpath = os.path.dirname(filename)
+    if dirpath and not os.path.exists(dirpath):
+        os.makedirs(dirpath)
+    temporary = filename + ".tmp"
+    with open(temporary, "wb") as f:
+        np.savez(f,
+                 genomes = genomes.genomes,
+                 chromosome_ids = np.array(genomes.chromosome_ids, dtype=str),
+                 chromosome_slices = np.array([(index.start, index.stop) for index in genomes.chromosome_slices]),
+                 seeds = np.asarray(seeds),
+                 results = np.asarray(results),
+                 fitness_history = np.asarray(fitness_history, dtype=float),
+                 numpy_random_keys = np_state[1],
+                 state = np.array(json.dumps(state)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, filename)
+        
+
+def load_checkpoint(filename):
+    """
+    Load the state of a training saved with save_checkpoint().
+
+    Parameters
+    ----------
+    filename : str
+        Path to the checkpoint.
+
+    Returns
+    -------
+    dict
+        - genomes: last evaluated generation, with its fitness,
+        - generation: index of this generation,
+        - seeds: seed of the game of each individual,
+        - results: fitness, score and lifespan of each individual,
+        - fitness_history: mean fitness of all evaluated generations,
+        - seed: seed of the next generation,
+        - random_state: random generator of the breeding, as saved,
+        - metadata: other saved values.
+    """
+    with np.load(filename) as data:
+        state = json.loads(str(data["state"]))
+        chromosome_slices = [slice(int(start), int(stop)) for (start, stop) in data["chromosome_slices"]]
+        results = data["results"]
+        genomes = GenomePopulation(data["genomes"], data["chromosome_ids"].tolist(), chromosome_slices,
+                                   fitness = results[:, 0], id = state["population_id"])
+        checkpoint = {"genomes": genomes,
+                      "generation": state["generation"],
+                      "seeds": data["seeds"],
+                      "results": results,
+                      "fitness_history": data["fitness_history"].tolist(),
+                      "seed": state["seed"],
+                      "metadata": state["metadata"]}
+        name, pos, has_gauss, cached_gaussian = state["numpy_random_state"]
+        random_state = np.random.RandomState()
+        random_state.set_state((name, data["numpy_random_keys"], pos, has_gauss, cached_gaussian))
+        checkpoint["random_state"] = random_state
+    return checkpoint
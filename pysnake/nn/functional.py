@@ -6,7 +6,7 @@
 import numpy as np
 
 
-def softmax(X):
+def softmax(X, axis=0):
     """
     Compute and return the softmax of the input.
 
@@ -14,6 +14,8 @@ def softmax(X):
     ----------
     X : numpy.ndarray
         Inputs of floats with shape [n, m]
+    axis : int, optional
+        Axis of the classes. The default is 0.
         
     Returns
     -------
@@ -22,7 +24,7 @@ def softmax(X):
     """
 
     exp = np.exp(X)
-    t = X - np.log(np.sum(exp, axis=0))
+    t = X - np.log(np.sum(exp, axis=axis, keepdims=True))
     S = np.exp(t)
     return S
 
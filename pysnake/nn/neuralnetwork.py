@@ -7,14 +7,61 @@ import numpy as np
 from pysnake.nn.functional import softmax, relu
 
 
+def genome_layout(layer_dimensions):
+    """
+    Position of the weights and biases of a network in its flat genome.
+    The parameters are stored one after the other, in the order 
+    W_1, b_1, W_2, b_2, etc.
+
+    Parameters
+    ----------
+    layer_dimensions : list(int)
+        Number of nodes in each layer, including the input and output layers.
+
+    Returns
+    -------
+    layout : dict
+        Slice of the genome and shape of each parameter, indexed by its name.
+    size : int
+        Number of genes.
+    """
+    layout = {}
+    start = 0
+    for i in range(1, len(layer_dimensions)):
+        W_shape = (layer_dimensions[i - 1], layer_dimensions[i])
+        b_shape = (layer_dimensions[i], 1)
+        for (key, shape) in [("W_" + str(i), W_shape), ("b_" + str(i), b_shape)]:
+            end = start + shape[0] * shape[1]
+            layout[key] = (slice(start, end), shape)
+            start = end
+    return layout, start
+
+
+
 class NeuralNetwork(object):
     """
     Multi Layer Perceptron.
+    
+    The parameters and the computations use the floating point type dtype,
+    float64 by default. Parameters given with another type are converted.
+    
+    All weights and biases live in one contiguous 1-D array, the genome.
+    params['W_i'] and params['b_i'] are reshaped views of this array, so 
+    modifying the genome in place (e.g. chromosomes mutations) directly 
+    updates the network.
     """
     
-    def __init__(self, layer_dimensions, params = None, activation_function = relu):
+    def __init__(self, layer_dimensions, params = None, activation_function = relu, dtype = np.float64, genome = None):
         self.layer_dimensions = layer_dimensions
-        self.params = params if params is not None else self._init_params(layer_dimensions)
+        self.dtype = np.dtype(dtype)
+        self.layout, self.genome_size = genome_layout(layer_dimensions)
+        if genome is None:
+            params = params if params is not None else self._init_params(layer_dimensions)
+            genome = self._pack_params(params)
+        else:
+            params = {}
+        self.genome = self._check_genome(genome)
+        self.params = self._view_params(params)
         self.activation_function = activation_function
     
         
@@ -49,14 +96,81 @@ class NeuralNetwork(object):
             sigma = np.sqrt(var)
             # Weights
             W_shape = (layer_dimensions[i - 1], layer_dimensions[i])
-            W = np.random.normal(loc=mu, scale=sigma, size=W_shape)
-            b = np.zeros((layer_dimensions[i], 1))
+            # Always draw float64 numbers, to get the same weights for all dtypes
+            W = np.random.normal(loc=mu, scale=sigma, size=W_shape).astype(self.dtype)
+            b = np.zeros((layer_dimensions[i], 1), dtype=self.dtype)
             # Saving in the param dict
             layer_W = "W_" + str(i)
             params[layer_W] = W
             layer_b = "b_" + str(i)
             params[layer_b] = b
         return params
+    
+    
+    def _pack_params(self, params):
+        """
+        Copy the weights and biases in a new genome of type dtype.
+
+        Parameters
+        ----------
+        params : dict
+            Weights, biases and activation outputs.
+
+        Returns
+        -------
+        genome : numpy.ndarray
+            Flat array of the weights and biases.
+        """
+        genome = np.empty(self.genome_size, dtype=self.dtype)
+        for (key, (index, shape)) in self.layout.items():
+            genome[index] = np.reshape(params[key], -1)
+        return genome
+    
+    
+    def _check_genome(self, genome):
+        """
+        Make sure the genome is a flat array of type dtype and of the right size.
+        A genome already in this type is not copied.
+
+        Parameters
+        ----------
+        genome : numpy.ndarray
+            Flat array of the weights and biases.
+
+        Returns
+        -------
+        numpy.ndarray
+            The genome.
+        """
+        genome = np.asarray(genome, dtype=self.dtype)
+        if genome.shape != (self.genome_size,):
+            raise ValueError("the genome should be a flat array of {0} genes, got shape {1}."
+                             .format(self.genome_size, genome.shape))
+        return genome
+    
+    
+    def _view_params(self, params):
+        """
+        Create the weights and biases as reshaped views of the genome.
+        Other parameters (activation outputs) are kept.
+
+        Parameters
+        ----------
+        params : dict
+            Weights, biases and activation outputs.
+
+        Returns
+        -------
+        dict
+            Parameters, whose weights and biases share the genome's memory.
+        """
+        views = {}
+        for (key, (index, shape)) in self.layout.items():
+            views[key] = self.genome[index].reshape(shape)
+        for (key, param) in params.items():
+            if key not in self.layout:
+                views[key] = param
+        return views
              
     
     def forward(self, X_batch):
@@ -76,7 +190,7 @@ class NeuralNetwork(object):
         layer_dimensions = self.layer_dimensions
         depth = len(layer_dimensions) - 1
         # 1/ Iterates through the depth of the neural network
-        Z = X_batch   
+        Z = X_batch.astype(self.dtype, copy=False)
         self.params['A_0'] = Z
         for i in range(1, depth + 1):
             # 1.1/ Get the weights and biases from the params       
@@ -100,4 +214,227 @@ class NeuralNetwork(object):
         self.params['A_' + str(i)] = Y_proposed
     
         return Y_proposed
-    
\ No newline at end of file
+    
+
+
+class BatchedNeuralNetwork(object):
+    """
+    Population of Multi Layer Perceptrons sharing the same architecture.
+    The weights and biases of all networks are stacked, so that the outputs
+    of the P networks are computed with one matrix product per layer.
+    
+    Attributes
+    ----------
+    layer_dimensions: list(int)
+        Number of nodes in each layer, shared by all networks.
+    params: dict(numpy.ndarray)
+        Stacked parameters of the networks:
+        - W_{i}: weights of shape (P, n^[i-1], n^[i]),
+        - b_{i}: biases of shape (P, n^[i], 1),
+        - A_{i}: activation outputs of shape (P, n^[i], batch_size).
+    dtype: numpy.dtype
+        Floating point type of the parameters and computations.
+        The default is the type of the given parameters.
+    size: int
+        Number of networks P.
+        
+    Example
+    -------
+        >>> networks = BatchedNeuralNetwork(snake.nn_layers_dimension, 
+        ...                                 [snake.nn.params for snake in snakes])
+            # One row of inputs per snake
+        >>> X = np.stack([snake.compute_input()[:, 0] for snake in snakes])
+        >>> networks.predict(X)
+            array([2, 0, 0, 3, ...])
+    """
+    
+    def __init__(self, layer_dimensions, params_list, activation_function = relu, dtype = None):
+        self.layer_dimensions = layer_dimensions
+        self.dtype = np.dtype(dtype) if dtype is not None else None
+        self.params = self._stack_params(params_list)
+        self.activation_function = activation_function
+        
+        
+    @classmethod
+    def from_networks(cls, networks):
+        """
+        Stack neural networks with the same architecture.
+
+        Parameters
+        ----------
+        networks : list(pysnake.nn.neuralnetwork.NeuralNetwork)
+            Networks to evaluate together.
+
+        Returns
+        -------
+        pysnake.nn.neuralnetwork.BatchedNeuralNetwork
+            The stacked networks.
+        """
+        layer_dimensions = networks[0].layer_dimensions
+        for network in networks:
+            assert list(network.layer_dimensions) == list(layer_dimensions), (
+                "All networks must have the same layer dimensions.")
+        return cls(layer_dimensions, [network.params for network in networks],
+                   activation_function = networks[0].activation_function,
+                   dtype = networks[0].dtype)
+
+
+    @classmethod
+    def from_genomes(cls, layer_dimensions, genomes, activation_function = relu, dtype = None):
+        """
+        Stack networks from a matrix of flat genomes, see genome_layout().
+
+        Parameters
+        ----------
+        layer_dimensions : list(int)
+            Number of nodes in each layer, shared by all networks.
+        genomes : numpy.ndarray
+            Genomes of the networks, of shape (P, G).
+        activation_function : function, optional
+            Activation of the hidden layers. The default is relu.
+        dtype : numpy.dtype, optional
+            Floating point type of the computations.
+            The default is the type of the genomes.
+
+        Returns
+        -------
+        pysnake.nn.neuralnetwork.BatchedNeuralNetwork
+            The stacked networks.
+        """
+        genomes = np.asarray(genomes)
+        layout, size = genome_layout(layer_dimensions)
+        assert genomes.ndim == 2 and genomes.shape[1] == size, (
+            "Genomes of shape {} do not match the layer dimensions, {} genes expected."
+            .format(genomes.shape, size))
+        # Each network's parameters are reshaped rows slices of the matrix
+        num_networks = len(genomes)
+        params = {key: np.reshape(genomes[:, layer_slice], (num_networks,) + shape)
+                  for (key, (layer_slice, shape)) in layout.items()}
+        networks = cls.__new__(cls)
+        networks.layer_dimensions = layer_dimensions
+        networks.dtype = np.dtype(dtype) if dtype is not None else None
+        networks.params = networks._cast_params(params)
+        networks.activation_function = activation_function
+        return networks
+
+
+    # -------------------------------------------------------------------------
+    # Methods
+    
+    def _stack_params(self, params_list):
+        """
+        Stack the weights and biases of several networks.
+
+        Parameters
+        ----------
+        params_list : list(dict)
+            Parameters of each network, as in NeuralNetwork.params or as decoded
+            from chromosomes with Snake.decode_chromosomes(). 
+            Activation outputs are ignored.
+
+        Returns
+        -------
+        params : dict
+            Stacked weights and biases.
+        """
+        params = {}
+        depth = len(self.layer_dimensions)
+        for i in range(1, depth):
+            layer_W = "W_" + str(i)
+            layer_b = "b_" + str(i)
+            W_shape = (self.layer_dimensions[i - 1], self.layer_dimensions[i])
+            b_shape = (self.layer_dimensions[i], 1)
+            params[layer_W] = np.stack([np.reshape(p[layer_W], W_shape) for p in params_list])
+            params[layer_b] = np.stack([np.reshape(p[layer_b], b_shape) for p in params_list])
+        return self._cast_params(params)
+    
+    
+    def _cast_params(self, params):
+        """
+        Convert stacked parameters to the type of the networks.
+
+        Parameters
+        ----------
+        params : dict
+            Stacked weights and biases.
+
+        Returns
+        -------
+        params : dict
+            Stacked weights and biases of type self.dtype.
+        """
+        # Use the type of the parameters by default
+        if self.dtype is None:
+            self.dtype = params["W_1"].dtype
+        for (key, param) in params.items():
+            params[key] = param.astype(self.dtype, copy=False)
+        return params
+    
+    
+    def forward(self, X_batch):
+        """
+        One forward step for all networks.
+
+        Parameters
+        ----------
+        X_batch : numpy.ndarray
+            Inputs of shape (P, n^[0], batch_size), or (P, n^[0]) for one
+            input per network.
+
+        Returns
+        -------
+        Y_proposed : numpy.ndarray
+            Outputs of shape (P, n^[L], batch_size), or (P, n^[L]).
+            Y_proposed[p] is the output of NeuralNetwork.forward() for the 
+            network p and its inputs X_batch[p].
+        """
+        Z = X_batch.astype(self.dtype, copy=False)
+        is_vector = Z.ndim == 2
+        if is_vector:
+            Z = Z[:, :, np.newaxis]
+        
+        depth = len(self.layer_dimensions) - 1
+        self.params['A_0'] = Z
+        for i in range(1, depth + 1):
+            W = self.params["W_" + str(i)]
+            b = self.params["b_" + str(i)]
+            # Compute the outputs of all networks at once
+            Z = np.matmul(W.transpose(0, 2, 1), Z) + b
+            # Activation in the hidden layers
+            if i < depth:
+                Z = self.activation_function(Z)
+                self.params['A_' + str(i)] = Z
+        
+        # Softmax over the classes
+        Y_proposed = softmax(Z, axis=1)
+        self.params['A_' + str(depth)] = Y_proposed
+        
+        if is_vector:
+            return Y_proposed[:, :, 0]
+        return Y_proposed
+    
+    
+    def predict(self, X_batch):
+        """
+        Get the predicted class of all networks.
+
+        Parameters
+        ----------
+        X_batch : numpy.ndarray
+            Inputs of shape (P, n^[0], batch_size), or (P, n^[0]).
+
+        Returns
+        -------
+        numpy.ndarray
+            Predicted classes of shape (P, batch_size), or (P,).
+        """
+        return np.argmax(self.forward(X_batch), axis=1)
+    
+    
+    @property
+    def size(self):
+        return self.params["W_1"].shape[0]
+    
+    @size.setter
+    def size(self, value):
+        raise AttributeError("attribute 'size' of 'BatchedNeuralNetwork' objects is not writable.")
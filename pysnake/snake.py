@@ -5,17 +5,18 @@
 
 import numpy as np
 import random as rd
+from collections import deque
 
 # PySnake modules
-from pysnake.utils import one_hot_direction
+from pysnake.utils import ONE_HOT_DIRECTIONS
 # Snake Game
-from pysnake.vision import FullVision
+from pysnake.vision import FullVision, get_ray_table, detect_items, encode_binary
 from pysnake.enum import Direction, Item
 from pysnake.grid import Cell
 # Neural Network
-from pysnake.nn.neuralnetwork import NeuralNetwork
+from pysnake.nn.neuralnetwork import NeuralNetwork, genome_layout
 # Genetic Algo
-from pysnake.gen.individual import Individual
+from pysnake.gen.individual import Individual, GenomeIndividual
 from pysnake.gen.chromosome import Chromosome
 
 
@@ -34,8 +35,8 @@ class Snake(Individual):
     length: int, optional
         The initial length of the snake. 
         Default is 3.
-    body: list(pysnake.grid.Cell)
-        List of cells composing the snake.
+    body: pysnake.snake.BodyView
+        Read-only sequence of cells composing the snake, from its tail to its head.
     direction: pysnake.enum.Direction
         Direction of the snake movement.
         This direction is used as input in the neural network.
@@ -75,6 +76,15 @@ class Snake(Individual):
         Neural network parameters for weights, biases and activation output.
         These parameters are used as chromosomes (reshaped as 1D array) 
         in the genetic algorithm.
+    nn_dtype: str, optional
+        Floating point type of the neural network and chromosomes,
+        either "float32" or "float64".
+        Default is "float64".
+    genome: numpy.ndarray
+        Flat array of all the neural network's weights and biases.
+        nn_params weights and biases and the chromosomes are views of it.
+        A genome given at creation (e.g. a row of a GenomePopulation) is
+        used without copy.
     """
     
     def __init__(self, game, 
@@ -83,8 +93,10 @@ class Snake(Individual):
                  vision_mode = 8, 
                  vision_type = "distance",
                  chromosomes = None,
+                 genome = None,
                  nn_hidden_layers = [20, 12],
                  nn_params = None, 
+                 nn_dtype = "float64",
                  lifespan_max = None,
                  hunger_max = 300, **kwargs):
 
@@ -98,7 +110,10 @@ class Snake(Individual):
         
         # Body
         self.length = length
-        self.body = self._init_body()
+        self._body = deque(self._init_body())
+        self._body_cells = set(self._body)
+        # Read-only view, created once
+        self._body_view = BodyView(self._body)
         
         # Snake's directions
         self.direction = self._init_direction()
@@ -116,21 +131,27 @@ class Snake(Individual):
         # Vision
         self.vision_mode = vision_mode
         self.vision_type = vision_type
-        head = self.body[-1]
+        head = self._body[-1]
         angle = self.bearing
         vision_max_length = None  
         self.full_vision = FullVision(game.grid, head, angle, vision_max_length, vision_mode)
         
         # Neural Network
         self.nn_hidden_layers = nn_hidden_layers
-        self.nn_layers_dimension = [self.vision_mode*3 + 4*2] + list(self.nn_hidden_layers) + [4]
-        params = self.decode_chromosomes(chromosomes) if chromosomes is not None else nn_params
-        self.nn = NeuralNetwork(self.nn_layers_dimension, params=params)
+        self.nn_layers_dimension = nn_layer_dimensions(self.vision_mode, self.nn_hidden_layers)
+        self.nn_dtype = np.dtype(nn_dtype).name
+        # Input of the neural network, updated in place at each step
+        self._input = np.zeros((self.nn_layers_dimension[0], 1), dtype=self.nn_dtype)
+        self._input_visible = np.empty(self.vision_mode*3, dtype=self.nn_dtype)
+        if genome is None and chromosomes is not None:
+            genome = self.decode_genome(chromosomes)
+        self.nn = NeuralNetwork(self.nn_layers_dimension, params=nn_params, genome=genome, dtype=self.nn_dtype)
         # Initialize the first activation (the value is used to display the neurons)
         self.next_direction()
         self.nn_params = self.nn.params
                 
-        # Create chromosomes from the Neural Networks's weights and bias
+        # Create chromosomes from the Neural Networks's weights and bias,
+        # as views of its genome
         chromosomes = self.encode_chromosomes()
         # Create an individual from chromosomes
         super().__init__(chromosomes, **kwargs)
@@ -142,6 +163,8 @@ class Snake(Individual):
     def encode_chromosomes(self):
         """
         Encode chromosomes from NeuralNetwork params weight and bias.
+        The chromosomes are slices of the network's genome: mutating them
+        updates the network in place.
 
         Returns
         -------
@@ -150,13 +173,35 @@ class Snake(Individual):
             weight and bias.
         """
         chromosomes = []
-        for (key, param) in self.nn.params.items():
-            if key[0] == 'W' or key[0] == 'b':
-                chromosome = Chromosome(param.reshape(param.size), id=key, enable_crossover=True)
-                chromosomes.append(chromosome)
+        for (key, (index, shape)) in self.nn.layout.items():
+            chromosome = Chromosome(self.nn.genome[index], id=key, enable_crossover=True)
+            chromosomes.append(chromosome)
         return chromosomes
     
     
+    def decode_genome(self, chromosomes):
+        """
+        Gather chromosomes in one flat genome, in the layout of the Neural Network.
+
+        Parameters
+        ----------
+        chromosomes : list(pysnake.gen.chromosome.Chromosome)
+            List of chromosome coding the genes from neural network
+            weight and bias.
+
+        Returns
+        -------
+        genome : numpy.ndarray
+            Flat array of all weights and biases.
+        """
+        layout, size = genome_layout(self.nn_layers_dimension)
+        genome = np.empty(size, dtype=self.nn_dtype)
+        for chromosome in chromosomes:
+            index, _ = layout[chromosome.id]
+            genome[index] = chromosome.genes
+        return genome
+    
+    
     def decode_chromosomes(self, chromosomes):
         """
         Transform and reshape chromosomes to Neural Network params.
@@ -203,9 +248,7 @@ class Snake(Individual):
         -------
         None.
         """
-        self.fitness = ((self.lifespan) + ((2**self.score) + (self.score**2.1)*500) - 
-                        ((.25 * self.lifespan)**1.3 * (self.score**1.2)))
-        self.fitness = max(self.fitness, .1)
+        self.fitness = compute_fitness(self.score, self.lifespan)
    
     
     # -------------------------------------------------------------------------
@@ -224,6 +267,40 @@ class Snake(Individual):
         return bearing
                     
     
+    @property
+    def genome(self):
+        return self.nn.genome
+
+    @genome.setter
+    def genome(self, value):
+        raise AttributeError("attribute 'genome' of 'Snake' objects is not writable.")
+
+    @property
+    def body(self):
+        return self._body_view
+    
+    @body.setter
+    def body(self, value):
+        raise AttributeError("attribute 'body' of 'Snake' objects is not writable.")
+            
+    
+    def occupies(self, cell):
+        """
+        Checks if the snake's body contains a cell, in constant time.
+
+        Parameters
+        ----------
+        cell : pysnake.grid.Cell
+            Cell to check.
+
+        Returns
+        -------
+        bool
+            True if the cell's coordinates are part of the body.
+        """
+        return Cell(cell.coord, Item.SNAKE) in self._body_cells
+                    
+    
     def _init_body(self):
         """
         Randomly initialize snake's cells, and stack them to its body.
@@ -268,7 +345,7 @@ class Snake(Individual):
             Available direction of the snake.
         """
         # Get available cells near its head
-        head = self.body[-1]
+        head = self._body[-1]
         head_i, head_j = head.coord
         surrounding_cells = [self.game.grid[head_i - 1, head_j],
                              self.game.grid[head_i + 1, head_j],
@@ -306,8 +383,8 @@ class Snake(Individual):
             DESCRIPTION.
         """
         # Difference from two cells
-        tail1 = self.body[0]
-        tail2 = self.body[1]
+        tail1 = self._body[0]
+        tail2 = self._body[1]
         delta_i = tail1.coord[0] - tail2.coord[0]
         delta_j = tail1.coord[1] - tail2.coord[1]
         if delta_i < 0 and delta_j == 0:
@@ -327,7 +404,8 @@ class Snake(Individual):
                   "lifespan_max": self.lifespan_max,
                   "hunger_max": self.hunger_max,
                   "nn_hidden_layers": self.nn_hidden_layers,
-                  "nn_params": self.nn_params
+                  "nn_params": self.nn_params,
+                  "nn_dtype": self.nn_dtype
                   }
     
         return params
@@ -342,7 +420,7 @@ class Snake(Individual):
         -------
         None.
         """
-        for cell in self.body:
+        for cell in self._body:
             self.game.grid.set_empty(cell.coord)
                  
 
@@ -356,7 +434,7 @@ class Snake(Individual):
             New head cell from a given direction.
         """
         # Get the current head coordinates
-        head = self.body[-1] # Last element
+        head = self._body[-1] # Last element
         head_coord = head.coord
         
         # Switch / Case for all directions
@@ -383,31 +461,32 @@ class Snake(Individual):
         -------
         X: numpy.ndarray
             One column vector of shape (size_input, 1) used as input vector
-            in the neural network.
+            in the neural network. This array belongs to the snake and is 
+            overwritten at each call, copy it to keep its values.
         """
-        # Set the input array for the neural network
-        X = np.array([])
+        # Write in the input array of the neural network
+        X = self._input
+        vision = X[:-8, 0]
         # Binary vision
         if self.vision_type == "binary":
-            for vision in self.full_vision:
-                X = np.concatenate((X, vision.to_binary()))
+            self.full_vision.to_binary(out=vision)
         # Distance mode
         else:
-            for vision in self.full_vision:
-                distances = vision.to_distances()
-                normalized_distances = np.divide(1, distances, 
-                                                 out=np.zeros_like(distances), 
-                                                 where=distances!=0)
-                X = np.concatenate((X, normalized_distances))
+            self.full_vision.to_distances(out=vision)
+            # Inverse of the distances, which are at least 1 for visible items
+            # and 0 otherwise: 1 / max(d, 1) * min(d, 1)
+            visible = self._input_visible
+            np.minimum(vision, 1, out=visible)
+            np.maximum(vision, 1, out=vision)
+            np.reciprocal(vision, out=vision)
+            np.multiply(vision, visible, out=vision)
         
         # Add the one hot encoded direction vectors
-        one_hot_tail = one_hot_direction(self.tail_direction)
-        X = np.concatenate((X, one_hot_tail))
+        X[-8:-4, 0] = ONE_HOT_DIRECTIONS[self.tail_direction.value // 90]
         # Idem for its direction
-        one_hot = one_hot_direction(self.direction)
-        X = np.concatenate((X, one_hot))
+        X[-4:, 0] = ONE_HOT_DIRECTIONS[self.direction.value // 90]
                 
-        return X[:, np.newaxis]
+        return X
     
     
     def compute_output(self, X):
@@ -452,7 +531,7 @@ class Snake(Individual):
         # Update the bearing
         bearing = self._get_bearing()
         self.bearing = bearing
-        head = self.body[-1]
+        head = self._body[-1]
         # Update the vision
         self.full_vision.update(head, bearing)
         
@@ -465,7 +544,7 @@ class Snake(Individual):
         -------
         None.
         """
-        head = self.body[-1]
+        head = self._body[-1]
         self.full_vision.update(head, self.bearing)
         self.tail_direction = self.get_tail_direction()
         
@@ -490,15 +569,16 @@ class Snake(Individual):
             # The snake died
             return False
         
-        # Then test if it eat itself
-        elif grid.is_snake(new_head):
+        # Then test if it eat itself, or another snake
+        elif new_head in self._body_cells or grid.is_snake(new_head):
             # The snake died
             return False
         
         # Test if it grows
         elif grid.is_apple(new_head):
             # Update the body
-            self.body.append(new_head)
+            self._body.append(new_head)
+            self._body_cells.add(new_head)
    
             # Update the game / grid
             grid.set_cell(new_head)   
@@ -515,8 +595,10 @@ class Snake(Individual):
         # Move the snake
         else:
             # Update the body
-            self.body.append(new_head)
-            previous_tail = self.body.pop(0)
+            self._body.append(new_head)
+            self._body_cells.add(new_head)
+            previous_tail = self._body.popleft()
+            self._body_cells.discard(previous_tail)
             
             # Update the game
             grid.set_cell(new_head)
@@ -542,4 +624,239 @@ class Snake(Individual):
     
     
     
-    
\ No newline at end of file
+    
+
+
+
+
+class SnakeGenome(GenomeIndividual):
+    """
+    Genome of an evaluated snake, with the results of its game. No Game nor 
+    Snake is created: use to_snake() to replay it.
+    
+    Attributes
+    ----------
+    genome : numpy.ndarray
+        Genome of the snake's neural network.
+    board_size : tuple(int)
+        Shape of the game's grid.
+    snake_params : dict
+        Parameters used to create the snake.
+    seed : int
+        Seed of the game in which the snake was evaluated.
+    fitness : float
+        Fitness of the snake.
+    score : int
+        Number of apples the snake ate.
+    lifespan : int
+        Number of steps the snake survived.
+        
+    Example
+    -------
+        >>> archive = PopulationArchive("saves/generation_0.pop")
+        >>> snake = archive[0].to_snake()
+    """
+    
+    def __init__(self, genome, board_size, snake_params, seed = None, 
+                 fitness = 0, score = 0, lifespan = 0, id = None):
+        self.board_size = tuple(board_size)
+        self.snake_params = snake_params
+        self.seed = seed
+        self.score = score
+        self.lifespan = lifespan
+        layer_dimensions = nn_layer_dimensions(snake_params.get("vision_mode", 8),
+                                               snake_params.get("nn_hidden_layers", [20, 12]))
+        layout, _ = genome_layout(layer_dimensions)
+        chromosome_ids = list(layout)
+        chromosome_slices = [index for (index, shape) in layout.values()]
+        super().__init__(genome, chromosome_ids, chromosome_slices, fitness = fitness, id = id)
+        
+    def to_snake(self, game = None, keepseed = True):
+        """
+        Create the snake, with a copy of the genome.
+
+        Parameters
+        ----------
+        game : pysnake.game.Game, optional
+            Game in which to add the Snake. 
+            The default is None, a new game of shape board_size.
+        keepseed : bool, optional
+            Create the game with the seed of the evaluation, to replay it.
+            The default is True.
+
+        Returns
+        -------
+        snake : pysnake.snake.Snake
+            The snake, with its fitness, score and lifespan.
+        """
+        from pysnake.game import Game
+        
+        if game is None:
+            seed = self.seed if keepseed else None
+            game = Game(self.board_size, seed = seed)
+        snake = Snake(game, genome = np.array(self.genome), id = self.id, **self.snake_params)
+        snake.fitness, snake.score, snake.lifespan = self.fitness, self.score, self.lifespan
+        return snake
+
+
+
+class BodyView:
+    """
+    Read-only view of a snake's body. The first cell is the tail, 
+    and the last one is the head.
+    
+    Example
+    -------
+        >>> head = snake.body[-1]
+        >>> tail = snake.body[0]
+        >>> len(snake.body)
+            3
+    """
+    
+    __slots__ = ('_cells',)
+    
+    def __init__(self, cells):
+        self._cells = cells
+        
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._cells)[index]
+        return self._cells[index]
+    
+    def __len__(self):
+        return len(self._cells)
+    
+    def __iter__(self):
+        return iter(self._cells)
+    
+    def __reversed__(self):
+        return reversed(self._cells)
+    
+    def __eq__(self, other):
+        return list(self) == list(other)
+    
+    def __repr__(self):
+        return "BodyView({0})".format(list(self._cells))
+
+
+
+def nn_layer_dimensions(vision_mode = 8, nn_hidden_layers = [20, 12]):
+    """
+    Dimensions of the layers of a snake's neural network.
+
+    Parameters
+    ----------
+    vision_mode : int, optional
+        Number of visions. The default is 8.
+    nn_hidden_layers : list(int), optional
+        Dimensions of the hidden layers. The default is [20, 12].
+
+    Returns
+    -------
+    list(int)
+        Dimensions of the input, hidden and output layers.
+    """
+    return [vision_mode*3 + 4*2] + list(nn_hidden_layers) + [4]
+
+
+
+def compute_fitness(score, lifespan):
+    """
+    Fitness / rewards of a snake depending on its score and lifespan.
+
+    Parameters
+    ----------
+    score : int
+        Number of apples the snake ate.
+    lifespan : int
+        Number of steps the snake survived.
+
+    Returns
+    -------
+    float
+        Fitness of the snake, at least 0.1.
+    """
+    fitness = ((lifespan) + ((2**score) + (score**2.1)*500) - 
+               ((.25 * lifespan)**1.3 * (score**1.2)))
+    return max(fitness, .1)
+
+
+def compute_inputs(boards, heads, directions, tail_directions, bearings=None,
+                   vision_mode=8, vision_type="distance"):
+    """
+    Vectorize the vision and directions of snakes from several games at once.
+    Each row is the input Snake.compute_input() gives for the matching game.
+
+    Parameters
+    ----------
+    boards : numpy.ndarray
+        Stack of grids' items of shape (num_games, height, width), 
+        see pysnake.grid.Grid.items.
+    heads : numpy.ndarray
+        Coordinates (i, j) of the snakes' heads, of shape (num_games, 2).
+    directions : list(pysnake.enum.Direction) or numpy.ndarray
+        Directions of the snakes, as Direction or as their values in degrees.
+    tail_directions : list(pysnake.enum.Direction) or numpy.ndarray
+        Tail directions of the snakes, as Direction or as their values in degrees.
+    bearings : numpy.ndarray, optional
+        Angles from the snakes' first ray to the North. They should be multiples
+        of 360 / vision_mode. The default is None, i.e. all bearings are 0.
+    vision_mode : int, optional
+        Number of rays. The default is 8.
+    vision_type : str, optional
+        Either "binary" or "distance". The default is "distance", as for a Snake.
+
+    Returns
+    -------
+    X : numpy.ndarray
+        Inputs of shape (num_games, vision_mode * 3 + 8).
+    """
+    boards = np.asarray(boards)
+    num_games, height, width = boards.shape
+    heads = np.asarray(heads, dtype=np.intp).reshape(num_games, 2)
+    
+    # Get the rays of each snake
+    table = get_ray_table((height, width), vision_mode)
+    ks = np.arange(vision_mode)[np.newaxis, :]
+    if bearings is not None:
+        k0 = [table.angle_index(bearing) for bearing in bearings]
+        if None in k0:
+            raise ValueError("the bearings should be multiples of 360 / vision_mode.")
+        ks = (np.array(k0)[:, np.newaxis] + ks) % vision_mode
+    centers = heads[:, 0] * width + heads[:, 1]
+    rays = table.indices[centers[:, np.newaxis], ks]
+    
+    # Detect the items
+    seen, distances = detect_items(boards.reshape(num_games, -1), rays, heads, width)
+    if vision_type == "binary":
+        vision = encode_binary(seen, distances)
+    else:
+        vision = np.divide(1, distances, out=np.zeros_like(distances), where=distances!=0)
+    
+    # Add the one hot encoded directions
+    size_vision = vision_mode * (len(Item) - 1)
+    X = np.zeros((num_games, size_vision + 4 * 2))
+    X[:, :size_vision] = vision.reshape(num_games, size_vision)
+    rows = np.arange(num_games)
+    X[rows, size_vision + _direction_indices(tail_directions)] = 1
+    X[rows, size_vision + 4 + _direction_indices(directions)] = 1
+    return X
+
+
+def _direction_indices(directions):
+    """
+    Get the index of directions in one hot encoded vectors.
+
+    Parameters
+    ----------
+    directions : list(pysnake.enum.Direction) or numpy.ndarray
+        Directions, as Direction or as their values in degrees.
+
+    Returns
+    -------
+    numpy.ndarray
+        Indices of the directions, in [0, 4).
+    """
+    values = [direction.value if isinstance(direction, Direction) else direction
+              for direction in directions]
+    return np.asarray(values, dtype=np.intp) // 90
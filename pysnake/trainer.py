@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 17:21:34 2026
+# @author: arthurd
+
+"""
+Headless training of snakes with the genetic algorithm.
+This module does not depend on pygame, it can run on servers without display.
+"""
+
+
+# Useful packages
+import os
+import numpy as np
+# PySnake modules
+import pysnake.game
+from pysnake.snake import Snake, SnakeGenome
+from pysnake.io import save_snake, save_population_archive, save_checkpoint, load_checkpoint
+from pysnake.writer import BackgroundWriter
+# Neural Network and Genetic Algorithm
+from pysnake.gen.population import Population, GenomePopulation
+from pysnake.evaluation import Evaluator
+
+
+
+def snake_params_from_config(config):
+    """
+    Read the parameters used to create the snakes from a configuration.
+
+    Parameters
+    ----------
+    config : configparser.ConfigParser
+        Configuration, with the [Snake] and [NeuralNetwork] sections.
+
+    Returns
+    -------
+    dict
+        Parameters of the snakes.
+    """
+    return {
+        "length": eval(config.get('Snake', 'length')),
+        "vision_type": eval(config.get('Snake', 'vision_type')),
+        "vision_mode": eval(config.get('Snake', 'vision_mode')),
+        "lifespan_max": eval(config.get('Snake', 'lifespan_max')),
+        "hunger_max": eval(config.get('Snake', 'hunger_max')),
+        # Neural Network
+        "nn_hidden_layers": eval(config.get('NeuralNetwork', 'hidden_layers')),
+        "nn_dtype": eval(config.get('NeuralNetwork', 'dtype', fallback='"float64"')),
+        # self.activation_hidden = eval(config.get('NeuralNetwork', 'activation_hidden')),
+        # self.activation_output = eval(config.get('NeuralNetwork', 'activation_output'))
+        }
+
+
+
+class Trainer:
+    """
+    Train snakes with the genetic algorithm, without rendering.
+
+    The snake i of a generation plays in a game seeded with seed + i,
+    so the training is deterministic given the seed, whatever the
+    number of workers and the backend.
+
+    Attributes
+    ----------
+    board_size : tuple(int, int)
+        Shape of the games.
+    snake_params : dict
+        Parameters used to create the snakes.
+    seed : int
+        Seed of the first game of the next generation.
+    random_state : numpy.random.RandomState
+        Random generator of the breeding, seeded when the training starts.
+        The global random state of numpy is left untouched.
+    num_generations : int
+        Number of generations to train.
+    num_parents : int
+        Number of parents kept in each generation.
+    num_offspring : int
+        Number of offspring bred in each generation.
+    checkpoint_steps : int
+        Save a checkpoint every checkpoint_steps generations, and after the
+        last one. None disables the checkpoints.
+    save_queue_size : int
+        Number of saves which can wait to be written in the background, while
+        the next generation is evaluated. With 0, the training waits for the saves.
+    checkpoint_file : str
+        Path to the checkpoint, by default save_dir/checkpoint.npz.
+
+    The other attributes are the parameters of GenomePopulation.breed(),
+    of the Evaluator and of the saves, as in the [GeneticAlgorithm] section
+    of the config.ini file.
+
+    Example
+    -------
+        >>> config = configparser.ConfigParser()
+        >>> config.read("config.ini")
+        >>> trainer = Trainer.from_config(config)
+        >>> population, fitness = trainer.train()
+    """
+
+    def __init__(self, board_size, snake_params,
+                 seed = None,
+                 num_generations = 3000,
+                 num_parents = 500,
+                 num_offspring = 1000,
+                 eta_SBX = 100,
+                 probability_SBX = 0.5,
+                 mutation_rate = 0.005,
+                 gaussian_mu = 0,
+                 gaussian_std = 1,
+                 crossover_selection_type = "roulette_wheel",
+                 tournament_size = 100,
+                 workers = 1,
+                 chunk_size = None,
+                 backend = "game",
+                 save_best_individuals = False,
+                 save_generations = False,
+                 save_steps = 10,
+                 save_dir = "saves",
+                 save_queue_size = 4,
+                 checkpoint_steps = None,
+                 checkpoint_file = None):
+        self.board_size = board_size
+        self.snake_params = snake_params
+        self.seed = seed
+        self.random_state = None
+        # Genetic Algorithm
+        self.num_generations = num_generations
+        self.num_parents = num_parents
+        self.num_offspring = num_offspring
+        self.eta_SBX = eta_SBX
+        self.probability_SBX = probability_SBX
+        self.mutation_rate = mutation_rate
+        self.gaussian_mu = gaussian_mu
+        self.gaussian_std = gaussian_std
+        self.crossover_selection_type = crossover_selection_type
+        self.tournament_size = tournament_size
+        # Evaluation
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.backend = backend
+        # Saving
+        self.save_best_individuals = save_best_individuals
+        self.save_generations = save_generations
+        self.save_steps = save_steps
+        self.save_dir = save_dir
+        self.save_queue_size = save_queue_size
+        # Checkpoints
+        self.checkpoint_steps = checkpoint_steps
+        self.checkpoint_file = checkpoint_file if checkpoint_file is not None else os.path.join(save_dir, "checkpoint.npz")
+
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Create a trainer from a configuration. The [WindowGame] section is ignored.
+
+        Parameters
+        ----------
+        config : configparser.ConfigParser
+            Configuration, as in the config.ini file.
+
+        Returns
+        -------
+        pysnake.trainer.Trainer
+            The trainer.
+        """
+        def get(key, fallback = None):
+            return eval(config.get('GeneticAlgorithm', key, fallback=fallback))
+
+        return cls(eval(config.get('Game', 'board_size')),
+                   snake_params_from_config(config),
+                   seed = eval(config.get('Game', 'seed')),
+                   num_generations = get('num_generations'),
+                   num_parents = get('num_parents'),
+                   num_offspring = get('num_offspring'),
+                   eta_SBX = get('eta_SBX'),
+                   probability_SBX = get('probability_SBX'),
+                   mutation_rate = get('mutation_rate'),
+                   gaussian_mu = get('gaussian_mu'),
+                   gaussian_std = get('gaussian_std'),
+                   crossover_selection_type = get('crossover_selection_type'),
+                   tournament_size = get('tournament_size', '100'),
+                   workers = get('workers', '1'),
+                   chunk_size = get('chunk_size', 'None'),
+                   backend = get('backend', '"game"'),
+                   save_best_individuals = get('save_best_individuals'),
+                   save_generations = get('save_generations'),
+                   save_steps = get('save_steps'),
+                   save_dir = get('save_dir'),
+                   save_queue_size = get('save_queue_size', '4'),
+                   checkpoint_steps = get('checkpoint_steps', 'None'),
+                   checkpoint_file = get('checkpoint_file', 'None'))
+
+
+    @property
+    def num_population(self):
+        return self.num_parents + self.num_offspring
+
+    @num_population.setter
+    def num_population(self, value):
+        raise AttributeError("attribute 'num_population' of 'Trainer' objects is not writable, "
+                             "set 'num_parents' and 'num_offspring' instead.")
+
+
+    # -------------------------------------------------------------------------
+    # Methods
+
+    def evaluated_snake(self, genome, seed, result):
+        """
+        Create a snake from an evaluated genome, without playing it again.
+        The snake can be replayed from its seed.
+
+        Parameters
+        ----------
+        genome : numpy.ndarray
+            Genome of the snake.
+        seed : int
+            Seed of the game in which the snake was evaluated.
+        result : numpy.ndarray
+            Fitness, score and lifespan of the snake.
+
+        Returns
+        -------
+        snake : pysnake.snake.Snake
+            The snake, with its fitness, score and lifespan.
+        """
+        game = pysnake.game.Game(self.board_size, seed=int(seed))
+        snake = Snake(game, genome=genome, **self.snake_params)
+        snake.fitness, snake.score, snake.lifespan = result[0], int(result[1]), int(result[2])
+        return snake
+
+
+    def evaluated_population(self, genomes, seeds, results):
+        """
+        Gather an evaluated generation, without creating any game nor snake.
+        The genomes of the individuals are views of the genome matrix.
+
+        Parameters
+        ----------
+        genomes : pysnake.gen.population.GenomePopulation
+            Evaluated generation.
+        seeds : numpy.ndarray
+            Seed of the game of each individual.
+        results : numpy.ndarray
+            Fitness, score and lifespan of each individual.
+
+        Returns
+        -------
+        pysnake.gen.population.Population
+            Population of pysnake.snake.SnakeGenome, whose to_snake() 
+            replays the games.
+        """
+        individuals = [SnakeGenome(genome, self.board_size, self.snake_params,
+                                   seed = int(seed),
+                                   fitness = float(result[0]),
+                                   score = int(result[1]),
+                                   lifespan = int(result[2]),
+                                   id = i)
+                       for (i, (genome, seed, result)) in enumerate(zip(genomes.genomes, seeds, results))]
+        return Population(individuals, id = genomes.id)
+
+
+    def breed(self, genomes):
+        """
+        Create the next generation from the best individuals, crossover and 
+        mutation of their genomes. The random draws come from 
+        self.random_state, so they do not depend on the evaluation.
+
+        Parameters
+        ----------
+        genomes : pysnake.gen.population.GenomePopulation
+            Evaluated generation.
+
+        Returns
+        -------
+        pysnake.gen.population.GenomePopulation
+            Next generation.
+        """
+        return genomes.breed(self.num_parents, self.num_offspring,
+                             probability_SBX = self.probability_SBX,
+                             eta = self.eta_SBX,
+                             prob_mutation = self.mutation_rate,
+                             mu = self.gaussian_mu,
+                             sigma = self.gaussian_std,
+                             selection_type = self.crossover_selection_type,
+                             tournament_size = self.tournament_size,
+                             random_state = self.random_state)
+
+
+    def checkpoint(self, genomes, generation, seeds, results, fitness):
+        """
+        Save the state of the training in self.checkpoint_file.
+
+        Parameters
+        ----------
+        genomes : pysnake.gen.population.GenomePopulation
+            Last evaluated generation.
+        generation : int
+            Index of this generation.
+        seeds : numpy.ndarray
+            Seed of the game of each individual.
+        results : numpy.ndarray
+            Fitness, score and lifespan of each individual.
+        fitness : list(float)
+            Mean fitness of all evaluated generations.
+
+        Returns
+        -------
+        None.
+        """
+        save_checkpoint(self.checkpoint_file, genomes, generation, seeds, results, fitness, self.seed,
+                        random_state = self.random_state,
+                        board_size = list(self.board_size), 
+                        snake_params = self.snake_params,
+                        num_generations = self.num_generations)
+
+
+    def train(self, population = None, play_generation = None, resume = None):
+        """
+        Train a range of snakes and evolve them.
+
+        Parameters
+        ----------
+        population : pysnake.gen.population.Population, optional
+            Initial population to start from. The default is None.
+        play_generation : function, optional
+            Function playing a generation instead of the Evaluator, e.g. to
+            render the games. It takes the genomes and the seeds of the
+            generation and returns the fitness, score and lifespan of each snake.
+            The default is None.
+        resume : str, optional
+            Checkpoint to resume the training from. The training continues
+            as if it was never interrupted, and population is ignored. 
+            The default is None.
+
+        Returns
+        -------
+        population : pysnake.gen.population.Population
+            Last evaluated population, of pysnake.snake.SnakeGenome 
+            (see Trainer.evaluated_population()).
+        fitness : list(float)
+            Mean fitness of the generations.
+        """
+        fitness = []  # For tracking average fitness over generation
+        # Always fix the seed for training
+        if self.seed is None:
+            self.seed = 0
+        first_generation = 0
+        
+        if resume is not None:
+            # Restart after the last saved generation
+            state = load_checkpoint(resume)
+            evaluated, evaluated_seeds, evaluated_results = state["genomes"], state["seeds"], state["results"]
+            fitness = state["fitness_history"]
+            self.seed = state["seed"]
+            self.random_state = state["random_state"]
+            first_generation = state["generation"] + 1
+            genomes = self.breed(evaluated)
+        else:
+            self.random_state = np.random.RandomState(self.seed)
+            # Create and initialize the population
+            if population is None:
+                individuals = [Snake(pysnake.game.Game(self.board_size, seed=self.seed+i), **self.snake_params)
+                               for i in range(self.num_population)]
+                population = Population(individuals)
+            # Genomes of all individuals, in one matrix
+            genomes = GenomePopulation.from_individuals(population.individuals)
+
+        evaluator = Evaluator(self.board_size, self.snake_params,
+                              workers = self.workers,
+                              chunk_size = self.chunk_size,
+                              backend = self.backend)
+        evaluate = play_generation if play_generation is not None else evaluator.evaluate
+        # Saves are written while the next generations are evaluated
+        writer = BackgroundWriter(self.save_queue_size)
+        with evaluator, writer:
+            for generation in range(first_generation, self.num_generations):
+
+                # Play all snakes in their games environment
+                seeds = self.seed + np.arange(genomes.size)
+                results = evaluate(genomes.genomes, seeds)
+                genomes.fitness[:] = results[:, 0]
+                # Update the seed
+                self.seed += genomes.size
+
+                # Best individual
+                best = np.argmax(genomes.fitness)
+                best_fitness, best_score, best_lifespan = results[best]
+
+                # Save ? The writer gets copies, as the genomes are bred meanwhile
+                if self.save_best_individuals and generation % self.save_steps == 0:
+                    fittest = self.evaluated_snake(genomes[best].copy(), seeds[best], results[best])
+                    dirpath = self.save_dir + os.sep + "fittest"
+                    filename = "snake_" + str(generation) + ".json"
+                    writer.submit(save_snake, fittest, filename, dirpath = dirpath)
+
+                if self.save_generations and generation % self.save_steps == 0:
+                    filename = self.save_dir + os.sep + "generation_" + str(generation) + ".pop"
+                    writer.submit(save_population_archive, filename, genomes.genomes.copy(), 
+                                  self.board_size, self.snake_params, seeds.copy(), results.copy(), 
+                                  generation = generation)
+
+                # Display a log each generations
+                print("----------------------")
+                print("Generation  : {0:4d}/{1}".format(generation + 1, self.num_generations), end = " | ")
+                print("best fitness: {0:2.3E}".format(best_fitness), end = " | ")
+                print("best score  : {0:2d}".format(int(best_score)), end = " | ")
+                print("lifespan    : {0:3d}".format(int(best_lifespan)), end = " | ")
+                if self.save_best_individuals or self.save_generations:
+                    print("saves queued: {0:2d}".format(writer.queue_depth), end = " | ")
+
+                # Track average fitness
+                fitness.append(genomes.mean_fitness)
+
+                # Keep the evaluated generation
+                evaluated, evaluated_seeds, evaluated_results = genomes, seeds, results
+                
+                # Checkpoint ?
+                if self.checkpoint_steps and ((generation + 1) % self.checkpoint_steps == 0 
+                                              or generation == self.num_generations - 1):
+                    self.checkpoint(genomes, generation, seeds, results, fitness)
+
+                # Create the next generation
+                genomes = self.breed(genomes)
+
+        if resume is not None or self.num_generations > 0:
+            population = self.evaluated_population(evaluated, evaluated_seeds, evaluated_results)
+
+        print("======================")
+        print("Done !")
+        if writer.num_writes > 0:
+            print("Saves        : {0} written in {1:.3f}s | mean latency: {2:.1f}ms | max latency: {3:.1f}ms"
+                  .format(writer.num_writes, writer.total_latency, 
+                          1000 * writer.mean_latency, 1000 * writer.max_latency))
+        print("Best fitness : {}".format(population.fittest.fitness))
+        print("Best individual :\n")
+        print(population.fittest)
+
+        return population, fitness
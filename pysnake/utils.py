@@ -28,10 +28,12 @@ def one_hot_vector(y, num_class):
     y_tilde[y] = 1
     return y_tilde
 
+# One hot encoded directions, indexed by direction.value // 90
+ONE_HOT_DIRECTIONS = np.eye(4)
+ONE_HOT_DIRECTIONS.setflags(write=False)
+
 def one_hot_direction(direction):
-    y_tilde = np.zeros(4)
-    y_tilde[direction.value // 90] = 1
-    return y_tilde
+    return ONE_HOT_DIRECTIONS[direction.value // 90].copy()
 
 
 
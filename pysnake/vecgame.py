@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 16:05:12 2026
+# @author: arthurd
+
+"""
+Several snake games played in lockstep, with arrays instead of Game and Snake objects.
+"""
+
+
+# Useful packages
+import random
+import numpy as np
+# PySnake modules
+from pysnake.enum import Item
+from pysnake.snake import compute_inputs, compute_fitness
+
+
+_EMPTY = Item.EMPTY.value
+_WALL = Item.WALL.value
+_SNAKE = Item.SNAKE.value
+_APPLE = Item.APPLE.value
+
+# Moves (delta_i, delta_j) indexed by direction.value // 90,
+# i.e. UP, LEFT, DOWN, RIGHT as the outputs of the neural network
+_MOVES = np.array([(-1, 0), (0, -1), (1, 0), (0, 1)])
+
+
+
+class VecGame:
+    """
+    Play K games at once, one snake per board.
+
+    The boards are stacked in a (K, H, W) int8 array, with the same items
+    values as pysnake.grid.Grid. Each snake's body is a ring buffer of flat
+    cell indices, from its tail to its head. All live boards move together
+    with NumPy operations, so that a step costs a few array operations
+    whatever the number of boards.
+
+    The rules are the ones of Snake.move(): a snake dies when it hits a wall
+    or a snake (its tail included), when its lifespan exceeds lifespan_max or
+    when its hunger exceeds hunger_max. Boards are seeded as Game and Snake,
+    so a board plays exactly the same game as a Snake created in a Game with
+    the same seed.
+
+    Attributes
+    ----------
+    shape: tuple(int, int)
+        Shape of each board, walls included.
+    num_boards: int
+        Number of boards K.
+    boards: numpy.ndarray
+        Items of the boards, of shape (K, H, W).
+    heads: numpy.ndarray
+        Coordinates (i, j) of the snakes' heads, of shape (K, 2).
+    directions: numpy.ndarray
+        Directions of the snakes, as direction.value // 90, of shape (K,).
+    tail_directions: numpy.ndarray
+        Tail directions of the snakes, as direction.value // 90, of shape (K,).
+    score: numpy.ndarray
+        Number of apples each snake ate.
+    lifespan: numpy.ndarray
+        Number of steps each snake survived.
+    hunger: numpy.ndarray
+        Number of steps since each snake ate an apple.
+    alive: numpy.ndarray
+        Mask of the boards still playing.
+    seeds: numpy.ndarray
+        Seed of the current game of each board.
+    results: numpy.ndarray
+        Fitness, score and lifespan of the last finished game of each board,
+        of shape (K, 3).
+    auto_reset: bool
+        If True, a finished board restarts at once, with its seed + K.
+        Otherwise it is masked out until the next reset().
+
+    Example
+    -------
+        >>> env = VecGame((15, 15), len(genomes), hunger_max=100)
+        >>> env.reset(seeds)
+        >>> networks = BatchedNeuralNetwork.from_genomes(layer_dimensions, genomes)
+        >>> while env.alive.any():
+        ...     actions = networks.predict(env.compute_inputs())
+        ...     env.step(actions[env.alive])
+        >>> fitness, score, lifespan = env.results.T
+    """
+
+    def __init__(self, shape, num_boards,
+                 length = 3,
+                 vision_mode = 8,
+                 vision_type = "distance",
+                 lifespan_max = None,
+                 hunger_max = 300,
+                 auto_reset = False, **kwargs):
+        self.shape = tuple(shape)
+        self.num_boards = num_boards
+        self.length = length
+        self.vision_mode = vision_mode
+        self.vision_type = vision_type
+        self.lifespan_max = np.inf if lifespan_max is None else lifespan_max
+        self.hunger_max = np.inf if hunger_max is None else hunger_max
+        self.auto_reset = auto_reset
+
+        height, width = self.shape
+        size = height * width
+        # Empty board with wall borders, as in a new Game
+        self._template = np.full(self.shape, _EMPTY, dtype=np.int8)
+        self._template[[0, -1], :] = _WALL
+        self._template[:, [0, -1]] = _WALL
+        self.boards = np.repeat(self._template[np.newaxis], num_boards, axis=0)
+
+        # Index of the empty cells of each board, updated as Grid's one (swap-remove)
+        # so that the apples are drawn at the same cells
+        empty = np.flatnonzero(self._template.reshape(-1) == _EMPTY)
+        self._empty_template = np.full(size, -1, dtype=np.intp)
+        self._empty_template[:empty.size] = empty
+        self._position_template = np.full(size, -1, dtype=np.intp)
+        self._position_template[empty] = np.arange(empty.size)
+        self._empty = np.repeat(self._empty_template[np.newaxis], num_boards, axis=0)
+        self._empty_position = np.repeat(self._position_template[np.newaxis], num_boards, axis=0)
+        self._num_empty_template = empty.size
+        self._num_empty = np.full(num_boards, empty.size, dtype=np.intp)
+
+        # Bodies, as ring buffers of flat indices
+        self._body = np.zeros((num_boards, size), dtype=np.intp)
+        self._tail = np.zeros(num_boards, dtype=np.intp)
+        self._head = np.zeros(num_boards, dtype=np.intp)
+
+        self.heads = np.zeros((num_boards, 2), dtype=np.intp)
+        self.directions = np.zeros(num_boards, dtype=np.intp)
+        self.tail_directions = np.zeros(num_boards, dtype=np.intp)
+        self.score = np.zeros(num_boards, dtype=np.int64)
+        self.lifespan = np.zeros(num_boards, dtype=np.int64)
+        self.hunger = np.zeros(num_boards, dtype=np.int64)
+        self.alive = np.zeros(num_boards, dtype=bool)
+        self.seeds = np.zeros(num_boards, dtype=np.int64)
+        self.results = np.zeros((num_boards, 3))
+        # Random generators of the apples, one per board,
+        # and of the snakes' initialization
+        self._random = [None] * num_boards
+        self._np_random = np.random.RandomState()
+
+
+    # -------------------------------------------------------------------------
+    # Methods
+
+    def reset(self, seeds, index = None):
+        """
+        Start new games.
+
+        Parameters
+        ----------
+        seeds : numpy.ndarray
+            Seed of each new game.
+        index : numpy.ndarray, optional
+            Boards to restart, without duplicates. 
+            The default is None, i.e. all boards.
+
+        Returns
+        -------
+        None.
+        """
+        index = np.arange(self.num_boards) if index is None else np.asarray(index, dtype=np.intp)
+        for (board, seed) in zip(index.tolist(), np.asarray(seeds).tolist()):
+            self._reset_board(board, seed)
+        self.tail_directions[index] = self._tail_directions(index)
+        self.score[index] = 0
+        self.lifespan[index] = 0
+        self.hunger[index] = 0
+        self.alive[index] = True
+        # First apples (see Game.start)
+        self._add_apples(index)
+
+
+    def _reset_board(self, board, seed):
+        """
+        Place a new snake on one board, drawn as Snake.__init__() does with
+        the same seed. The random generator of the apples is seeded as well.
+
+        Parameters
+        ----------
+        board : int
+            Index of the board.
+        seed : int
+            Seed of the game.
+
+        Returns
+        -------
+        None.
+        """
+        height, width = self.shape
+        rng = random.Random(seed)
+        np_rng = self._np_random
+        np_rng.seed(seed)
+        items = self.boards[board]
+        items[...] = self._template
+        empty = self._empty[board]
+        position = self._empty_position[board]
+        empty[:] = self._empty_template
+        position[:] = self._position_template
+
+        # Body, from its tail to its head (see Snake._init_body)
+        tail_i = rng.randint(1 + self.length, height - 2 - self.length)
+        tail_j = rng.randint(1 + self.length, width - 2 - self.length)
+        coord = (tail_i, tail_j)
+        body = [coord]
+        body_set = {coord}
+        for _ in range(self.length - 1):
+            i, j = coord
+            possible_coord = list({(i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)} - body_set)
+            # Same draw as np.random.choice(np.arange(len(possible_coord)))
+            coord = possible_coord[np_rng.randint(len(possible_coord))]
+            body.append(coord)
+            body_set.add(coord)
+        # Use the cells one after the other, as Grid.set_cell()
+        num_empty = self._num_empty_template
+        for (i, j) in body:
+            cell = i * width + j
+            items[i, j] = _SNAKE
+            num_empty -= 1
+            last = empty[num_empty]
+            empty[position[cell]] = last
+            position[last] = position[cell]
+            position[cell] = -1
+        self._num_empty[board] = num_empty
+        self._body[board, :len(body)] = [i * width + j for (i, j) in body]
+        self._tail[board] = 0
+        self._head[board] = len(body) - 1
+
+        # Direction toward an empty cell (see Snake._init_direction)
+        head_i, head_j = body[-1]
+        # Surrounding cells in the order up, down, left, right
+        possible_directions = [direction for direction in (0, 2, 1, 3)
+                               if items[head_i + _MOVES[direction, 0], head_j + _MOVES[direction, 1]] == _EMPTY]
+        self.directions[board] = possible_directions[np_rng.randint(len(possible_directions))]
+        self.heads[board] = body[-1]
+        self.seeds[board] = seed
+        self._random[board] = rng
+
+
+    def _use_cells(self, boards, cells):
+        """
+        Remove empty cells from the index of empty cells, as Grid does when
+        an empty cell is set. Each board should appear once.
+
+        Parameters
+        ----------
+        boards : numpy.ndarray
+            Indices of the boards.
+        cells : numpy.ndarray
+            Flat indices of the empty cells to remove.
+
+        Returns
+        -------
+        None.
+        """
+        positions = self._empty_position[boards, cells]
+        last = self._empty[boards, self._num_empty[boards] - 1]
+        # Swap the last empty cell with the removed one
+        self._empty[boards, positions] = last
+        self._empty_position[boards, last] = positions
+        self._empty_position[boards, cells] = -1
+        self._num_empty[boards] -= 1
+
+
+    def _free_cells(self, boards, cells):
+        """
+        Add cells to the index of empty cells, as Grid does when a cell is
+        set empty. Each board should appear once.
+
+        Parameters
+        ----------
+        boards : numpy.ndarray
+            Indices of the boards.
+        cells : numpy.ndarray
+            Flat indices of the freed cells.
+
+        Returns
+        -------
+        None.
+        """
+        self._empty[boards, self._num_empty[boards]] = cells
+        self._empty_position[boards, cells] = self._num_empty[boards]
+        self._num_empty[boards] += 1
+
+
+    def _add_apples(self, boards):
+        """
+        Add a new apple in each board, at an empty cell drawn as Game.generate_apple().
+
+        Parameters
+        ----------
+        boards : numpy.ndarray
+            Indices of the boards.
+
+        Returns
+        -------
+        None.
+        """
+        num_empty = self._num_empty[boards]
+        if np.any(num_empty == 0):
+            raise IndexError("cannot generate an apple, the grid is full.")
+        draws = np.array([self._random[board].random() for board in boards])
+        positions = (draws * num_empty).astype(np.intp)
+        cells = self._empty[boards, positions]
+        self._use_cells(boards, cells)
+        self.boards.reshape(self.num_boards, -1)[boards, cells] = _APPLE
+
+
+    def _tail_directions(self, boards):
+        """
+        Direction from the tail to the next cell of the body (see Snake.get_tail_direction).
+
+        Parameters
+        ----------
+        boards : numpy.ndarray
+            Indices of the boards.
+
+        Returns
+        -------
+        numpy.ndarray
+            Tail directions, as direction.value // 90.
+        """
+        size = self._body.shape[1]
+        width = self.shape[1]
+        tails = self._body[boards, self._tail[boards]]
+        next_cells = self._body[boards, (self._tail[boards] + 1) % size]
+        delta = next_cells - tails
+        return np.select([delta == -width, delta == width, delta == 1], [0, 2, 3], default=1)
+
+
+    def compute_inputs(self, index = None):
+        """
+        Inputs of the snakes' neural networks, as Snake.compute_input().
+
+        Parameters
+        ----------
+        index : numpy.ndarray, optional
+            Boards to observe. The default is None, i.e. all boards.
+
+        Returns
+        -------
+        numpy.ndarray
+            Inputs of shape (len(index), vision_mode * 3 + 8).
+        """
+        if index is None:
+            index = np.arange(self.num_boards)
+        return compute_inputs(self.boards[index], self.heads[index],
+                              self.directions[index] * 90, self.tail_directions[index] * 90,
+                              vision_mode = self.vision_mode, vision_type = self.vision_type)
+
+
+    def step(self, actions, index = None):
+        """
+        Move the snakes of live boards, as Snake.move().
+
+        Parameters
+        ----------
+        actions : numpy.ndarray
+            New direction of each snake, as direction.value // 90 (i.e. the
+            predicted class of its neural network).
+        index : numpy.ndarray, optional
+            Boards of the actions. They should all be alive.
+            The default is None, i.e. all live boards.
+
+        Returns
+        -------
+        finished : numpy.ndarray
+            Indices of the boards whose game ended at this step.
+        """
+        index = np.flatnonzero(self.alive) if index is None else np.asarray(index)
+        actions = np.asarray(actions, dtype=np.intp)
+        height, width = self.shape
+        size = height * width
+        flat_boards = self.boards.reshape(self.num_boards, -1)
+        self.directions[index] = actions
+
+        # New heads
+        new_heads = self.heads[index] + _MOVES[actions]
+        outside = ((new_heads[:, 0] < 0) | (new_heads[:, 0] >= height) |
+                   (new_heads[:, 1] < 0) | (new_heads[:, 1] >= width))
+        cells = np.where(outside, 0, new_heads[:, 0] * width + new_heads[:, 1])
+        items = flat_boards[index, cells]
+        # Collisions with walls and snakes, the tail has not moved yet
+        is_dead = outside | (items == _WALL) | (items == _SNAKE)
+        is_apple = ~is_dead & (items == _APPLE)
+        is_moving = ~is_dead & ~is_apple
+
+        # Update the bodies
+        living = index[~is_dead]
+        living_cells = cells[~is_dead]
+        self._head[living] = (self._head[living] + 1) % size
+        self._body[living, self._head[living]] = living_cells
+        self.heads[living] = new_heads[~is_dead]
+        # Empty cells are used by the heads, apples are eaten
+        moving = index[is_moving]
+        self._use_cells(moving, cells[is_moving])
+        flat_boards[living, living_cells] = _SNAKE
+        # Then the tails move
+        tails = self._body[moving, self._tail[moving]]
+        self._tail[moving] = (self._tail[moving] + 1) % size
+        flat_boards[moving, tails] = _EMPTY
+        self._free_cells(moving, tails)
+        # New apples
+        eating = index[is_apple]
+        if len(eating) > 0:
+            self._add_apples(eating)
+        self.tail_directions[living] = self._tail_directions(living)
+
+        # Update the stats
+        self.score[eating] += 1
+        self.hunger[eating] = 0
+        self.lifespan[living] += 1
+        self.hunger[living] += 1
+        is_over = (self.lifespan[living] > self.lifespan_max) | (self.hunger[living] > self.hunger_max)
+
+        finished = np.concatenate([index[is_dead], living[is_over]])
+        self._finish(finished)
+        return finished
+
+
+    def _finish(self, boards):
+        """
+        End the games of some boards, and restart them if auto_reset is set.
+
+        Parameters
+        ----------
+        boards : numpy.ndarray
+            Indices of the boards.
+
+        Returns
+        -------
+        None.
+        """
+        self.alive[boards] = False
+        for board in boards:
+            score, lifespan = int(self.score[board]), int(self.lifespan[board])
+            self.results[board] = (compute_fitness(score, lifespan), score, lifespan)
+        if self.auto_reset:
+            self.reset(self.seeds[boards] + self.num_boards, boards)
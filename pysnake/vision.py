@@ -10,6 +10,480 @@ from pysnake.enum import Item
 
 
 
+def get_end_point(center, angle, shape):
+    """
+    Get the last point seen from a center, at an angle from the North.
+    In other words, it will compute the point coordinates that intersect the grid borders.
+
+    Parameters
+    ----------
+    center : tuple(int, int)
+        Coordinates (i, j) of the ray's origin.
+    angle : float
+        Angle from the North, in degrees [0, 360).
+    shape : tuple(int, int)
+        Shape of the grid.
+
+    Returns
+    -------
+    end_point : tuple
+        End point coordinates seen from center in the grid.
+    """
+    
+    # Params
+    i, j = center
+    height, width = shape
+    angle_rad = np.deg2rad(angle)
+    # Get the last point seen by vision
+    end_point = None
+    
+    # Check the first quarter of the trigonometric circle
+    if angle == 0:
+        end_point = (0, j)
+    elif angle < 90:
+        j_end = j - np.tan(angle_rad) * (i)
+        i_end = i - np.tan(np.pi/2 - angle_rad) * (j)
+        
+        # Avoid issues with float numbers...
+        i_end, j_end = round(i_end, ndigits=12), round(j_end, ndigits=12)
+        # If i_end <= i - i0, 
+        # it means that the ray will it the left side of the grid
+        if 0 <= i_end <= i:
+            end_point = (i_end, 0)
+        else:
+            end_point = (0, j_end)
+            
+    # Second quarter
+    elif angle == 90:
+        end_point = (i, 0)
+    elif angle < 180:
+        j_end = j - np.tan(np.pi - angle_rad) * (height-1 - i)
+        i_end = i + np.tan(angle_rad - np.pi/2) * j
+        
+        # Avoid issues with float numbers...
+        i_end, j_end = round(i_end, ndigits=12), round(j_end, ndigits=12)
+        if i <= i_end <= height-1:
+            end_point = (i_end, 0)
+        else:
+            end_point = (height - 1, j_end)
+            
+    # Third quarter
+    elif angle == 180:
+        end_point = (height-1, j)
+    elif angle < 270:
+        j_end = j + np.tan(angle_rad - np.pi) * (height-1 - i)
+        i_end = i + np.tan(3*np.pi/2 - angle_rad) * (width-1 - j)
+        
+        # Avoid issues with float numbers...
+        i_end, j_end = round(i_end, ndigits=12), round(j_end, ndigits=12)
+        if i <= i_end <= height-1:
+            end_point = (i_end, width - 1)
+        else:
+            end_point = (height - 1, j_end)    
+            
+    # Last quarter
+    elif angle == 270:
+        end_point = (i, width-1)
+    else:
+        j_end = j + np.tan(2*np.pi - angle_rad) * i
+        i_end = i - np.tan(angle_rad - 3*np.pi/2) * (width-1 -  j)
+
+        # Avoid issues with float numbers...
+        i_end, j_end = round(i_end, ndigits=12), round(j_end, ndigits=12)            
+        if 0 <= i_end <= i:
+            end_point = (i_end, width - 1)
+        else:
+            end_point = (0, j_end)  
+          
+    return end_point
+
+
+def get_ray_coords(center, end_point):
+    """
+    Get the coordinates of all cells intersecting the ray (line) defined
+    from center to end_point, with Bresenham's algorithm.
+
+    Parameters
+    ----------
+    center : tuple(int, int)
+        Coordinates (i, j) of the ray's origin.
+    end_point : tuple(float, float)
+        End point of the ray.
+
+    Returns
+    -------
+    visible_coords : list(tuple(int, int))
+        Coordinates of the cells along the ray, from the nearest to the farthest.
+        The center is not included.
+    """
+    # Star and end points
+    start_i, start_j = center
+    end_i, end_j = end_point
+    # End point seen on the grid system
+    end_i, end_j = int(round(end_i)), int(round(end_j))
+    
+    # Know wich direction to draw the line
+    delta_i = abs(end_i - start_i)
+    delta_j = abs(end_j - start_j)        
+    sign_j = np.sign(end_j - start_j)
+    sign_i = np.sign(end_i - start_i)
+        
+    err = delta_i - delta_j
+    
+    # Collect the cells visible from the starting point
+    visible_coords = []       
+    while (start_i != end_i or start_j != end_j):
+
+        e2 = 2 * err
+        if e2 >= - delta_j:
+            # overshot in the y direction
+            err = err - delta_j
+            start_i = start_i + sign_i               
+            
+        if e2 <= delta_i:
+            # overshot in the x direction
+            err = err + delta_i
+            start_j = start_j + sign_j
+            
+        visible_coords.append((start_i, start_j))
+
+    return visible_coords
+
+
+
+class RayTable:
+    """
+    Precomputed rays of a FullVision sensor, from every cell of a grid.
+    
+    For a grid's shape, the rays seen from a cell at a given angle never change.
+    A table is shared by all sensors using the same grid's shape and mode,
+    use get_ray_table() to access it.
+    
+    The rays are traced for all cells at once, angle by angle. They are the
+    same as the ones of get_end_point() and get_ray_coords().
+    
+    Attributes
+    ----------
+    shape: tuple(int, int)
+        Shape of the grid.
+    mode: int
+        Number of rays, at equal angle from one another.
+    angles: list(float)
+        Angles of the rays from the North, in degrees.
+    indices: numpy.ndarray
+        Array of shape (height * width, mode, max_length), with the flat indices
+        (i * width + j) of the cells along the rays, ordered from the nearest.
+        Rays shorter than max_length are padded with -1. The indices are stored
+        as int16 when the grid is small enough, int32 otherwise.
+    lengths: numpy.ndarray
+        Array of shape (height * width, mode), number of cells in each ray.
+    end_points: numpy.ndarray
+        Array of shape (height * width, mode, 2), end points of the rays.
+    """
+    
+    def __init__(self, shape, mode=8):
+        self.shape = tuple(shape)
+        self.mode = mode
+        self.angles = self._init_angles()
+        self.indices, self.lengths, self.end_points = self._init_rays()
+        
+        
+    def _init_angles(self):
+        """
+        Get the angles of the rays, as computed in FullVision from a bearing of 0.
+
+        Returns
+        -------
+        angles : list(float)
+            Angles of the rays.
+        """
+        angles = []
+        theta = 360 / self.mode
+        angle = 0
+        for _ in range(self.mode):
+            angles.append(angle % 360)
+            angle += theta
+        return angles
+    
+    
+    def _end_points(self, angle):
+        """
+        Get the end points of the rays at an angle, from all cells.
+        This is get_end_point() for all cells at once.
+
+        Parameters
+        ----------
+        angle : float
+            Angle from the North, in degrees [0, 360).
+
+        Returns
+        -------
+        end_i, end_j : numpy.ndarray
+            Coordinates of the end points, of shape (height * width,).
+        """
+        height, width = self.shape
+        i, j = np.divmod(np.arange(height * width), width)
+        angle_rad = np.deg2rad(angle)
+        
+        # Rays along the axes
+        if angle == 0:
+            return np.zeros(i.shape), j.astype(float)
+        elif angle == 90:
+            return i.astype(float), np.zeros(j.shape)
+        elif angle == 180:
+            return np.full(i.shape, height - 1.), j.astype(float)
+        elif angle == 270:
+            return i.astype(float), np.full(j.shape, width - 1.)
+        
+        # Intersections with the borders, for each quarter. The ray hits the
+        # side j = side_j if i_end is in [i_min, i_max], else the border i = border_i
+        if angle < 90:
+            j_end = j - np.tan(angle_rad) * (i)
+            i_end = i - np.tan(np.pi/2 - angle_rad) * (j)
+            i_min, i_max, side_j, border_i = 0, i, 0, 0
+        elif angle < 180:
+            j_end = j - np.tan(np.pi - angle_rad) * (height-1 - i)
+            i_end = i + np.tan(angle_rad - np.pi/2) * j
+            i_min, i_max, side_j, border_i = i, height - 1, 0, height - 1
+        elif angle < 270:
+            j_end = j + np.tan(angle_rad - np.pi) * (height-1 - i)
+            i_end = i + np.tan(3*np.pi/2 - angle_rad) * (width-1 - j)
+            i_min, i_max, side_j, border_i = i, height - 1, width - 1, height - 1
+        else:
+            j_end = j + np.tan(2*np.pi - angle_rad) * i
+            i_end = i - np.tan(angle_rad - 3*np.pi/2) * (width-1 -  j)
+            i_min, i_max, side_j, border_i = 0, i, width - 1, 0
+        # Avoid issues with float numbers...
+        i_end, j_end = np.round(i_end, 12), np.round(j_end, 12)
+        hits_side = (i_min <= i_end) & (i_end <= i_max)
+        return np.where(hits_side, i_end, border_i), np.where(hits_side, side_j, j_end)
+        
+        
+    def _init_rays(self):
+        """
+        Trace all rays from all cells of the grid, with Bresenham's algorithm
+        run on all cells at once.
+
+        Returns
+        -------
+        indices : numpy.ndarray
+            Flat indices of the cells along the rays.
+        lengths : numpy.ndarray
+            Number of cells in each ray.
+        end_points : numpy.ndarray
+            End points of the rays.
+        """
+        height, width = self.shape
+        num_cells = height * width
+        start_i, start_j = np.divmod(np.arange(num_cells), width)
+        end_points = np.empty((num_cells, self.mode, 2))
+        for (k, angle) in enumerate(self.angles):
+            end_points[:, k, 0], end_points[:, k, 1] = self._end_points(angle)
+        
+        # End points seen on the grid system
+        end_i = np.rint(end_points[..., 0]).astype(int)
+        end_j = np.rint(end_points[..., 1]).astype(int)
+        delta_i = np.abs(end_i - start_i[:, np.newaxis])
+        delta_j = np.abs(end_j - start_j[:, np.newaxis])
+        # A ray moves by one cell on its longest axis at each step
+        lengths = np.maximum(delta_i, delta_j)
+        max_length = lengths.max(initial=0)
+        
+        dtype = np.int16 if num_cells <= np.iinfo(np.int16).max else np.int32
+        indices = np.full((num_cells, self.mode, max_length), -1, dtype=dtype)
+        for k in range(self.mode):
+            ray_i, ray_j = start_i.copy(), start_j.copy()
+            sign_i = np.sign(end_i[:, k] - start_i)
+            sign_j = np.sign(end_j[:, k] - start_j)
+            ray_delta_i, ray_delta_j = delta_i[:, k].copy(), delta_j[:, k].copy()
+            ray_lengths = lengths[:, k].copy()
+            err = ray_delta_i - ray_delta_j
+            # One step of all rays per row
+            rays = np.empty((ray_lengths.max(initial=0), num_cells), dtype=dtype)
+            for step in range(len(rays)):
+                moving = step < ray_lengths
+                e2 = 2 * err
+                move_i = moving & (e2 >= -ray_delta_j)
+                move_j = moving & (e2 <= ray_delta_i)
+                err -= ray_delta_j * move_i
+                err += ray_delta_i * move_j
+                ray_i += sign_i * move_i
+                ray_j += sign_j * move_j
+                rays[step] = np.where(moving, ray_i * width + ray_j, -1)
+            indices[:, k, :len(rays)] = rays.T
+        return indices, lengths.astype(dtype), end_points
+    
+    
+    def angle_index(self, angle):
+        """
+        Get the index of a ray from its angle.
+
+        Parameters
+        ----------
+        angle : float
+            Angle from the North, in degrees.
+
+        Returns
+        -------
+        int or None
+            Index of the ray, None if the angle is not in the table.
+        """
+        theta = 360 / self.mode
+        k = round((angle % 360) / theta)
+        if abs(k * theta - angle % 360) > 1e-9:
+            return None
+        return k % self.mode
+    
+    
+    def ray(self, coord, k):
+        """
+        Get a precomputed ray.
+
+        Parameters
+        ----------
+        coord : tuple(int, int)
+            Coordinates of the ray's origin.
+        k : int
+            Index of the ray angle.
+
+        Returns
+        -------
+        indices : numpy.ndarray
+            Flat indices of the cells along the ray.
+        end_point : tuple(float, float)
+            End point of the ray.
+        """
+        index = coord[0] * self.shape[1] + coord[1]
+        indices = self.indices[index, k, :self.lengths[index, k]]
+        end_point = self.end_points[index, k]
+        return indices, (end_point[0], end_point[1])
+    
+    
+# Ray tables shared by all sensors, indexed by (shape, mode)
+_ray_tables = {}
+
+
+def get_ray_table(shape, mode=8):
+    """
+    Get the ray table of a grid's shape and vision mode. The table is created
+    the first time, then shared by all games with the same board size.
+
+    Parameters
+    ----------
+    shape : tuple(int, int)
+        Shape of the grid.
+    mode : int, optional
+        Number of rays. The default is 8.
+
+    Returns
+    -------
+    pysnake.vision.RayTable
+        The shared ray table.
+    """
+    key = (tuple(shape), mode)
+    table = _ray_tables.get(key)
+    if table is None:
+        table = RayTable(shape, mode)
+        _ray_tables[key] = table
+    return table
+
+
+def set_ray_table(table):
+    """
+    Share a ray table created elsewhere, e.g. in the main process of a pool
+    of workers, so that get_ray_table() returns it instead of tracing it again.
+
+    Parameters
+    ----------
+    table : pysnake.vision.RayTable
+        The ray table.
+
+    Returns
+    -------
+    None.
+    """
+    _ray_tables[(table.shape, table.mode)] = table
+
+
+
+def detect_items(items, rays, center, width):
+    """
+    Detect the nearest item of each category along rays, in one vectorized pass.
+    This gives the same result as Vision.detect() for all rays at once.
+    
+    Several grids can be processed together, by stacking them on a first 
+    (batch) dimension of items, rays and center.
+
+    Parameters
+    ----------
+    items : numpy.ndarray
+        Flat array of items values of the grid, see pysnake.grid.Grid.ravel().
+        For several grids, array of shape (num_grids, height * width).
+    rays : numpy.ndarray
+        Array of shape (num_rays, max_length), with the flat indices of the
+        cells along each ray, padded with -1.
+        For several grids, array of shape (num_grids, num_rays, max_length).
+    center : tuple(int, int) or numpy.ndarray
+        Coordinates (i, j) of the rays' origin.
+        For several grids, array of shape (num_grids, 2).
+    width : int
+        Width of the grid.
+
+    Returns
+    -------
+    seen : numpy.ndarray
+        Boolean array of shape ([num_grids], num_rays, num_class), True if an item of
+        the class is visible from the ray.
+    distances : numpy.ndarray
+        Array of shape ([num_grids], num_rays, num_class), with the Euclidean distance from 
+        the center to the nearest item of each class, 0 if it is not visible.
+    """
+    num_class = len(Item) - 1
+    # Items along the rays, padding cells are seen as empty
+    if items.ndim == 1:
+        values = items[rays]
+    else:
+        values = np.take_along_axis(items[:, np.newaxis, :], rays, axis=2)
+    values = np.where(rays >= 0, values, Item.EMPTY.value)
+    # Mask of each class, of shape (..., num_rays, num_class, max_length)
+    hits = values[..., np.newaxis, :] == np.arange(num_class)[:, np.newaxis]
+    # The first hit of each class
+    first = hits.argmax(axis=-1)
+    seen = np.take_along_axis(hits, first[..., np.newaxis], axis=-1)[..., 0]
+    cells = np.take_along_axis(rays, first, axis=-1)
+    cells_i, cells_j = np.divmod(cells, width)
+    center = np.asarray(center)
+    center_i = center[..., 0, np.newaxis, np.newaxis]
+    center_j = center[..., 1, np.newaxis, np.newaxis]
+    distances = np.sqrt((center_i - cells_i)**2 + (center_j - cells_j)**2)
+    distances[~seen] = 0
+    return seen, distances
+
+
+def encode_binary(seen, distances):
+    """
+    Encode detected items as in Vision.to_binary(), for all rays.
+
+    Parameters
+    ----------
+    seen : numpy.ndarray
+        Visible classes, of shape (..., num_class).
+    distances : numpy.ndarray
+        Distances to the nearest items, of shape (..., num_class).
+
+    Returns
+    -------
+    binary_vision : numpy.ndarray
+        Array of the same shape, where the value is 1 if the class is visible,
+        0 either. Walls are encoded with the inverse of their distance.
+    """
+    binary_vision = seen.astype(float)
+    wall = Item.WALL.value
+    np.divide(1, distances[..., wall], out=binary_vision[..., wall], where=seen[..., wall])
+    return binary_vision
+
+
+
 class Vision:
     """
     Sensor detecting items in a grid.
@@ -53,19 +527,65 @@ class Vision:
             ['EMPTY', 'EMPTY', 'EMPTY', 'EMPTY', 'EMPTY']
     """
     
-    def __init__(self, grid, center, angle=0, max_length=None):
+    def __init__(self, grid, center, angle=0, max_length=None, ray_table=None):
         
         # Vision in a grid !
         self.grid = grid
-                
-        self.angle = angle % 360 # Get the modulo [360], for convenience
         self.max_length = max_length
+        self.ray_table = ray_table
+        self.update(center, angle)
+        
+        
+    def update(self, center, angle):
+        """
+        Move and rotate the vision. The ray, its end point and the visible
+        items are only computed when they are read.
+        If the vision has a ray table matching the grid, the ray is read from
+        the table instead of being traced.
+
+        Parameters
+        ----------
+        center : pysnake.grid.Cell
+            New center of the vision.
+        angle : int
+            New angle from the North.
+
+        Returns
+        -------
+        None.
+        """
+        self.angle = angle % 360 # Get the modulo [360], for convenience
         self.center = center
-        self.end_point = self._get_end_point()
-        self.end_cell = self.grid[int(self.end_point[0]), int(self.end_point[1])]
         
-        # Visibe item from its vision
-        self.nearest_cells = self.detect()
+        # Get the ray from the precomputed table
+        table = self.ray_table
+        self._k = None
+        if table is not None and table.shape == self.grid.shape:
+            self._k = table.angle_index(self.angle)
+        
+        # Ray and visible items, computed on demand
+        self._ray = None
+        self._end_point = None
+        self._nearest_cells = None
+        
+        
+    def _get_ray(self):
+        """
+        Get the flat indices of the cells along the ray, from the table or traced.
+
+        Returns
+        -------
+        numpy.ndarray
+            Flat indices (i * width + j) of the cells, from the nearest.
+        """
+        if self._ray is None:
+            if self._k is not None:
+                self._ray, self._end_point = self.ray_table.ray(self.center.coord, self._k)
+            else:
+                self._end_point = self._get_end_point()
+                visible_coords = get_ray_coords(self.center.coord, self._end_point)
+                self._ray = np.array([i * self.grid.shape[1] + j for (i, j) in visible_coords], dtype=np.intp)
+        return self._ray
                 
     
     def _get_end_point(self):
@@ -78,74 +598,7 @@ class Vision:
         end_point : tuple
             End point coordinates seen from center in the grid.
         """
-        
-        # Params
-        i, j = self.center.coord
-        height, width = self.grid.shape
-        angle = self.angle
-        angle_rad = np.deg2rad(angle)
-        # Get the last point seen by vision
-        end_point = None
-        
-        # Check the first quarter of the trigonometric circle
-        if angle == 0:
-            end_point = (0, j)
-        elif angle < 90:
-            j_end = j - np.tan(angle_rad) * (i)
-            i_end = i - np.tan(np.pi/2 - angle_rad) * (j)
-            
-            # Avoid issues with float numbers...
-            i_end, j_end = round(i_end, ndigits=12), round(j_end, ndigits=12)
-            # If i_end <= i - i0, 
-            # it means that the ray will it the left side of the grid
-            if 0 <= i_end <= i:
-                end_point = (i_end, 0)
-            else:
-                end_point = (0, j_end)
-                
-        # Second quarter
-        elif angle == 90:
-            end_point = (i, 0)
-        elif angle < 180:
-            j_end = j - np.tan(np.pi - angle_rad) * (height-1 - i)
-            i_end = i + np.tan(angle_rad - np.pi/2) * j
-            
-            # Avoid issues with float numbers...
-            i_end, j_end = round(i_end, ndigits=12), round(j_end, ndigits=12)
-            if i <= i_end <= height-1:
-                end_point = (i_end, 0)
-            else:
-                end_point = (height - 1, j_end)
-                
-        # Third quarter
-        elif angle == 180:
-            end_point = (height-1, j)
-        elif angle < 270:
-            j_end = j + np.tan(angle_rad - np.pi) * (height-1 - i)
-            i_end = i + np.tan(3*np.pi/2 - angle_rad) * (width-1 - j)
-            
-            # Avoid issues with float numbers...
-            i_end, j_end = round(i_end, ndigits=12), round(j_end, ndigits=12)
-            if i <= i_end <= height-1:
-                end_point = (i_end, width - 1)
-            else:
-                end_point = (height - 1, j_end)    
-                
-        # Last quarter
-        elif angle == 270:
-            end_point = (i, width-1)
-        else:
-            j_end = j + np.tan(2*np.pi - angle_rad) * i
-            i_end = i - np.tan(angle_rad - 3*np.pi/2) * (width-1 -  j)
-
-            # Avoid issues with float numbers...
-            i_end, j_end = round(i_end, ndigits=12), round(j_end, ndigits=12)            
-            if 0 <= i_end <= i:
-                end_point = (i_end, width - 1)
-            else:
-                end_point = (0, j_end)  
-              
-        return end_point
+        return get_end_point(self.center.coord, self.angle, self.grid.shape)
 
 
     def look(self):
@@ -160,43 +613,9 @@ class Vision:
             List of all cells contained in the vision. This list contains
             items like apples, snakes, walls, but empty items too.
         """
-        # Star and end points
-        start_i, start_j = self.center.coord
-        end_i, end_j = self.end_point
-        # End point seen on the grid system
-        end_i, end_j = int(round(end_i)), int(round(end_j))
-        
-        # Know wich direction to draw the line
-        delta_i = abs(end_i - start_i)
-        delta_j = abs(end_j - start_j)        
-        sign_j = np.sign(end_j - start_j)
-        sign_i = np.sign(end_i - start_i)
-            
-        err = delta_i - delta_j
-        
-        # Collect the cells visible from the starting point
-        visible_cells = []       
-        while (start_i != end_i or start_j != end_j):
-
-            e2 = 2 * err
-            if e2 >= - delta_j:
-                # overshot in the y direction
-                err = err - delta_j
-                start_i = start_i + sign_i               
-                # cell = self.grid[start_i, start_j]
-                # visible_cells.append(cell)
-                
-            if e2 <= delta_i:
-                # overshot in the x direction
-                err = err + delta_i
-                start_j = start_j + sign_j
-                # cell = self.grid[start_i, start_j]
-                # visible_cells.append(cell)
-                
-            cell = self.grid[start_i, start_j]
-            visible_cells.append(cell)
-
-        return visible_cells
+        grid = self.grid
+        width = grid.shape[1]
+        return [grid[divmod(index, width)] for index in self._get_ray().tolist()]
             
     
     def detect(self):
@@ -221,6 +640,37 @@ class Vision:
                     nearest_cells.append(cell)
                 # Return cell containing first visible object
         return nearest_cells
+    
+    @property
+    def nearest_cells(self):
+        if self._nearest_cells is None:
+            self._nearest_cells = self.detect()
+        return self._nearest_cells
+    
+    @nearest_cells.setter
+    def nearest_cells(self, value):
+        self._nearest_cells = value
+    
+    @property
+    def end_point(self):
+        if self._end_point is None:
+            self._get_ray()
+        return self._end_point
+    
+    @end_point.setter
+    def end_point(self, value):
+        raise AttributeError("attribute 'end_point' of 'Vision' objects is not writable.",
+                             "Use Vision.update() instead.")
+    
+    @property
+    def end_cell(self):
+        end_point = self.end_point
+        return self.grid[int(end_point[0]), int(end_point[1])]
+    
+    @end_cell.setter
+    def end_cell(self, value):
+        raise AttributeError("attribute 'end_cell' of 'Vision' objects is not writable.",
+                             "Use Vision.update() instead.")
                 
         
     def to_binary(self):
@@ -289,6 +739,10 @@ class FullVision:
         Maximal length of the rays visions.
     bearing: int
         Angle from V0 to the North.
+    ray_table: pysnake.vision.RayTable
+        Precomputed rays shared by all sensors with the same grid's shape and mode.
+    visions: list(pysnake.vision.Vision)
+        Visions of the sensor, from V0. They are moved when they are read.
     """
     
     def __init__(self, grid, center, bearing, max_length=None, mode=8):
@@ -301,7 +755,12 @@ class FullVision:
         self.max_length = max_length
         self.bearing = bearing
         # Create all visions objects
-        self.visions = self._init_visions(self.bearing)
+        self._visions = self._init_visions(self.bearing)
+        self._visions_moved = True
+        # Indices of the rays of the visions, for each first ray
+        self._ray_ks = (np.arange(mode)[:, np.newaxis] + np.arange(mode)) % mode
+        self._inverse_wall = np.empty(mode)
+        self._detect()
         
                 
     def _init_visions(self, bearing):
@@ -321,11 +780,12 @@ class FullVision:
         """
         visions = []
         mode = self.mode
+        self.ray_table = get_ray_table(self.grid.shape, mode)
         # Create n_mode vision objects, with an equal angle theta from each other
         theta = 360 / mode
         angle = bearing
         for i in range(mode):
-            vision = Vision(self.grid, self.center, angle, self.max_length)
+            vision = Vision(self.grid, self.center, angle, self.max_length, ray_table=self.ray_table)
             visions.append(vision)
             # Rotate the next vision
             angle += theta
@@ -335,7 +795,8 @@ class FullVision:
     
     def update(self, center, bearing):
         """
-        Update state and visible cells of visions objects.
+        Move and rotate the sensor, and detect the visible items of all rays.
+        The visions objects are only updated when they are read.
 
         Parameters
         ----------
@@ -350,7 +811,107 @@ class FullVision:
         """
         self.center = center
         self.bearing = bearing
-        self.visions = self._init_visions(bearing)
+        # The grid can change, e.g. when a snake is added to another game
+        if self.ray_table.shape != self.grid.shape:
+            self.ray_table = get_ray_table(self.grid.shape, self.mode)
+        self._visions_moved = False
+        self._detect()
+        
+        
+    def _move_visions(self):
+        """
+        Move and rotate the visions to the sensor's center and bearing,
+        without creating new objects.
+
+        Returns
+        -------
+        None.
+        """
+        theta = 360 / self.mode
+        angle = self.bearing
+        for vision in self._visions:
+            vision.grid = self.grid
+            vision.ray_table = self.ray_table
+            vision.update(self.center, angle)
+            angle += theta
+        self._visions_moved = True
+        
+        
+    def _detect(self):
+        """
+        Detect the visible items of all visions at once.
+
+        Returns
+        -------
+        None.
+        """
+        width = self.grid.shape[1]
+        k0 = None
+        if self.ray_table.shape == self.grid.shape:
+            k0 = self.ray_table.angle_index(self.bearing)
+        if k0 is not None:
+            # All rays are precomputed
+            i, j = self.center.coord
+            rays = self.ray_table.indices[i * width + j, self._ray_ks[k0]]
+        else:
+            visible_rays = [vision._get_ray() for vision in self.visions]
+            max_length = max(ray.size for ray in visible_rays)
+            rays = np.full((self.mode, max_length), -1, dtype=np.intp)
+            for (k, ray) in enumerate(visible_rays):
+                rays[k, :ray.size] = ray
+        self._seen, self._distances = detect_items(self.grid.ravel(), rays, self.center.coord, width)
+        
+        
+    def to_binary(self, out=None):
+        """
+        Convert the nearest cells of all visions to a binary encoded vector.
+        This is the concatenation of Vision.to_binary() for all visions.
+
+        Parameters
+        ----------
+        out : numpy.ndarray, optional
+            Array of shape mode * num_class where to write the vector.
+            The default is None, i.e. a new array is created.
+
+        Returns
+        -------
+        binary_vision : numpy.ndarray
+            Array of shape mode * num_class.
+        """
+        if out is None:
+            return encode_binary(self._seen, self._distances).reshape(-1)
+        # Same encoding, without temporary arrays
+        binary_vision = out.reshape(self._seen.shape)
+        np.copyto(binary_vision, self._seen)
+        # Walls are encoded with the inverse of their distance, which is at least 1 when seen
+        wall = Item.WALL.value
+        inverse = self._inverse_wall
+        np.maximum(self._distances[:, wall], 1, out=inverse)
+        np.reciprocal(inverse, out=inverse)
+        np.multiply(binary_vision[:, wall], inverse, out=binary_vision[:, wall])
+        return out
+    
+    
+    def to_distances(self, out=None):
+        """
+        Convert the nearest cells of all visions to a distances encoded vector.
+        This is the concatenation of Vision.to_distances() for all visions.
+
+        Parameters
+        ----------
+        out : numpy.ndarray, optional
+            Array of shape mode * num_class where to write the vector.
+            The default is None, i.e. a new array is created.
+
+        Returns
+        -------
+        distance_vision : numpy.ndarray
+            Array of shape mode * num_class.
+        """
+        if out is None:
+            return self._distances.reshape(-1)
+        out[:] = self._distances.reshape(-1)
+        return out
     
     
     def __getitem__(self, index):
@@ -388,4 +949,19 @@ class FullVision:
         self.visions[index] = value
     
     
+    # -------------------------------------------------------------------------
+    # Getters and setters
+    
+    @property
+    def visions(self):
+        if not self._visions_moved:
+            self._move_visions()
+        return self._visions
+    
+    @visions.setter
+    def visions(self, value):
+        raise AttributeError("attribute 'visions' of 'FullVision' objects is not writable.",
+                             "Use FullVision[index] = vision instead.")
+    
+    
     
\ No newline at end of file
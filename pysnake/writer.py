@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 20:14:52 2026
+# @author: arthurd
+
+"""
+Saves in a background thread, so that the training does not wait for the files.
+"""
+
+
+# Useful packages
+import time
+import queue
+import threading
+
+
+
+class BackgroundWriter:
+    """
+    Run save functions in a background thread, in the order they are submitted.
+    The arguments must be snapshots (e.g. copies of the genomes), as they
+    are read while the training goes on.
+
+    The queue is bounded: when max_queue saves are waiting, submit() waits
+    for the oldest one to be written. With max_queue = 0, the saves are
+    written in the calling thread.
+    An error raised by a save is raised again by the next submit(), flush()
+    or close().
+
+    Attributes
+    ----------
+    max_queue : int
+        Maximum number of saves waiting to be written.
+    num_writes : int
+        Number of saves written.
+    total_latency : float
+        Time spent writing, in seconds.
+    max_latency : float
+        Longest write, in seconds.
+    queue_depth : int
+        Number of saves waiting to be written.
+    mean_latency : float
+        Mean time of a write, in seconds.
+
+    Example
+    -------
+        >>> with BackgroundWriter(max_queue=4) as writer:
+        ...     writer.submit(save_snake, snake, "snake_0.json", dirpath="saves")
+        >>> writer.stats()
+            {'writes': 1, 'queue_depth': 0, 'mean_latency': 0.002, 'max_latency': 0.002}
+    """
+
+    def __init__(self, max_queue = 4):
+        self.max_queue = max_queue
+        self.num_writes = 0
+        self.total_latency = 0.
+        self.max_latency = 0.
+        self._queue = queue.Queue(maxsize = max_queue)
+        self._thread = None
+        self._error = None
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def _write(self, function, args, kwargs):
+        """
+        Run a save and measure its latency.
+
+        Returns
+        -------
+        None.
+        """
+        start = time.perf_counter()
+        try:
+            function(*args, **kwargs)
+        except Exception as error:
+            if self._error is None:
+                self._error = error
+        latency = time.perf_counter() - start
+        self.num_writes += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+
+    def _run(self):
+        """
+        Write the queued saves, until the sentinel None.
+
+        Returns
+        -------
+        None.
+        """
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                self._write(*task)
+            finally:
+                self._queue.task_done()
+
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Queue a save. Waits if the queue is full.
+
+        Parameters
+        ----------
+        function : function
+            Save function, e.g. pysnake.io.save_snake.
+        *args, **kwargs : parameters
+            Arguments of the function.
+
+        Returns
+        -------
+        None.
+        """
+        self._raise_error()
+        if self.max_queue == 0:
+            self._write(function, args, kwargs)
+            self._raise_error()
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target = self._run, name = "pysnake-writer", daemon = True)
+            self._thread.start()
+        self._queue.put((function, args, kwargs))
+
+
+    def flush(self):
+        """
+        Wait until all the queued saves are written.
+
+        Returns
+        -------
+        None.
+        """
+        if self._thread is not None:
+            self._queue.join()
+        self._raise_error()
+
+
+    def close(self):
+        """
+        Write the queued saves and stop the thread.
+
+        Returns
+        -------
+        None.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._raise_error()
+
+
+    def stats(self):
+        """
+        Statistics of the saves.
+
+        Returns
+        -------
+        dict
+            Number of writes, queue depth, mean and max latency in seconds.
+        """
+        return {"writes": self.num_writes,
+                "queue_depth": self.queue_depth,
+                "mean_latency": self.mean_latency,
+                "max_latency": self.max_latency}
+
+
+    # -------------------------------------------------------------------------
+    # Getters and setters
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    @queue_depth.setter
+    def queue_depth(self, value):
+        raise AttributeError("attribute 'queue_depth' of 'BackgroundWriter' objects is not writable.")
+
+    @property
+    def mean_latency(self):
+        return self.total_latency / self.num_writes if self.num_writes > 0 else 0.
+
+    @mean_latency.setter
+    def mean_latency(self, value):
+        raise AttributeError("attribute 'mean_latency' of 'BackgroundWriter' objects is not writable.")
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 21:12:45 2026
+# @author: arthurd
+
+
+import os
+import json
+import tempfile
+import contextlib
+import io
+
+from pysnake.bench import main
+
+
+
+def test_bench():
+    with tempfile.TemporaryDirectory() as dirpath:
+        output = os.path.join(dirpath, "bench.json")
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            report = main(["--quick", "--board-sizes", "10x12", "--population-sizes", "12", "--output", output])
+        # Same json printed and saved
+        assert json.loads(stdout.getvalue()) == report
+        with open(output) as f:
+            assert json.load(f) == report
+    results = report["results"]
+    assert sorted(results) == ["forward", "generation", "move", "vision"]
+    assert results["move"]["10x12"]["steps_per_second"] > 0
+    assert sorted(results["vision"]["10x12"], key=int) == ["4", "8", "16"]
+    assert list(results["forward"]["batched_networks"]) == ["12"]
+    assert results["generation"]["10x12"]["12"]["seconds_per_generation"] > 0
+
+
+
+if __name__ == "__main__":
+
+    # Benchmarks
+    print("Testing pysnake.bench...")
+    test_bench()
+    print("pysnake.bench tested.")
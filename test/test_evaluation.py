@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 15:02:47 2026
+# @author: arthurd
+
+
+import numpy as np
+
+from pysnake.game import Game
+from pysnake.snake import Snake
+from pysnake.vision import RayTable, get_ray_table
+from pysnake.evaluation import Evaluator, play, _init_worker
+
+
+
+def test_play():
+    snake_params = {"vision_type": "binary", "hunger_max": 100}
+    genomes = [Snake(Game((12, 12), seed=seed), **snake_params).genome for seed in range(10)]
+    # A reused game gives the same results as new games
+    game = Game((12, 12))
+    for (seed, genome) in enumerate(genomes):
+        snake = play(game, genome, seed, **snake_params)
+        fresh_snake = play(Game((12, 12)), genome, seed, **snake_params)
+        assert (snake.fitness, snake.score, snake.lifespan) == (fresh_snake.fitness, fresh_snake.score, fresh_snake.lifespan)
+        assert game.grid.num_empty == 10 * 10
+
+
+def test_evaluator():
+    snake_params = {"vision_type": "binary", "hunger_max": 100}
+    genomes = np.stack([Snake(Game((12, 12), seed=seed), **snake_params).genome for seed in range(20)])
+    seeds = 100 + np.arange(20)
+    with Evaluator((12, 12), snake_params, workers=1) as evaluator:
+        results = evaluator.evaluate(genomes, seeds)
+    assert results.shape == (20, 3)
+
+    # Same results with several processes and chunks
+    with Evaluator((12, 12), snake_params, workers=2, chunk_size=3) as evaluator:
+        assert np.array_equal(evaluator.evaluate(genomes, seeds), results)
+        # The shared memory is reused for smaller genomes matrices
+        assert np.array_equal(evaluator.evaluate(genomes[5:], seeds[5:]), results[5:])
+
+    # The workers use the ray table traced by the main process
+    table = RayTable((12, 12), 8)
+    _init_worker((12, 12), snake_params, "game", table)
+    assert get_ray_table((12, 12), 8) is table
+
+
+
+if __name__ == "__main__":
+
+    # play
+    print("Testing play()...")
+    test_play()
+    print("play() tested.")
+
+    # Evaluator
+    print("Testing Evaluator...")
+    test_evaluator()
+    print("Evaluator tested.")
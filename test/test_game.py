@@ -2,6 +2,9 @@
 # Created on Wed Feb 19 20:29:15 2020
 # @author: arthurd
 
+import sys
+import subprocess
+
 from pysnake.enum import Item
 from pysnake import Game, Cell
 
@@ -21,6 +24,34 @@ def test_game():
 
 
 
+def test_generate_apple():
+    
+    def apples(seed):
+        game = Game((10, 10), seed=seed)
+        coords = []
+        for _ in range(30):
+            game.add_apple()
+            coords.append(game.apples[-1].coord)
+        return coords, game
+    
+    coords, game = apples(42)
+    # Apples are placed on different empty cells, and the sequence is seeded
+    assert len(set(coords)) == len(coords)
+    assert all(0 < i < 9 and 0 < j < 9 for (i, j) in coords)
+    assert game.grid.num_empty == 8 * 8 - 30
+    assert apples(42)[0] == coords
+
+
+
+def test_imports():
+    # The package and the game are imported without pygame nor the training stack
+    code = ("import sys, pysnake; assert list(m for m in sys.modules if m.startswith('pysnake')) == ['pysnake']; "
+            "import pysnake.game, pysnake.io; assert 'pygame' not in sys.modules; "
+            "assert 'pysnake.trainer' not in sys.modules; assert pysnake.Game is pysnake.game.Game")
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+
 if __name__ == "__main__":
     
     # Testing Game
@@ -13,7 +13,8 @@ np.random.seed(42)
 rd.seed(42)
 
 # Import pysnake modules
-from pysnake.gen import Individual, Population
+from pysnake.gen import Individual, Population, GenomePopulation, Chromosome
+from pysnake.gen.chromosome import sample_mutations
 
 
 
@@ -55,6 +56,22 @@ class MyIndividual(Individual):
 
 
 
+class GenomeIndividual(Individual):
+    
+    def __init__(self, genome, slices):
+        self.genome = genome
+        self.slices = slices
+        super().__init__()
+        
+    def encode_chromosomes(self):
+        return [Chromosome(self.genome[index], id=i) for (i, index) in enumerate(self.slices)]
+    
+    def calculate_fitness(self):
+        self.fitness = self.genome.sum()
+
+
+
+
 def test_individual():
     # 1/ Test the default individual
     ind = MyIndividual()
@@ -153,6 +170,166 @@ def test_genalgo():
     plt.show()
 
 
+def test_genome_population():
+    sizes = [12, 3, 6]
+    genomes = np.random.normal(size=(20, sum(sizes)))
+    bounds = np.cumsum([0] + sizes)
+    slices = [slice(start, end) for (start, end) in zip(bounds[:-1], bounds[1:])]
+    fitness = np.random.uniform(0, 10, size=20)
+    pop = GenomePopulation(genomes, ["W_1", "b_1", "W_2"], slices, fitness=fitness)
+    assert pop.size == 20
+    chromosomes = pop.chromosomes(3)
+    assert [chromosome.id for chromosome in chromosomes] == ["W_1", "b_1", "W_2"]
+    assert all(np.shares_memory(chromosome.genes, genomes) for chromosome in chromosomes)
+    
+    # Selection
+    assert np.array_equal(pop.select_elitism(5), np.argsort(fitness)[::-1][:5])
+    roulette = pop.select_roulette_wheel(1000)
+    assert roulette.min() >= 0 and roulette.max() < 20
+    # No individual without fitness is selected
+    pop.fitness[:10] = 0
+    assert np.all(pop.select_roulette_wheel(1000) >= 10)
+    
+    # Crossover
+    genomes1, genomes2 = genomes[:5], genomes[5:10]
+    children1, children2 = pop.crossover_simulated_binary(genomes1, genomes2, eta=100)
+    assert np.allclose(children1 + children2, genomes1 + genomes2)
+    children1, children2 = pop.crossover_single_point(genomes1, genomes2)
+    assert np.array_equal(np.where(children1 == genomes1, genomes1, genomes2), children1)
+    assert np.array_equal(children1 + children2, genomes1 + genomes2)
+    # Each chromosome is cut once: genes of the first parent, then the second
+    for (child, genome1) in zip(children1, genomes1):
+        for index in slices:
+            from_parent1 = child[index] == genome1[index]
+            assert np.all(np.diff(from_parent1.astype(int)) <= 0)
+    
+    # Mutation and next generation
+    mutated = genomes1.copy()
+    pop.mutate_gaussian(mutated, 1)
+    assert np.all(mutated != genomes1)
+    next_pop = pop.breed(num_parents=4, num_offspring=15, prob_mutation=0)
+    assert next_pop.genomes.shape == (19, sum(sizes))
+    assert np.array_equal(next_pop.genomes[:4], genomes[pop.select_elitism(4)])
+    # SBX when a draw is above probability_SBX: never with 1, single point 
+    # crossovers only copy the parents' genes
+    parents = GenomePopulation(np.random.normal(size=(200, sum(sizes))), ["W_1", "b_1", "W_2"], slices, 
+                               fitness=np.ones(200))
+    parent_genes = [set(column) for column in parents.genomes.T]
+    def copied_genes(probability_SBX):
+        offspring = parents.breed(0, 40, probability_SBX=probability_SBX, prob_mutation=0).genomes
+        return np.mean([gene in parent_genes[j] for child in offspring for (j, gene) in enumerate(child)])
+    assert copied_genes(1) == 1
+    assert copied_genes(0) < 0.1
+    
+    # From individuals
+    individuals = [GenomeIndividual(genome, slices) for genome in genomes]
+    pop = GenomePopulation.from_individuals(individuals)
+    assert np.array_equal(pop.genomes, genomes)
+    assert np.array_equal(pop.fitness, genomes.sum(axis=1))
+    assert pop.chromosome_slices == slices
+
+def test_selection():
+    genomes = np.arange(1, 5)[:, np.newaxis] * np.ones((4, 3))
+    individuals = [GenomeIndividual(genome, [slice(0, 3)]) for genome in genomes]
+    pop = Population(individuals)
+    genome_pop = GenomePopulation.from_individuals(individuals)
+    # Fitness 3, 6, 9, 12
+    expected = np.array([0.1, 0.2, 0.3, 0.4])
+    
+    # Roulette wheel
+    selection = pop.select_roulette_wheel(20000)
+    counts = np.bincount([int(individual.fitness / 3) - 1 for individual in selection], minlength=4)
+    assert np.allclose(counts / 20000, expected, atol=0.02)
+    counts = np.bincount(genome_pop.select_roulette_wheel(20000), minlength=4)
+    assert np.allclose(counts / 20000, expected, atol=0.02)
+    # Updated fitness
+    individuals[0].genome[:] = 0
+    pop.calculate_fitness()
+    assert all(individual is not individuals[0] for individual in pop.select_roulette_wheel(100))
+    individuals[0].genome[:] = 1
+    pop.calculate_fitness()
+    # Fitness set directly, and individual replaced in place, after a selection
+    fitness_pop = Population([GenomeIndividual(genome.copy(), [slice(0, 3)]) for genome in genomes])
+    fitness_pop.select_roulette_wheel(100)
+    fitness_pop.individuals[0].fitness = 0
+    fitness_pop.individuals[3] = GenomeIndividual(np.full(3, 1000.), [slice(0, 3)])
+    for selection in [fitness_pop.select_roulette_wheel(4000), fitness_pop.select_stochastic_universal(4000)]:
+        assert all(individual is not fitness_pop.individuals[0] for individual in selection)
+        assert sum(individual is fitness_pop.individuals[3] for individual in selection) > 3900
+    
+    # Stochastic universal sampling: exact counts when they are integers
+    for num_individuals in [10, 20, 30]:
+        selection = pop.select_stochastic_universal(num_individuals)
+        counts = np.bincount([int(individual.fitness / 3) - 1 for individual in selection], minlength=4)
+        assert np.array_equal(counts, expected * num_individuals)
+        selection = genome_pop.select(num_individuals, selection_type="stochastic_universal")
+        assert np.array_equal(np.bincount(selection, minlength=4), expected * num_individuals)
+    # Expected count rounded down or up
+    counts = np.bincount(genome_pop.select_stochastic_universal(7), minlength=4)
+    assert np.all(np.abs(counts - expected * 7) < 1)
+    
+    # Elitism
+    assert [individual.fitness for individual in pop.select_elitism(3)] == [12, 9, 6]
+    assert np.array_equal(genome_pop.select_elitism(3), [3, 2, 1])
+    assert np.array_equal(genome_pop.select_elitism(10), [3, 2, 1, 0])
+    fitness = np.random.permutation(1000).astype(float)
+    genome_pop.fitness = fitness
+    assert np.array_equal(genome_pop.select_elitism(50), np.argsort(fitness)[::-1][:50])
+    
+    # Tournament
+    selection = genome_pop.select_tournament(500, 1000)
+    assert selection.shape == (500,)
+    # The best of a large tournament is likely to win
+    assert np.mean(fitness[selection]) > 900
+    # Tournaments of one individual select at random
+    selection = genome_pop.select_tournament(200, 1)
+    assert selection.min() >= 0 and selection.max() < 1000 and len(np.unique(selection)) > 100
+    assert all(individual.fitness == 12 for individual in pop.select_tournament(10, 50))
+
+
+def test_mutation():
+    # Sparse (binomial) and dense draws follow the same law
+    for prob_mutation in [0.005, 0.02, 0.2]:
+        counts = np.zeros(100)
+        num_mutations = []
+        for _ in range(5000):
+            indices = sample_mutations(100, prob_mutation)
+            assert len(np.unique(indices)) == len(indices)
+            counts[indices] += 1
+            num_mutations.append(len(indices))
+        assert abs(np.mean(num_mutations) - 100 * prob_mutation) < 0.1 + 0.05 * 100 * prob_mutation
+        assert abs(np.var(num_mutations) - 100 * prob_mutation * (1 - prob_mutation)) < 0.2 * 100 * prob_mutation
+        # Same probability for all genes
+        assert np.all(np.abs(counts / 5000 - prob_mutation) < 5 * np.sqrt(prob_mutation / 5000))
+    assert np.array_equal(sample_mutations(10, 1), np.arange(10))
+    assert len(sample_mutations(10, 0)) == 0
+    
+    chromosome = Chromosome(np.zeros(1000, dtype=np.float32))
+    chromosome.mutate(0.01)
+    assert chromosome.genes.dtype == np.float32 and 0 < np.count_nonzero(chromosome.genes) < 50
+    # Genes assigned from another chromosome are not shared
+    genome = np.zeros(20)
+    other = Chromosome(genome[10:])
+    other.genes = chromosome.genes[:10]
+    other.mutate(1)
+    assert np.count_nonzero(chromosome.genes[:10]) < 10 and np.count_nonzero(genome) == 0
+    chromosome.genes = other.genes
+    assert not np.shares_memory(chromosome.genes, other.genes)
+    # Read-only genomes, e.g. from an archive
+    read_only = np.ones(5)
+    read_only.flags.writeable = False
+    other.genes = read_only
+    other.mutate(1)
+    assert np.all(read_only == 1)
+    
+    # Population level
+    genomes = np.zeros((300, 100))
+    pop = GenomePopulation(genomes, [0], [slice(0, 100)])
+    pop.mutate_gaussian(genomes[::2], 0.01)
+    assert np.count_nonzero(genomes[1::2]) == 0
+    assert 100 < np.count_nonzero(genomes) < 200
+
+
 
 if __name__ == "__main__":
     
@@ -167,6 +344,21 @@ if __name__ == "__main__":
     # test_population()
     # print("Population tested.")
 
+    # Test genome population
+    print("Testing GenomePopulation...")
+    test_genome_population()
+    print("GenomePopulation tested.")
+    
+    # Test selection
+    print("Testing selection...")
+    test_selection()
+    print("Selection tested.")
+    
+    # Test mutation
+    print("Testing mutation...")
+    test_mutation()
+    print("Mutation tested.")
+    
     test_genalgo()
     
     
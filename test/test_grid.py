@@ -3,6 +3,9 @@
 # @author: arthurd
 
 
+import pickle
+import numpy as np
+
 from pysnake import Item, Cell, Grid
 
 
@@ -18,6 +21,23 @@ def test_Cell():
 
 
 
+def test_Cell_flyweight():
+    cell = Cell((3, 4), Item.SNAKE)
+    # Cells are interned per (coord, item)
+    assert Cell((3, 4), Item.SNAKE) is cell
+    assert Cell([3, 4], Item.SNAKE) is cell
+    assert Cell((3, 4), Item.APPLE) is not cell
+    assert not hasattr(cell, '__dict__')
+    # and immutable
+    try:
+        cell.item = Item.APPLE
+        assert False, "a cell should not be writable"
+    except AttributeError:
+        pass
+    assert pickle.loads(pickle.dumps(cell)) is cell
+
+
+
 def test_Grid():
     shape = (10, 10)
     grid = Grid(shape)   
@@ -45,6 +65,49 @@ def test_Grid():
     print(grid)
 
 
+def test_Grid_items():
+    shape = (6, 8)
+    grid = Grid(shape)
+    grid.add_wall_borders()
+    grid.set_apple((2, 3))
+    grid.set_cell(Cell((4, 4), Item.SNAKE), Cell((4, 5), Item.SNAKE))
+    
+    # The array is the source of truth
+    assert grid.items.shape == shape
+    assert grid.items.dtype == np.int8
+    assert grid.items[2, 3] == Item.APPLE.value
+    assert grid.mask(Item.WALL).sum() == 2 * (6 + 8) - 4
+    assert grid.coords(Item.SNAKE).tolist() == [[4, 4], [4, 5]]
+    assert grid.ravel()[2 * 8 + 3] == Item.APPLE.value
+    
+    # Cells are created on demand
+    cell = grid[2, 3]
+    assert cell.coord == (2, 3) and cell.item is Item.APPLE
+    assert grid.is_apple(cell) and grid.is_snake(Cell((4, 5), Item.EMPTY))
+    assert not grid.is_empty(Cell((0, 0), Item.EMPTY))
+    assert [cell.item for cell in grid.row(0)] == [Item.WALL] * 8
+    assert grid.values[4][5].is_snake()
+    
+    # Padding with empty items
+    grid.pad((1, 2))
+    assert grid.shape == (8, 12)
+    assert grid[0, 0].is_empty() and grid[1, 2].is_wall()
+
+
+def test_Grid_empty_index():
+    rng = np.random.RandomState(0)
+    grid = Grid((7, 9))
+    grid.add_wall_borders()
+    items = [Item.EMPTY, Item.SNAKE, Item.APPLE, Item.WALL]
+    for _ in range(500):
+        coord = tuple(rng.randint(0, 7, size=1)) + tuple(rng.randint(0, 9, size=1))
+        grid.set_cell(Cell(coord, items[rng.randint(len(items))]))
+        # The index always matches the empty cells of the array
+        empty_coords = {grid.empty_coord(k) for k in range(grid.num_empty)}
+        assert grid.num_empty == len(empty_coords) == grid.mask(Item.EMPTY).sum()
+        assert empty_coords == {tuple(coord) for coord in grid.coords(Item.EMPTY).tolist()}
+
+
 if __name__ == "__main__":
     
 
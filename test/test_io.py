@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 18:40:12 2026
+# @author: arthurd
+
+
+import os
+import tempfile
+import numpy as np
+
+from pysnake.game import Game
+from pysnake.snake import Snake
+from pysnake.io import save_snake, load_snake, load_params, load_population
+from pysnake.io import save_population_archive, PopulationArchive
+from pysnake.gen.population import GenomePopulation
+
+
+
+def test_save_snake():
+    snake = Snake(Game((12, 14), seed=3), vision_mode=4, nn_hidden_layers=[10], nn_dtype="float32")
+    with tempfile.TemporaryDirectory() as dirpath:
+        save_snake(snake, "snake.json", dirpath=dirpath)
+        save_snake(snake, "snake.npz", dirpath=dirpath)
+        assert sorted(os.listdir(dirpath)) == ["snake.json", "snake.npz"]
+        # Same snake from both formats
+        for filename in ["snake.json", "snake.npz"]:
+            loaded = load_snake(os.path.join(dirpath, filename))
+            assert loaded.genome.dtype == np.float32
+            assert np.array_equal(loaded.genome, snake.genome)
+            assert loaded.game.shape == snake.game.shape
+            assert loaded.seed == snake.seed
+            assert [cell.coord for cell in loaded.body] == [cell.coord for cell in snake.body]
+        params = load_params(os.path.join(dirpath, "snake.npz"))
+        assert np.array_equal(params["nn_params"]["W_1"], snake.nn.params["W_1"])
+        # The binary format is read with numpy
+        with np.load(os.path.join(dirpath, "snake.npz")) as data:
+            assert np.array_equal(data["genome"], snake.genome)
+
+
+
+def test_population_archive():
+    snake_params = {"vision_mode": 4, "nn_hidden_layers": [6], "hunger_max": 50}
+    snakes = [Snake(Game((10, 10), seed=seed), **snake_params) for seed in range(20)]
+    genomes = GenomePopulation.from_individuals(snakes)
+    seeds = np.arange(20) + 100
+    results = np.stack([np.arange(20) * 7 % 20 + .5, np.arange(20) % 3, np.arange(20)], axis=1)
+    with tempfile.TemporaryDirectory() as dirpath:
+        filename = os.path.join(dirpath, "generation_0.pop")
+        save_population_archive(filename, genomes, (10, 10), snake_params, seeds, results, generation=0)
+        archive = PopulationArchive(filename)
+        assert archive.size == 20 and archive.metadata == {"generation": 0}
+        assert np.array_equal(archive.genomes, genomes.genomes)
+        # Best snakes
+        best = archive.top(3)
+        assert [individual.id for individual in best] == [17, 14, 11]
+        assert archive.fittest.fitness == 19.5
+        # Snakes are created when they are played
+        snake = archive.snake(13)
+        assert np.array_equal(snake.genome, snakes[13].genome)
+        assert (snake.seed, snake.score, snake.lifespan) == (113, 1, 13)
+        assert snake.game.shape == (10, 10)
+        population = load_population(filename)
+        assert population.fittest.id == 17
+        assert np.array_equal(GenomePopulation.from_individuals(population.individuals).genomes, genomes.genomes)
+        del archive, population, best
+
+
+def test_load_population():
+    snakes = [Snake(Game((12, 14), seed=seed), vision_mode=4, nn_hidden_layers=[10], nn_dtype="float32")
+              for seed in range(6)]
+    snakes[2].score, snakes[2].lifespan = 3, 120
+    with tempfile.TemporaryDirectory() as dirpath:
+        for (i, snake) in enumerate(snakes):
+            snake.id = i
+            save_snake(snake, "snake_{}.{}".format(i, ["json", "npz"][i % 2]), dirpath=dirpath)
+        for workers in [1, 2]:
+            population = load_population(dirpath, workers=workers)
+            assert population.size == 6
+            # Only the genomes are loaded
+            individuals = sorted(population.individuals, key=lambda individual: individual.id)
+            for (individual, snake) in zip(individuals, snakes):
+                assert individual.genome.dtype == np.float32
+                assert np.array_equal(individual.genome, snake.genome)
+            assert population.fittest.id == 2
+            # The snake is created to play
+            snake = population.fittest.to_snake()
+            assert (snake.seed, snake.vision_mode) == (2, 4)
+            assert [cell.coord for cell in snake.body] == [cell.coord for cell in snakes[2].body]
+
+
+
+if __name__ == "__main__":
+
+    # save_snake / load_snake
+    print("Testing save_snake()...")
+    test_save_snake()
+    print("save_snake() tested.")
+
+    # Population archive
+    print("Testing PopulationArchive...")
+    test_population_archive()
+    print("PopulationArchive tested.")
+
+    # load_population
+    print("Testing load_population()...")
+    test_load_population()
+    print("load_population() tested.")
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 11:40:27 2026
+# @author: arthurd
+
+
+import io
+import contextlib
+import numpy as np
+np.random.seed(42)
+
+from pysnake.nn.neuralnetwork import NeuralNetwork, BatchedNeuralNetwork
+from pysnake.game import Game
+from pysnake.snake import Snake
+from pysnake.trainer import Trainer
+
+
+
+def test_batched_forward():
+    layer_dimensions = [32, 20, 12, 4]
+    networks = [NeuralNetwork(layer_dimensions) for _ in range(50)]
+    batched = BatchedNeuralNetwork.from_networks(networks)
+    assert batched.size == 50
+    assert batched.params["W_2"].shape == (50, 20, 12)
+    
+    # One input per network
+    X = np.random.random((50, 32))
+    Y = batched.forward(X)
+    assert Y.shape == (50, 4)
+    for (x, y, network) in zip(X, Y, networks):
+        assert np.allclose(network.forward(x[:, np.newaxis])[:, 0], y)
+    assert np.array_equal(batched.predict(X), 
+                          [np.argmax(network.forward(x[:, np.newaxis])) for (x, network) in zip(X, networks)])
+    
+    # Batch of inputs per network, from flat params (as decoded chromosomes)
+    params_list = [{key: param.reshape(-1) for (key, param) in network.params.items()} for network in networks]
+    batched = BatchedNeuralNetwork(layer_dimensions, params_list)
+    X = np.random.random((50, 32, 7))
+    Y = batched.forward(X)
+    assert Y.shape == (50, 4, 7)
+    assert np.allclose(Y.sum(axis=1), 1)
+    for (x, y, network) in zip(X, Y, networks):
+        assert np.allclose(network.forward(x), y)
+
+
+def test_float32_decisions():
+    layer_dimensions = [32, 20, 12, 4]
+    for seed in range(20):
+        np.random.seed(seed)
+        network64 = NeuralNetwork(layer_dimensions)
+        network32 = NeuralNetwork(layer_dimensions, params=network64.params, dtype=np.float32)
+        assert network32.params["W_1"].dtype == np.float32
+        X = np.random.random((32, 100))
+        Y = network32.forward(X)
+        assert Y.dtype == np.float32
+        assert np.array_equal(np.argmax(Y, axis=0), np.argmax(network64.forward(X), axis=0))
+    
+    # Same games played by float64 and float32 snakes. Random networks die
+    # in a few steps, so the snakes are the best of a short training
+    with contextlib.redirect_stdout(io.StringIO()):
+        population, _ = Trainer((15, 15), {"nn_hidden_layers": [20, 12]}, seed=1, num_generations=5,
+                                num_parents=20, num_offspring=40).train()
+    best = sorted(population.individuals, key=lambda individual: -individual.fitness)[:5]
+    lifespans = []
+    for individual in best:
+        directions = {}
+        for dtype in ["float64", "float32"]:
+            game = Game((15, 15), seed=individual.seed)
+            snake = Snake(game, genome=individual.genome.astype(dtype), nn_hidden_layers=[20, 12], nn_dtype=dtype)
+            game.start(snake)
+            assert snake.compute_input().dtype == dtype
+            directions[dtype] = []
+            is_alive = True
+            while is_alive and len(directions[dtype]) < 200:
+                snake.direction = snake.next_direction()
+                directions[dtype].append(snake.direction)
+                is_alive = snake.move()
+        assert directions["float64"] == directions["float32"]
+        # The snakes turn
+        assert len(set(directions["float64"])) > 1
+        lifespans.append(len(directions["float64"]))
+    # And some of them play long games
+    assert max(lifespans) == 200
+
+
+if __name__ == "__main__":
+    
+    # BatchedNeuralNetwork
+    print("Testing BatchedNeuralNetwork.forward()...")
+    test_batched_forward()
+    print("BatchedNeuralNetwork.forward() tested.")
+    
+    # float32 mode
+    print("Testing float32 decisions...")
+    test_float32_decisions()
+    print("float32 decisions tested.")
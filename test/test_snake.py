@@ -2,13 +2,150 @@
 # Created on Wed Feb 19 19:55:21 2020
 # @author: arthurd
 
+import numpy as np
 
+from pysnake.game import Game
+from pysnake.snake import Snake, compute_inputs
 
 
 
+def test_compute_inputs():
+    for vision_type in ["binary", "distance"]:
+        for vision_mode in [4, 8, 16]:
+            games = []
+            snakes = []
+            for seed in range(6):
+                game = Game((12, 15), seed=seed)
+                snake = Snake(game, vision_mode=vision_mode, vision_type=vision_type)
+                game.start(snake)
+                # Move the snakes a bit
+                for _ in range(seed):
+                    if not snake.move():
+                        break
+                # Rotate the vision
+                snake.bearing = 90 * (seed % 4)
+                snake.update()
+                games.append(game)
+                snakes.append(snake)
+            
+            boards = np.stack([game.grid.items for game in games])
+            heads = [snake.body[-1].coord for snake in snakes]
+            directions = [snake.direction for snake in snakes]
+            tail_directions = [snake.tail_direction.value for snake in snakes]
+            bearings = [snake.bearing for snake in snakes]
+            X = compute_inputs(boards, heads, directions, tail_directions, bearings=bearings,
+                               vision_mode=vision_mode, vision_type=vision_type)
+            
+            assert X.shape == (6, vision_mode * 3 + 8)
+            for (x, snake) in zip(X, snakes):
+                assert np.array_equal(x, snake.compute_input()[:, 0])
+    
+    # Same default vision type as a Snake (the last snakes use "distance")
+    X = compute_inputs(boards, heads, directions, tail_directions, bearings=bearings, vision_mode=16)
+    for (x, snake) in zip(X, snakes):
+        assert snake.vision_type == "distance"
+        assert np.array_equal(x, snake.compute_input()[:, 0])
 
 
 
+def test_compute_input():
+    for vision_type in ["binary", "distance"]:
+        game = Game((15, 15), seed=1)
+        snake = Snake(game, vision_type=vision_type)
+        game.start(snake)
+        X = snake.compute_input()
+        assert X.shape == (8 * 3 + 8, 1)
+        
+        for _ in range(20):
+            # Same input as encoded by each vision
+            if vision_type == "binary":
+                vision = np.concatenate([vision.to_binary() for vision in snake.full_vision])
+            else:
+                distances = np.concatenate([vision.to_distances() for vision in snake.full_vision])
+                vision = np.divide(1, distances, out=np.zeros_like(distances), where=distances!=0)
+            one_hot = np.zeros(8)
+            one_hot[snake.tail_direction.value // 90] = 1
+            one_hot[4 + snake.direction.value // 90] = 1
+            # The input buffer is reused
+            assert snake.compute_input() is X
+            assert np.array_equal(X[:, 0], np.concatenate((vision, one_hot)))
+            snake.direction = snake.next_direction()
+            if not snake.move():
+                break
+
+
+
+def test_body():
+    game = Game((15, 15), seed=3)
+    snake = Snake(game, length=4)
+    game.start(snake)
+    
+    body = list(snake.body)
+    assert len(snake.body) == 4 and snake.body[-1] is body[-1]
+    # The view is created once, and follows the moves
+    view = snake.body
+    assert snake.body is view
+    assert all(snake.occupies(cell) and game.grid.is_snake(cell) for cell in snake.body)
+    try:
+        snake.body = []
+        assert False, "the body should not be writable"
+    except AttributeError:
+        pass
+    
+    # Move until the snake dies
+    while snake.move():
+        assert len(snake.body) == 4 + snake.score
+        assert snake.body[:-1] == body[1:] or snake.body[:-1] == body
+        assert game.grid.mask(snake.body[0].item).sum() == len(snake.body)
+        assert not snake.occupies(game.grid[0, 0])
+        assert list(view) == list(snake.body)
+        body = list(snake.body)
+        snake.direction = snake.next_direction()
+
+
+def test_genome():
+    game = Game((12, 15), seed=0)
+    snake = Snake(game, nn_hidden_layers=[20, 12])
+    genome = snake.genome
+    assert genome.ndim == 1 and genome.size == sum(chromosome.size for chromosome in snake.chromosomes)
+    # Chromosomes and weights share the genome's memory
+    for chromosome in snake.chromosomes:
+        assert np.shares_memory(chromosome.genes, genome)
+        assert np.shares_memory(snake.nn.params[chromosome.id], genome)
+    W_1 = snake.nn.params["W_1"].copy()
+    snake.mutate(1)
+    assert not np.array_equal(W_1, snake.nn.params["W_1"])
+    assert np.array_equal(snake.chromosomes[0].genes, snake.nn.params["W_1"].ravel())
+    b_1 = snake.nn.params["b_1"].copy()
+    snake.chromosomes[1].mutate(1)
+    assert np.all(snake.nn.params["b_1"] != b_1)
+    assert np.array_equal(snake.chromosomes[1].genes, snake.nn.params["b_1"].ravel())
+    
+    # A new snake copies the chromosomes in its own genome
+    child = Snake(game, chromosomes=snake.chromosomes, nn_hidden_layers=[20, 12])
+    assert np.array_equal(child.genome, genome)
+    assert not np.shares_memory(child.genome, genome)
+    assert all(np.array_equal(child.nn.params[key], snake.nn.params[key]) for key in child.nn.layout)
+    # Setting genes does not write in the genome
+    child.chromosomes[2].genes = np.zeros(child.chromosomes[2].size)
+    assert not np.shares_memory(child.chromosomes[2].genes, child.genome)
+    assert np.any(child.nn.params["W_2"] != 0)
+
+
 
 if __name__ == "__main__":
-    pass
\ No newline at end of file
+    
+    # compute_inputs
+    print("Testing compute_inputs()...")
+    test_compute_inputs()
+    print("compute_inputs() tested.")
+    
+    # Body
+    print("Testing Snake.body...")
+    test_body()
+    print("Snake.body tested.")
+    
+    # Genome
+    print("Testing Snake.genome...")
+    test_genome()
+    print("Snake.genome tested.")
\ No newline at end of file
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 17:58:06 2026
+# @author: arthurd
+
+
+import os
+import sys
+import tempfile
+import subprocess
+import numpy as np
+
+from pysnake.trainer import Trainer
+from pysnake.snake import SnakeGenome
+from pysnake.gen.population import GenomePopulation
+
+
+
+def test_trainer():
+    snake_params = {"vision_type": "binary", "hunger_max": 100}
+    params = {"seed": 0, "num_generations": 2, "num_parents": 5, "num_offspring": 10}
+    population, fitness = Trainer((12, 12), snake_params, **params).train()
+    assert population.size == 15
+    assert len(fitness) == 2
+    # The last generation is not played again
+    fittest = population.fittest
+    assert isinstance(fittest, SnakeGenome)
+    assert fittest.to_snake().fitness == fittest.fitness
+    # Training never imports pygame
+    code = "import sys, pysnake.trainer; assert 'pygame' not in sys.modules"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+    # Same training with another backend
+    trainer = Trainer((12, 12), snake_params, backend="vecgame", **params)
+    assert trainer.train()[1] == fitness
+    assert trainer.seed == 2 * 15
+
+    # Breeding draws from the trainer's random state only
+    genomes = GenomePopulation.from_individuals(population.individuals)
+    np.random.seed(1)
+    trainer.random_state = np.random.RandomState(0)
+    children = trainer.breed(genomes)
+    assert np.random.randint(1000) == np.random.RandomState(1).randint(1000)
+    np.random.seed(2)
+    trainer.random_state = np.random.RandomState(0)
+    assert np.array_equal(trainer.breed(genomes).genomes, children.genomes)
+
+
+
+def test_resume():
+    snake_params = {"vision_type": "binary", "hunger_max": 100}
+    params = {"seed": 0, "num_generations": 5, "num_parents": 5, "num_offspring": 10}
+    population, fitness = Trainer((12, 12), snake_params, **params).train()
+
+    with tempfile.TemporaryDirectory() as dirpath:
+        checkpoint_file = os.path.join(dirpath, "checkpoint.npz")
+        # Interrupted after 3 generations
+        trainer = Trainer((12, 12), snake_params, checkpoint_steps=3, 
+                          checkpoint_file=checkpoint_file, **params)
+        trainer.num_generations = 3
+        trainer.train()
+        # Resumed with a new trainer
+        trainer = Trainer((12, 12), snake_params, **params)
+        resumed_population, resumed_fitness = trainer.train(resume=checkpoint_file)
+        assert os.listdir(dirpath) == ["checkpoint.npz"]
+    
+    assert np.array_equal(resumed_fitness, fitness)
+    assert trainer.seed == 5 * 15
+    assert [snake.fitness for snake in resumed_population] == [snake.fitness for snake in population]
+
+
+
+if __name__ == "__main__":
+
+    # Trainer
+    print("Testing Trainer...")
+    test_trainer()
+    print("Trainer tested.")
+
+    # Resume a training
+    print("Testing Trainer.train(resume)...")
+    test_resume()
+    print("Trainer.train(resume) tested.")
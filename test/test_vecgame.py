@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 16:48:20 2026
+# @author: arthurd
+
+
+import numpy as np
+
+from pysnake.enum import Item
+from pysnake.game import Game
+from pysnake.snake import Snake
+from pysnake.vecgame import VecGame
+from pysnake.evaluation import Evaluator, evaluate, evaluate_lockstep
+
+
+
+def test_vecgame():
+    snake_params = {"vision_type": "binary", "hunger_max": 100}
+    game = Game((12, 12), seed=7)
+    snake = Snake(game, **snake_params)
+    game.start(snake)
+    env = VecGame((12, 12), 3, **snake_params)
+    env.reset([5, 7, 9])
+    # Same board as a Game with the same seed
+    assert np.array_equal(env.boards[1], game.grid.items)
+    assert tuple(env.heads[1]) == snake.body[-1].coord
+    assert env.directions[1] * 90 == snake.direction.value
+    assert env.tail_directions[1] * 90 == snake.tail_direction.value
+    # Same inputs
+    assert np.array_equal(env.compute_inputs([1])[0], snake.compute_input()[:, 0])
+
+    # Moving backward kills the snake on its own body
+    moves = [(-1, 0), (0, -1), (1, 0), (0, 1)]
+    def backward(env):
+        return [[k for (k, (di, dj)) in enumerate(moves) 
+                 if env.boards[board, i + di, j + dj] == Item.SNAKE.value][0]
+                for (board, (i, j)) in enumerate(env.heads)]
+    finished = env.step(backward(env))
+    assert set(finished) == {0, 1, 2}
+    assert not env.alive.any()
+    assert np.array_equal(env.results[:, 2], [0, 0, 0])
+
+    # Finished boards restart
+    env = VecGame((12, 12), 3, auto_reset=True, **snake_params)
+    env.reset([5, 7, 9])
+    env.step(backward(env))
+    assert env.alive.all()
+    assert np.array_equal(env.seeds, [8, 10, 12])
+
+
+def test_evaluate_lockstep():
+    for snake_params in [{"vision_type": "binary", "hunger_max": 100},
+                         {"vision_type": "distance", "vision_mode": 4, "lifespan_max": 50, "nn_dtype": "float32"}]:
+        genomes = np.stack([Snake(Game((12, 15), seed=seed), **snake_params).genome for seed in range(30)])
+        seeds = 100 + np.arange(30)
+        results = evaluate(Game((12, 15)), genomes, seeds, **snake_params)
+        assert np.array_equal(evaluate_lockstep((12, 15), genomes, seeds, **snake_params), results)
+        with Evaluator((12, 15), snake_params, workers=2, chunk_size=7, backend="vecgame") as evaluator:
+            assert np.array_equal(evaluator.evaluate(genomes, seeds), results)
+
+
+
+if __name__ == "__main__":
+
+    # VecGame
+    print("Testing VecGame...")
+    test_vecgame()
+    print("VecGame tested.")
+
+    # evaluate_lockstep
+    print("Testing evaluate_lockstep()...")
+    test_evaluate_lockstep()
+    print("evaluate_lockstep() tested.")
@@ -8,9 +8,10 @@ import numpy as np
 
 
 # Import PySnake modules
-from pysnake.utils import cell_to_coord
+from pysnake.utils import cell2coord as cell_to_coord
 from pysnake import Grid
 from pysnake import Vision, FullVision
+from pysnake.vision import get_ray_table
 
 # Pretty graphs
 plt.style.use('seaborn-darkgrid')
@@ -252,6 +253,60 @@ def test_full_vision():
     
     
 
+def test_ray_table():
+    for shape in [(10, 10), (7, 12)]:
+        grid = Grid(shape)
+        grid.add_wall_borders()
+        grid.set_apple((2, 3))
+        grid.set_snake((5, 5), (5, 6))
+        for mode in [4, 8, 16]:
+            table = get_ray_table(shape, mode)
+            # The table is shared
+            assert get_ray_table(shape, mode) is table
+            assert table.indices.dtype == np.int16
+            for center in [grid[1, 1], grid[4, 6], grid[shape[0] - 2, 3]]:
+                for bearing in [0, 90, 180, 270]:
+                    full_vision = FullVision(grid, center, bearing, mode=mode)
+                    for vision in full_vision:
+                        # Same ray as the traced one
+                        traced = Vision(grid, center, vision.angle)
+                        assert vision._k is not None and traced._k is None
+                        assert vision.look() == traced.look()
+                        assert np.allclose(vision.end_point, traced.end_point)
+                        assert vision.nearest_cells == traced.nearest_cells
+            
+            # Updating the sensor does not create new visions
+            visions = list(full_vision.visions)
+            full_vision.update(grid[3, 3], 90)
+            assert all(v1 is v2 for (v1, v2) in zip(visions, full_vision.visions))
+            assert full_vision[0].center.coord == (3, 3) and full_vision[0].angle == 90
+    
+
+
+def test_full_vision_encoding():
+    rng = np.random.RandomState(0)
+    grid = Grid((12, 9))
+    grid.add_wall_borders()
+    for _ in range(20):
+        grid.set_snake(tuple(rng.randint(1, 8, size=2)))
+        grid.set_apple(tuple(rng.randint(1, 8, size=2)))
+        for mode in [4, 8, 16]:
+            center = grid[tuple(rng.randint(1, 8, size=2))]
+            # Rays from the table, or traced at unusual angles
+            for bearing in [0, 90, 10]:
+                full_vision = FullVision(grid, center, bearing, mode=mode)
+                binary = np.concatenate([vision.to_binary() for vision in full_vision])
+                distances = np.concatenate([vision.to_distances() for vision in full_vision])
+                assert np.array_equal(full_vision.to_binary(), binary)
+                assert np.array_equal(full_vision.to_distances(), distances)
+                # Same sensor after a move, the visions follow when they are read
+                moved_vision = FullVision(grid, grid[1, 1], 0, mode=mode)
+                moved_vision.update(center, bearing)
+                assert np.array_equal(moved_vision.to_binary(), binary)
+                assert [vision.look() for vision in moved_vision] == [vision.look() for vision in full_vision]
+
+
+
 if __name__ == "__main__":
    
     # # Test end point
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 20:41:07 2026
+# @author: arthurd
+
+
+import os
+import time
+import tempfile
+import threading
+import numpy as np
+
+from pysnake.writer import BackgroundWriter
+from pysnake.trainer import Trainer
+from pysnake.io import PopulationArchive
+
+
+
+def test_background_writer():
+    written = []
+    def save(value, delay = 0):
+        time.sleep(delay)
+        written.append(value)
+
+    # Saves are written in order, in another thread
+    release = threading.Event()
+    with BackgroundWriter(max_queue=2) as writer:
+        writer.submit(release.wait)
+        for value in range(2):
+            writer.submit(save, value)
+        assert writer.queue_depth == 2 and written == []
+        release.set()
+        writer.submit(save, 2, delay=.01)
+    assert written == [0, 1, 2]
+    assert writer.num_writes == 4
+    assert writer.max_latency >= .01
+    assert writer.stats()["queue_depth"] == 0
+
+    # Errors are raised in the training
+    writer = BackgroundWriter(max_queue=2)
+    writer.submit(save, 3)
+    writer.submit(os.remove, "file_not_found")
+    try:
+        writer.flush()
+        assert False, "the error is not raised"
+    except FileNotFoundError:
+        pass
+    writer.close()
+    assert written == [0, 1, 2, 3]
+
+
+def test_trainer_saves():
+    snake_params = {"vision_type": "binary", "hunger_max": 100}
+    params = {"seed": 0, "num_generations": 3, "num_parents": 5, "num_offspring": 10,
+              "save_best_individuals": True, "save_generations": True, "save_steps": 1}
+    # The same files with or without the background writer
+    for save_queue_size in [0, 4]:
+        with tempfile.TemporaryDirectory() as dirpath:
+            trainer = Trainer((12, 12), snake_params, save_dir=dirpath, save_queue_size=save_queue_size, **params)
+            population, fitness = trainer.train()
+            assert sorted(os.listdir(dirpath)) == ["fittest", "generation_0.pop", "generation_1.pop", "generation_2.pop"]
+            assert len(os.listdir(os.path.join(dirpath, "fittest"))) == 3
+            archive = PopulationArchive(os.path.join(dirpath, "generation_2.pop"))
+            assert np.array_equal(archive.columns["fitness"], population.fitness)
+            del archive
+
+
+
+if __name__ == "__main__":
+
+    # BackgroundWriter
+    print("Testing BackgroundWriter...")
+    test_background_writer()
+    print("BackgroundWriter tested.")
+
+    # Trainer saves
+    print("Testing Trainer saves...")
+    test_trainer_saves()
+    print("Trainer saves tested.")